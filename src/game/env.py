@@ -27,8 +27,12 @@ from src.utils.config import Config , TestConfig
 #from matplotlib import pyplot as plt
 
 class SnakeEnv:
-    def __init__(self, render_mode=None):
+    def __init__(self, render_mode=None, seed=None, max_steps=None):
         self.render_mode = render_mode
+        # 独立随机数生成器(指定seed时)，便于并行运行多个可复现的环境
+        self.rng = random.Random(seed) if seed is not None else random
+        # 单轮最大步数(0表示不限制)，达到后片段被截断
+        self.max_steps = Config.MAX_EPISODE_STEPS if max_steps is None else max_steps
         self.reset()
         
         if self.render_mode == 'human':
@@ -56,6 +60,7 @@ class SnakeEnv:
         - 分数（0）
         - 步数计数器（0）
         - 累计奖励（0）
+        - 截断标志（False）
         
         返回:
             np.array: 当前状态的特征向量
@@ -66,6 +71,7 @@ class SnakeEnv:
         self.score = 0
         self.step_count = 0
         self.episode_reward = 0 
+        self.truncated = False
         return self._get_state()
     
     def _generate_food(self):
@@ -78,7 +84,7 @@ class SnakeEnv:
             tuple: (x, y)坐标的食物位置
         """
         while True:
-            food = (random.randint(0, Config.GRID_WIDTH-1), random.randint(0, Config.GRID_HEIGHT-1))
+            food = (self.rng.randint(0, Config.GRID_WIDTH-1), self.rng.randint(0, Config.GRID_HEIGHT-1))
             if food not in self.snake:
                 return food
     
@@ -128,7 +134,7 @@ class SnakeEnv:
             tuple: (next_state, reward, done)
                 next_state (np.array): 下一个状态的特征向量
                 reward (float): 执行动作后的即时奖励
-                done (bool): 游戏是否结束
+                done (bool): 本轮是否结束(碰撞终止或达到步数上限被截断，后者同时设置self.truncated)
         """
         self.step_count += 1
         actions = [(0, -1), (0, 1), (-1, 0), (1, 0)]
@@ -168,6 +174,11 @@ class SnakeEnv:
             reward = 0.2 + distance_reward  
             self.episode_reward += reward
         
+        # 步数上限：截断片段(不是终止状态)
+        if not done and self.max_steps > 0 and self.step_count >= self.max_steps:
+            self.truncated = True
+            done = True
+        
         # 可视化
         if self.render_mode == 'human':
             self._render_frame()
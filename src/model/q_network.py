@@ -17,21 +17,69 @@ from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Dense, BatchNormalization
 from tensorflow.keras.optimizers import Adam
 from tensorflow.keras.losses import Huber
+from src.utils.config import Config
+from src.utils import checkpoint
+
+def build_q_model(state_size, action_size, hidden_units=None, use_batch_norm=None):
+    """按给定结构构建Q网络模型
+    参数:
+        state_size (int): 状态特征的维度
+        action_size (int): 动作空间的大小
+        hidden_units (list): 各隐藏层神经元数，默认读取Config.HIDDEN_UNITS
+        use_batch_norm (bool): 隐藏层后是否接BatchNormalization，默认读取Config.USE_BATCH_NORM
+    返回:
+        Sequential: Keras序列模型
+    """
+    hidden_units = Config.HIDDEN_UNITS if hidden_units is None else hidden_units
+    use_batch_norm = Config.USE_BATCH_NORM if use_batch_norm is None else use_batch_norm
+    layers = []
+    for i, units in enumerate(hidden_units):
+        if i == 0:
+            layers.append(Dense(units, activation='relu', input_shape=(state_size,)))
+        else:
+            layers.append(Dense(units, activation='relu'))
+        if use_batch_norm:
+            layers.append(BatchNormalization())
+    if not hidden_units:
+        layers.append(Dense(action_size, activation='linear', input_shape=(state_size,)))
+    else:
+        layers.append(Dense(action_size, activation='linear'))
+    return Sequential(layers)
+
+def load_q_model(model_path):
+    """加载模型文件
+    .keras/.h5完整模型直接加载；只含权重的.npz按文件中记录的网络结构重建后载入权重，
+    比load_model快得多(不需要反序列化结构与编译配置)
+    参数:
+        model_path (str|Path): 模型文件路径
+    返回:
+        tf.keras.Model: Keras模型
+    """
+    if Path(model_path).suffix == checkpoint.WEIGHTS_EXTENSION:
+        weights, architecture = checkpoint.read_weights(model_path)
+        model = build_q_model(**architecture)
+        model.set_weights(weights)
+        return model
+    return tf.keras.models.load_model(model_path)
 
 class QNetwork:
     """Q网络类
     实现了DQN算法中的Q网络，包括主网络和目标网络。
     """
-    def __init__(self, state_size, action_size, learning_rate):
+    def __init__(self, state_size, action_size, learning_rate, hidden_units=None, use_batch_norm=None):
         """初始化Q网络
         参数:
             state_size (int): 状态特征的维度
             action_size (int): 动作空间的大小
             learning_rate (float): 学习率
+            hidden_units (list): 各隐藏层神经元数，默认读取Config.HIDDEN_UNITS
+            use_batch_norm (bool): 是否使用BatchNormalization，默认读取Config.USE_BATCH_NORM
         """
         self.state_size = state_size
         self.action_size = action_size
         self.learning_rate = learning_rate
+        self.hidden_units = list(Config.HIDDEN_UNITS if hidden_units is None else hidden_units)
+        self.use_batch_norm = Config.USE_BATCH_NORM if use_batch_norm is None else use_batch_norm
         self.model = self._build_model()
         self.target_model = self._build_model()
         self.update_target_network()
@@ -43,13 +91,7 @@ class QNetwork:
         返回:
             Sequential: Keras序列模型
         """
-        return Sequential([
-            Dense(128, activation='relu', input_shape=(self.state_size,)),
-            BatchNormalization(),
-            Dense(64, activation='relu'),
-            BatchNormalization(),
-            Dense(self.action_size, activation='linear')
-        ])
+        return build_q_model(self.state_size, self.action_size, self.hidden_units, self.use_batch_norm)
         
     def update_target_network(self):
         """同步主网络和目标网络权重"""
@@ -86,17 +128,18 @@ class QNetwork:
         else:  # 批量样本
             return self.predict_batch(state)
             
-    def train(self, states, targets):
+    def train(self, states, targets, sample_weights=None):
         """训练Q网络
         参数:
             states (np.array): 状态批次，形状为(batch_size, state_size)
             targets (np.array): 目标Q值批次，形状为(batch_size, action_size)
+            sample_weights (np.array): 每个样本的损失权重(优先经验回放的重要性采样权重)，形状为(batch_size,)
         返回:
             float: 训练损失值
         """
         with tf.GradientTape() as tape:
             predictions = self.model(states)
-            loss = self.loss_fn(targets, predictions)
+            loss = self.loss_fn(targets, predictions, sample_weight=sample_weights)
             
         gradients = tape.gradient(loss, self.model.trainable_variables)
         self.optimizer.apply_gradients(zip(gradients, self.model.trainable_variables))
@@ -111,3 +154,159 @@ class QNetwork:
         """目标网络预测批量状态的Q值"""
         return self.target_model.predict(states, verbose=0)
     
+
+
+class StackedQNetwork:
+    """堆叠Q网络类
+    将K个结构相同、参数相互独立的Q网络的权重堆叠为首维为K的张量，
+    每一层只需一次批量矩阵乘法即可同时完成K个智能体的前向与反向计算，
+    用于在接近单个智能体的耗时内完成多种子对比或集成训练。
+
+    网络结构与QNetwork一致(读取Config.HIDDEN_UNITS与Config.USE_BATCH_NORM)。QNetwork.train中模型以推理模式调用，
+    BatchNormalization只使用(固定的)滑动均值与方差，这里按相同的公式实现，
+    因此to_keras_model导出的单个模型与QNetwork训练出的模型行为一致。
+    """
+    BN_EPSILON = 1e-3  # 与Keras BatchNormalization默认值一致
+
+    def __init__(self, state_size, action_size, learning_rate, num_agents, seeds=None):
+        """初始化堆叠Q网络
+        参数:
+            state_size (int): 状态特征的维度
+            action_size (int): 动作空间的大小
+            learning_rate (float): 学习率
+            num_agents (int): 堆叠的智能体数量K
+            seeds (list): 每个智能体的权重初始化种子，默认为0..K-1
+        """
+        self.state_size = state_size
+        self.action_size = action_size
+        self.learning_rate = learning_rate
+        self.num_agents = num_agents
+        self.seeds = list(seeds) if seeds is not None else list(range(num_agents))
+        self.hidden_units = list(Config.HIDDEN_UNITS)
+        self.use_batch_norm = Config.USE_BATCH_NORM
+        self.layer_width = 6 if self.use_batch_norm else 2  # 每个隐藏层的权重张量个数
+
+        self.weights = self._build_weights()
+        self.target_weights = [tf.Variable(w, trainable=False) for w in self.weights]
+        self.trainable_variables = [w for w in self.weights if w.trainable]
+        self.optimizer = Adam(learning_rate=learning_rate)
+        self.loss_fn = Huber(reduction='none')
+
+    def _build_weights(self):
+        """按Keras默认初始化方式(glorot_uniform/零偏置)为每个智能体生成权重
+
+        权重顺序与QNetwork._build_model的get_weights()一致：
+        每个隐藏层依次为kernel、bias(启用BN时再加gamma、beta、moving_mean、moving_variance)，最后是输出层kernel、bias。
+        返回:
+            list: tf.Variable列表，首维均为K
+        """
+        rngs = [np.random.default_rng(seed) for seed in self.seeds]
+        K = self.num_agents
+
+        def glorot(fan_in, fan_out):
+            limit = np.sqrt(6.0 / (fan_in + fan_out))
+            return np.stack([rng.uniform(-limit, limit, (fan_in, fan_out)) for rng in rngs]).astype(np.float32)
+
+        weights = []
+        fan_in = self.state_size
+        for units in self.hidden_units:
+            weights.append(tf.Variable(glorot(fan_in, units)))
+            weights.append(tf.Variable(np.zeros((K, units), np.float32)))
+            if self.use_batch_norm:
+                weights.append(tf.Variable(np.ones((K, units), np.float32)))
+                weights.append(tf.Variable(np.zeros((K, units), np.float32)))
+                weights.append(tf.Variable(np.zeros((K, units), np.float32), trainable=False))
+                weights.append(tf.Variable(np.ones((K, units), np.float32), trainable=False))
+            fan_in = units
+        weights.append(tf.Variable(glorot(fan_in, self.action_size)))
+        weights.append(tf.Variable(np.zeros((K, self.action_size), np.float32)))
+        return weights
+
+    def _forward(self, weights, states):
+        """堆叠前向计算
+        参数:
+            weights (list): 权重列表(主网络或目标网络)
+            states: 形状为(K, batch_size, state_size)的状态张量
+        返回:
+            形状为(K, batch_size, action_size)的Q值张量
+        """
+        x = states
+        i = 0
+        for _ in self.hidden_units:
+            kernel, bias = weights[i:i + 2]
+            x = tf.nn.relu(tf.matmul(x, kernel) + bias[:, None, :])
+            if self.use_batch_norm:
+                gamma, beta, mean, var = weights[i + 2:i + 6]
+                x = (x - mean[:, None, :]) * tf.math.rsqrt(var[:, None, :] + self.BN_EPSILON) * gamma[:, None, :] + beta[:, None, :]
+            i += self.layer_width
+        kernel, bias = weights[i:i + 2]
+        return tf.matmul(x, kernel) + bias[:, None, :]
+
+    @tf.function
+    def _predict(self, states):
+        return self._forward(self.weights, states)
+
+    @tf.function
+    def _target_predict(self, states):
+        return self._forward(self.target_weights, states)
+
+    @tf.function
+    def _train_step(self, states, targets, sample_weights):
+        with tf.GradientTape() as tape:
+            predictions = self._forward(self.weights, states)
+            # 各智能体参数互不相关，对每个智能体的平均损失求和即等价于分别训练
+            agent_losses = tf.reduce_mean(self.loss_fn(targets, predictions) * sample_weights, axis=1)
+            loss = tf.reduce_sum(agent_losses)
+        gradients = tape.gradient(loss, self.trainable_variables)
+        self.optimizer.apply_gradients(zip(gradients, self.trainable_variables))
+        return agent_losses
+
+    def update_target_network(self, agent_mask=None):
+        """同步主网络和目标网络权重
+        参数:
+            agent_mask (np.array): 形状为(K,)的布尔数组，只同步为True的智能体；None表示全部同步
+        """
+        for target, online in zip(self.target_weights, self.weights):
+            if agent_mask is None:
+                target.assign(online)
+            else:
+                mask = tf.reshape(tf.constant(agent_mask, dtype=tf.bool), [-1] + [1] * (len(online.shape) - 1))
+                target.assign(tf.where(mask, online, target))
+
+    def predict_single(self, states):
+        """预测每个智能体各自单个状态的Q值
+        参数:
+            states (np.array): 形状为(K, state_size)
+        返回:
+            np.array: 形状为(K, action_size)
+        """
+        return self._predict(tf.convert_to_tensor(states[:, None, :], dtype=tf.float32)).numpy()[:, 0, :]
+
+    def predict_batch(self, states):
+        """预测批量状态的Q值，states形状为(K, batch_size, state_size)"""
+        return self._predict(tf.convert_to_tensor(states, dtype=tf.float32)).numpy()
+
+    def target_predict_batch(self, states):
+        """目标网络预测批量状态的Q值，states形状为(K, batch_size, state_size)"""
+        return self._target_predict(tf.convert_to_tensor(states, dtype=tf.float32)).numpy()
+
+    def train(self, states, targets, sample_weights=None):
+        """一次融合的梯度更新同时训练K个智能体
+        参数:
+            states (np.array): 形状为(K, batch_size, state_size)
+            targets (np.array): 形状为(K, batch_size, action_size)
+            sample_weights (np.array): 每个样本的损失权重，形状为(K, batch_size)，默认全为1
+        返回:
+            np.array: 每个智能体的训练损失，形状为(K,)
+        """
+        if sample_weights is None:
+            sample_weights = np.ones(np.shape(states)[:2], dtype=np.float32)
+        return self._train_step(tf.convert_to_tensor(states, dtype=tf.float32),
+                                tf.convert_to_tensor(targets, dtype=tf.float32),
+                                tf.convert_to_tensor(sample_weights, dtype=tf.float32)).numpy()
+
+    def to_keras_model(self, agent_index):
+        """导出第agent_index个智能体为普通Keras模型(可直接保存或转换为TFLite)"""
+        model = build_q_model(self.state_size, self.action_size, self.hidden_units, self.use_batch_norm)
+        model.set_weights([w[agent_index].numpy() for w in self.weights])
+        return model
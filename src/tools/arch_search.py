@@ -0,0 +1,229 @@
+"""
+Q网络结构搜索工具(延迟/体积约束)
+
+在进程池中并行训练多种隐藏层宽度、深度(及是否使用BatchNormalization)的候选网络，
+每个候选使用相同的环境交互步数预算，训练后：
+- 以固定种子运行若干轮贪婪策略评估得分
+- 全整型(int8)量化为TFLite，记录模型字节数
+- 在主机上用TFLite解释器测量单次推理延迟
+
+最后输出 得分-延迟-体积 的帕累托前沿，并可将选定结构写入config.json的network配置段。
+
+用法:
+    python src/tools/arch_search.py --widths 16,32,64,128 --depths 1,2 --budget-steps 20000
+    python src/tools/arch_search.py --max-latency-us 50 --max-bytes 20000 --apply 3
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.utils.config import Config, TestConfig, config_loader
+from src.utils.logger import ColorLogger
+
+
+def generate_candidates(widths, depths, batch_norm_options):
+    """生成候选结构：深度为d时各层宽度依次减半(最小为4)"""
+    candidates = []
+    for depth in depths:
+        for width in widths:
+            hidden_units = [max(4, width // (2 ** i)) for i in range(depth)]
+            for use_batch_norm in batch_norm_options:
+                candidates.append({"hidden_units": hidden_units, "batch_norm": use_batch_norm})
+    return candidates
+
+
+def measure_tflite_latency(tflite_model, states, repeats):
+    """用TFLite解释器(单线程)测量单次推理的平均延迟(微秒)"""
+    import numpy as np
+    import tensorflow as tf
+
+    interpreter = tf.lite.Interpreter(model_content=tflite_model, num_threads=1)
+    interpreter.allocate_tensors()
+    input_detail = interpreter.get_input_details()[0]
+    scale, zero_point = input_detail["quantization"]
+    quantized = [np.clip(np.round(s / scale + zero_point), -128, 127).astype(np.int8)[np.newaxis, :] for s in states]
+
+    for q in quantized[:10]:
+        interpreter.set_tensor(input_detail["index"], q)
+        interpreter.invoke()
+
+    start = time.perf_counter()
+    for i in range(repeats):
+        interpreter.set_tensor(input_detail["index"], quantized[i % len(quantized)])
+        interpreter.invoke()
+    return (time.perf_counter() - start) * 1e6 / repeats
+
+
+def evaluate_candidate(candidate, budget_steps, eval_episodes, target_sync_steps, seed):
+    """进程池任务：训练并评估单个候选结构"""
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+    from src.utils.cpu_profile import apply_cpu_profile
+    apply_cpu_profile()
+
+    import random
+    import numpy as np
+    import tensorflow as tf
+    from src.utils.device import configure_cpu_threads
+    configure_cpu_threads(1, 1)  # 每个进程单线程，避免进程池内线程争用
+
+    from src.model.q_network import QNetwork
+    from src.utils.replay_buffer import ReplayBuffer
+    from src.utils.env_handler import EnvironmentHandler
+    from src.utils.agent_trainer import AgentTrainer
+    from src.utils.model_manager import quantize_to_int8_tflite
+    from src.utils.evaluator import run_greedy_episodes
+
+    random.seed(seed)
+    np.random.seed(seed)
+    tf.random.set_seed(seed)
+    start_time = time.time()
+
+    with tf.device('/CPU:0'):
+        env_handler = EnvironmentHandler(seed=seed)
+        agent = QNetwork(Config.STATE_SIZE, Config.ACTION_SIZE, Config.LEARNING_RATE,
+                         hidden_units=candidate["hidden_units"], use_batch_norm=candidate["batch_norm"])
+        replay_buffer = ReplayBuffer(Config.REPLAY_BUFFER_SIZE)
+        trainer = AgentTrainer(agent, env_handler, replay_buffer, model_manager=None, logger=None)
+
+        # 固定步数预算训练：前一半步数内探索率线性衰减
+        state = env_handler.reset()
+        representative_states = []
+        for step in range(budget_steps):
+            epsilon = max(Config.EPSILON_MIN, 1.0 - step / (0.5 * budget_steps))
+            action = trainer._choose_action(state, epsilon)
+            next_state, reward, done = env_handler.step(action)
+            trainer._store_experience((state, action, reward, next_state, done, env_handler.truncated))
+            trainer._experience_replay()
+            if step % 50 == 0 and len(representative_states) < 200:
+                representative_states.append(state)
+            state = env_handler.reset() if done else next_state
+            if step % target_sync_steps == 0:
+                agent.update_target_network()
+
+        scores = run_greedy_episodes(agent, eval_episodes, seed=10000, max_steps=TestConfig.MAX_STEPS)
+        tflite_model = quantize_to_int8_tflite(agent.model, representative_states)
+        latency_us = measure_tflite_latency(tflite_model, representative_states, repeats=2000)
+
+    return dict(candidate,
+                params=int(agent.model.count_params()),
+                score=float(np.mean(scores)),
+                score_std=float(np.std(scores)),
+                tflite_bytes=len(tflite_model),
+                latency_us=latency_us,
+                train_seconds=time.time() - start_time)
+
+
+def pareto_front(results):
+    """返回得分(越高越好)、延迟与体积(越低越好)的非支配解"""
+    front = []
+    for r in results:
+        dominated = any(
+            o["score"] >= r["score"] and o["latency_us"] <= r["latency_us"] and o["tflite_bytes"] <= r["tflite_bytes"]
+            and (o["score"] > r["score"] or o["latency_us"] < r["latency_us"] or o["tflite_bytes"] < r["tflite_bytes"])
+            for o in results
+        )
+        if not dominated:
+            front.append(r)
+    return front
+
+
+def write_architecture(result, config_file):
+    """将选定结构写入config.json的network配置段"""
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+    network = config.setdefault("network", {})
+    network["HIDDEN_UNITS"] = result["hidden_units"]
+    network["USE_BATCH_NORM"] = result["batch_norm"]
+    with open(config_file, 'w') as f:
+        json.dump(config, f, indent=4)
+    ColorLogger.success(f"网络结构 {result['hidden_units']} (BN={result['batch_norm']}) 已写入: {config_file}")
+
+
+def parse_int_list(text):
+    return [int(x) for x in text.split(",") if x.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Q网络结构搜索(延迟/体积约束)")
+    parser.add_argument("--widths", type=str, default="16,32,64,128", help="首个隐藏层宽度候选")
+    parser.add_argument("--depths", type=str, default="1,2", help="隐藏层数候选")
+    parser.add_argument("--bn", type=str, default="both", choices=["both", "on", "off"], help="是否使用BatchNormalization")
+    parser.add_argument("--budget-steps", type=int, default=20000, help="每个候选的环境交互步数预算")
+    parser.add_argument("--eval-episodes", type=int, default=20, help="贪婪策略评估轮数")
+    parser.add_argument("--target-sync-steps", type=int, default=500, help="目标网络同步间隔(步)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1), help="并行进程数")
+    parser.add_argument("--seed", type=int, default=0, help="训练随机种子")
+    parser.add_argument("--max-latency-us", type=float, default=None, help="单次推理延迟上限(微秒)")
+    parser.add_argument("--max-bytes", type=int, default=None, help="TFLite模型大小上限(字节)")
+    parser.add_argument("--apply", type=int, default=None, help="将结果表中指定编号的结构写入config.json")
+    args = parser.parse_args()
+
+    batch_norm_options = {"both": [True, False], "on": [True], "off": [False]}[args.bn]
+    candidates = generate_candidates(parse_int_list(args.widths), parse_int_list(args.depths), batch_norm_options)
+    ColorLogger.highlight("===== Q网络结构搜索 =====")
+    ColorLogger.info(f"候选数: {len(candidates)} | 步数预算: {args.budget_steps} | 并行进程: {args.workers}")
+
+    results = []
+    # 使用spawn避免子进程继承父进程的TensorFlow运行时状态
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(evaluate_candidate, c, args.budget_steps, args.eval_episodes,
+                               args.target_sync_steps, args.seed): c for c in candidates}
+        for future in as_completed(futures):
+            candidate = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                ColorLogger.error(f"候选 {candidate} 评估失败: {str(e)}")
+                continue
+            results.append(result)
+            print(f"  完成 {result['hidden_units']} BN={result['batch_norm']}: 得分 {result['score']:.2f}, "
+                  f"{result['latency_us']:.1f}us, {result['tflite_bytes']}B")
+
+    if not results:
+        ColorLogger.error("所有候选均评估失败")
+        return
+
+    results.sort(key=lambda r: (-r["score"], r["latency_us"]))
+    front = pareto_front(results)
+    within_budget = [r for r in front
+                     if (args.max_latency_us is None or r["latency_us"] <= args.max_latency_us)
+                     and (args.max_bytes is None or r["tflite_bytes"] <= args.max_bytes)]
+
+    print("\n" + "=" * 90)
+    print("  [*]=帕累托前沿  [+]=前沿且满足延迟/体积约束")
+    print(f"  {'编号':<4} {'结构':<18} {'BN':<6} {'参数量':<8} {'得分':<12} {'延迟(us)':<10} {'TFLite(B)':<10}")
+    for i, r in enumerate(results, 1):
+        mark = "+" if r in within_budget else ("*" if r in front else " ")
+        print(f"  [{mark}]{i:<3} {str(r['hidden_units']):<18} {str(r['batch_norm']):<6} {r['params']:<8} "
+              f"{r['score']:.2f}±{r['score_std']:<6.2f} {r['latency_us']:<10.1f} {r['tflite_bytes']:<10}")
+    print("=" * 90)
+
+    Config.LOG_DIR.mkdir(parents=True, exist_ok=True)
+    report_path = Config.LOG_DIR / f"arch_search_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_path, 'w') as f:
+        json.dump({"args": vars(args), "results": results,
+                   "pareto_front": [results.index(r) + 1 for r in front]}, f, indent=2)
+    ColorLogger.success(f"搜索结果已保存至: {report_path}")
+
+    choice = args.apply
+    if choice is None and sys.stdin.isatty():
+        text = input("\n请输入要写入config.json的结构编号(直接回车跳过): ").strip()
+        choice = int(text) if text.isdigit() else None
+    if choice is not None:
+        if 1 <= choice <= len(results):
+            write_architecture(results[choice - 1], project_root / config_loader.config_file)
+        else:
+            ColorLogger.error(f"无效编号: {choice}")
+
+
+if __name__ == "__main__":
+    main()
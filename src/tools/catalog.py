@@ -0,0 +1,82 @@
+"""
+模型索引工具
+
+模型索引(MODEL_DIR/catalog.sqlite)在每次保存模型时写入，训练器、tester.py、k2tflite.py与vismodel.py
+通过它查找最新或评估最好的模型。索引缺失(旧目录)或与目录不一致(手动增删了模型文件)时用rebuild从目录重建：
+轮次与权重摘要取自同名训练检查点，评估得分取自training_state.json。
+
+- rebuild: 从目录重建索引(--load-models时加载没有检查点的模型计算权重摘要)
+- list: 按保存时间列出索引中的模型
+- latest: 输出最近保存的模型路径
+- best: 输出评估得分最高的模型路径
+
+用法:
+    python src/tools/catalog.py rebuild
+    python src/tools/catalog.py rebuild --load-models --model-dir saved_models
+    python src/tools/catalog.py list --all
+    python src/tools/catalog.py best
+"""
+import sys
+import argparse
+import datetime
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.utils.logger import ColorLogger
+from src.utils.model_catalog import ModelCatalog, TRAINING_KINDS
+
+
+def load_keras_weights(path):
+    """加载模型文件并返回权重(rebuild --load-models)"""
+    import tensorflow as tf
+    return tf.keras.models.load_model(path).get_weights()
+
+
+def format_entry(entry):
+    saved_at = datetime.datetime.fromtimestamp(entry['saved_at']).strftime("%Y-%m-%d %H:%M:%S")
+    episode = "-" if entry['episode'] is None else entry['episode']
+    score = "-" if entry['eval_score'] is None else f"{entry['eval_score']:.2f}"
+    weights = (entry['weights_hash'] or "-")[:12]
+    return (f"{entry['name']:<36} {entry['kind']:<12} {episode:>8} {score:>8} "
+            f"{entry['size'] / (1024 * 1024):>8.2f}MB  {saved_at}  {weights}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模型索引工具")
+    parser.add_argument("command", choices=["rebuild", "list", "latest", "best"], help="操作")
+    parser.add_argument("--model-dir", type=str, default=None, help="模型目录，默认为model.MODEL_DIR")
+    parser.add_argument("--load-models", action="store_true", help="rebuild时加载没有训练检查点的模型计算权重摘要")
+    parser.add_argument("--all", action="store_true", help="list时包含多智能体模型与其它模型")
+    args = parser.parse_args()
+
+    catalog = ModelCatalog(args.model_dir)
+    if args.command == "rebuild":
+        if not catalog.model_dir.exists():
+            ColorLogger.error(f"模型目录不存在: {catalog.model_dir}")
+            sys.exit(1)
+        count = catalog.rebuild(load_weights=load_keras_weights if args.load_models else None)
+        ColorLogger.success(f"模型索引已重建: {catalog.path} ({count}个模型)")
+        return
+
+    if not catalog.exists():
+        ColorLogger.error(f"模型索引不存在: {catalog.path}，请先运行 python src/tools/catalog.py rebuild")
+        sys.exit(1)
+    if args.command == "list":
+        entries = catalog.entries(kinds=None if args.all else TRAINING_KINDS)
+        print(f"{'模型':<36} {'种类':<12} {'轮次':>8} {'评估得分':>8} {'大小':>10}  {'保存时间':<19}  权重摘要")
+        for entry in entries:
+            print(format_entry(entry))
+        ColorLogger.info(f"共{len(entries)}个模型 | 索引: {catalog.path}")
+        return
+
+    entry = catalog.latest() if args.command == "latest" else catalog.best()
+    if entry is None:
+        ColorLogger.error("索引中没有最近保存的模型" if args.command == "latest" else "索引中没有带评估得分的模型")
+        sys.exit(1)
+    print(entry['path'])
+
+
+if __name__ == "__main__":
+    main()
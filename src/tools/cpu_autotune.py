@@ -0,0 +1,190 @@
+"""
+CPU执行配置自动调优工具
+
+针对当前机器依次测试不同的线程池大小与oneDNN开关组合，
+在独立子进程中计时真实的训练更新步骤(AgentTrainer._experience_replay)
+与动作选择(AgentTrainer._choose_action)，并将最优组合写回config.json的cpu配置段。
+
+TensorFlow的线程池与oneDNN开关只能在进程初始化时设置一次，因此每个组合都在新进程中运行。
+
+用法:
+    python src/tools/cpu_autotune.py
+    python src/tools/cpu_autotune.py --intra 1,2,4 --inter 1,2 --steps 300 --dry-run
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.utils.config import Config, config_loader
+from src.utils.logger import ColorLogger
+
+RESULT_MARKER = "AUTOTUNE_RESULT "
+
+
+def default_thread_candidates():
+    """生成默认的线程数候选列表(1, 2, 4, ... 直到CPU核心数)"""
+    cpu_count = os.cpu_count() or 1
+    candidates = []
+    n = 1
+    while n < cpu_count:
+        candidates.append(n)
+        n *= 2
+    candidates.append(cpu_count)
+    return candidates
+
+
+def run_worker(intra, inter, steps, warmup):
+    """子进程入口：按给定线程配置计时动作选择与更新步骤
+
+    结果以RESULT_MARKER开头的单行JSON输出到标准输出。
+    """
+    from src.utils.cpu_profile import apply_cpu_profile
+    apply_cpu_profile(enable_onednn=os.environ.get("TF_ENABLE_ONEDNN_OPTS") == "1")
+
+    import numpy as np
+    import tensorflow as tf
+    from src.utils.device import configure_cpu_threads
+    configure_cpu_threads(intra, inter)
+
+    from src.model.q_network import QNetwork
+    from src.utils.replay_buffer import ReplayBuffer
+    from src.utils.env_handler import EnvironmentHandler
+    from src.utils.agent_trainer import AgentTrainer
+
+    with tf.device('/CPU:0'):
+        env_handler = EnvironmentHandler()
+        agent = QNetwork(Config.STATE_SIZE, Config.ACTION_SIZE, Config.LEARNING_RATE)
+        replay_buffer = ReplayBuffer(Config.REPLAY_BUFFER_SIZE)
+        trainer = AgentTrainer(agent, env_handler, replay_buffer, model_manager=None, logger=None)
+
+        # 用随机策略填充回放缓冲区
+        state = env_handler.reset()
+        while len(replay_buffer) < max(Config.BATCH_SIZE * 16, 1000):
+            action = np.random.randint(Config.ACTION_SIZE)
+            next_state, reward, done = env_handler.step(action)
+            trainer._store_experience((state, action, reward, next_state, done, env_handler.truncated))
+            state = env_handler.reset() if done else next_state
+
+        for _ in range(warmup):
+            trainer._choose_action(state, 0.0)
+            trainer._experience_replay()
+
+        start = time.perf_counter()
+        for _ in range(steps):
+            trainer._choose_action(state, 0.0)
+        action_ms = (time.perf_counter() - start) * 1000 / steps
+
+        start = time.perf_counter()
+        for _ in range(steps):
+            trainer._experience_replay()
+        update_ms = (time.perf_counter() - start) * 1000 / steps
+
+    print(RESULT_MARKER + json.dumps({"action_ms": action_ms, "update_ms": update_ms}), flush=True)
+
+
+def benchmark_profile(intra, inter, enable_onednn, steps, warmup):
+    """在新进程中测试单个配置组合
+
+    Returns:
+        dict: 计时结果，子进程失败时返回None
+    """
+    env = dict(os.environ)
+    env["TF_ENABLE_ONEDNN_OPTS"] = "1" if enable_onednn else "0"
+    env["TF_CPP_MIN_LOG_LEVEL"] = "3"
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--worker",
+           "--intra", str(intra), "--inter", str(inter),
+           "--steps", str(steps), "--warmup", str(warmup)]
+    proc = subprocess.run(cmd, cwd=str(project_root), env=env,
+                          capture_output=True, text=True, encoding="utf-8", errors="replace")
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            result = json.loads(line[len(RESULT_MARKER):])
+            result.update({
+                "intra": intra,
+                "inter": inter,
+                "onednn": enable_onednn,
+                "step_ms": result["action_ms"] + result["update_ms"]
+            })
+            return result
+    ColorLogger.error(f"配置 intra={intra} inter={inter} onednn={enable_onednn} 测试失败:\n{proc.stderr[-2000:]}")
+    return None
+
+
+def write_best_profile(best, config_file):
+    """将最优配置写回config.json的cpu配置段"""
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+    cpu_section = config.setdefault("cpu", {})
+    cpu_section["INTRA_OP_THREADS"] = best["intra"]
+    cpu_section["INTER_OP_THREADS"] = best["inter"]
+    cpu_section["ENABLE_ONEDNN"] = best["onednn"]
+    with open(config_file, 'w') as f:
+        json.dump(config, f, indent=4)
+    ColorLogger.success(f"最优CPU配置已写入: {config_file}")
+
+
+def parse_int_list(text):
+    return [int(x) for x in text.split(",") if x.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU线程与oneDNN配置自动调优")
+    parser.add_argument("--intra", type=str, default=None, help="intra-op线程数候选，如1,2,4")
+    parser.add_argument("--inter", type=str, default="1,2", help="inter-op线程数候选，如1,2")
+    parser.add_argument("--onednn", type=str, default="both", choices=["both", "on", "off"])
+    parser.add_argument("--steps", type=int, default=200, help="每个配置计时的步数")
+    parser.add_argument("--warmup", type=int, default=20, help="计时前的预热步数")
+    parser.add_argument("--dry-run", action="store_true", help="只输出结果，不写入config.json")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(int(args.intra), int(args.inter), args.steps, args.warmup)
+        return
+
+    intra_candidates = parse_int_list(args.intra) if args.intra else default_thread_candidates()
+    inter_candidates = parse_int_list(args.inter)
+    onednn_candidates = {"both": [True, False], "on": [True], "off": [False]}[args.onednn]
+
+    ColorLogger.highlight("===== CPU配置自动调优 =====")
+    ColorLogger.info(f"intra-op候选: {intra_candidates} | inter-op候选: {inter_candidates} | oneDNN: {onednn_candidates}")
+
+    results = []
+    for enable_onednn in onednn_candidates:
+        for intra in intra_candidates:
+            for inter in inter_candidates:
+                result = benchmark_profile(intra, inter, enable_onednn, args.steps, args.warmup)
+                if result:
+                    results.append(result)
+                    print(f"  intra={intra:<3} inter={inter:<3} onednn={str(enable_onednn):<5} "
+                          f"动作选择: {result['action_ms']:.3f}ms  更新: {result['update_ms']:.3f}ms  "
+                          f"合计: {result['step_ms']:.3f}ms/步")
+
+    if not results:
+        ColorLogger.error("所有配置均测试失败，未修改配置文件")
+        return
+
+    results.sort(key=lambda r: r["step_ms"])
+    print("\n" + "=" * 70)
+    print(f"  {'排名':<4} {'intra':<6} {'inter':<6} {'oneDNN':<7} {'动作(ms)':<10} {'更新(ms)':<10} {'合计(ms)':<10}")
+    for rank, r in enumerate(results, 1):
+        print(f"  {rank:<6} {r['intra']:<6} {r['inter']:<6} {str(r['onednn']):<7} "
+              f"{r['action_ms']:<10.3f} {r['update_ms']:<10.3f} {r['step_ms']:<10.3f}")
+    print("=" * 70)
+
+    best = results[0]
+    ColorLogger.success(f"最优配置: intra={best['intra']} inter={best['inter']} oneDNN={best['onednn']} "
+                        f"({best['step_ms']:.3f}ms/步)")
+    if not args.dry_run:
+        write_best_profile(best, project_root / config_loader.config_file)
+
+
+if __name__ == "__main__":
+    main()
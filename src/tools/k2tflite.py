@@ -7,9 +7,11 @@ sys.path.append(str(project_root))
 
 import tensorflow as tf
 from src.utils.logger import ColorLogger
+from src.utils.model_catalog import ModelCatalog
+from src.model.q_network import load_q_model
 
 def scan_keras_models(model_dir):
-    """扫描指定目录下的所有.keras模型文件
+    """扫描指定目录下的所有.keras模型与只含权重的.npz模型(有模型索引时直接查询索引，按保存时间排序)
     
     参数:
         model_dir (Path): 模型目录路径
@@ -21,14 +23,16 @@ def scan_keras_models(model_dir):
         ColorLogger.error(f"模型目录不存在: {model_dir}")
         return []
     
-    keras_files = list(model_dir.glob("*.keras"))
+    keras_files = [entry['path'] for entry in ModelCatalog(model_dir).entries(kinds=None)
+                   if entry['path'].suffix in (".keras", ".npz")]
     if not keras_files:
-        ColorLogger.warning("未找到任何.keras模型文件")
+        keras_files = list(model_dir.glob("*.keras")) + list(model_dir.glob("*.npz"))
+        # 按修改时间排序（最新的在前）
+        keras_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
+    if not keras_files:
+        ColorLogger.warning("未找到任何.keras/.npz模型文件")
         return []
     
-    # 按修改时间排序（最新的在前）
-    keras_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
-    
     # 为每个文件分配编号
     indexed_files = [(i+1, file) for i, file in enumerate(keras_files)]
     return indexed_files
@@ -86,7 +90,7 @@ def convert_to_tflite(keras_path, output_dir="tflite_models"):
     
     try:
         # 加载Keras模型
-        model = tf.keras.models.load_model(keras_path)
+        model = load_q_model(keras_path)
         
         # 创建TFLite转换器
         converter = tf.lite.TFLiteConverter.from_keras_model(model)
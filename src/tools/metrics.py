@@ -0,0 +1,77 @@
+"""
+训练指标工具
+
+每轮训练指标以列式二进制格式保存在LOG_DIR/training_metrics_<时间戳>/(每列按块存为.npy文件)，
+读取时只内存映射所需行范围的块。本工具查看指标的列与行数，并把指定运行、列与轮次范围导出为CSV。
+RUN可以是指标目录路径或目录名，省略时使用LOG_DIR下最新的运行。
+
+- info: 列出各列的类型与总行数，以及最近几轮的得分
+- export: 导出为CSV(默认与指标目录同名，扩展名为.csv)
+
+用法:
+    python src/tools/metrics.py info
+    python src/tools/metrics.py export
+    python src/tools/metrics.py export training_metrics_20250101_120000 --columns episode,score,loss --start 1000
+"""
+import sys
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils.metrics_store import MetricsReader, find_metrics_runs
+
+
+def resolve_run(run):
+    """RUN参数 -> 指标目录，找不到时返回None"""
+    if run is None:
+        runs = find_metrics_runs()
+        return runs[-1] if runs else None
+    for path in (Path(run), Config.LOG_DIR / run):
+        if (path / "schema.json").exists():
+            return path
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="训练指标工具")
+    parser.add_argument("command", choices=["info", "export"], help="操作")
+    parser.add_argument("run", nargs="?", default=None, help="指标目录或目录名，默认为LOG_DIR下最新的运行")
+    parser.add_argument("--output", type=str, default=None, help="导出的CSV路径")
+    parser.add_argument("--columns", type=str, default=None, help="导出的列(逗号分隔)，默认全部")
+    parser.add_argument("--start", type=int, default=0, help="起始行(含)")
+    parser.add_argument("--stop", type=int, default=None, help="结束行(不含)，默认到最后一行")
+    args = parser.parse_args()
+
+    path = resolve_run(args.run)
+    if path is None:
+        ColorLogger.error(f"找不到训练指标: {args.run or Config.LOG_DIR}")
+        sys.exit(1)
+    reader = MetricsReader(path)
+
+    if args.command == "info":
+        print(f"{'列':<20} {'类型':<8}")
+        for name in reader.columns:
+            print(f"{name:<20} {reader.dtypes[name].name:<8}")
+        ColorLogger.info(f"{path}: {len(reader)}轮 | {len(reader.columns)}列 | 每块{reader.chunk_rows}行")
+        if len(reader):
+            episodes = reader.read('episode', -10)
+            scores = reader.read('score', -10)
+            ColorLogger.info("最近几轮得分: " + ", ".join(f"{e}:{s}" for e, s in zip(episodes, scores)))
+        return
+
+    columns = args.columns.split(",") if args.columns else None
+    unknown = [name for name in columns or [] if name not in reader.dtypes]
+    if unknown:
+        ColorLogger.error(f"没有指标列: {', '.join(unknown)} (可用: {', '.join(reader.columns)})")
+        sys.exit(1)
+    output = Path(args.output) if args.output else path.with_name(path.name + ".csv")
+    count = reader.export_csv(output, columns, args.start, args.stop)
+    ColorLogger.success(f"已导出{count}轮指标至: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+远程执行者协议本机回环测试
+
+在本进程中启动学习器一侧的套接字服务(RemoteLearnerServer)，再以子进程启动若干
+`python -m src.trainer.actor --learner ...`连接到127.0.0.1(或Unix套接字)，
+由一个简化的学习器循环接收经验写入回放缓冲区并周期性发布扰动后的权重，不需要任何外部服务。结束后检查:
+- 每个执行者都完成了指定轮数，收到的单轮统计与经验条数一致
+- 每个执行者都收到了新权重，经验批量中记录的权重版本随之更新
+- 接收队列从未超过上限(--learner-delay-ms模拟慢学习器时验证背压)
+并输出吞吐量与压缩比，结果保存为LOG_DIR下的JSON报告。
+
+用法:
+    python src/tools/remote_loopback.py --actors 2 --episodes 5
+    python src/tools/remote_loopback.py --unix --compression 6 --learner-delay-ms 5
+"""
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import datetime
+import subprocess
+import tempfile
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+
+
+def launch_actors(address, count, episodes, batch_steps, compression):
+    """以子进程启动执行者(与在其它主机上手动启动的方式相同)"""
+    processes = []
+    for _ in range(count):
+        command = [sys.executable, "-m", "src.trainer.actor", "--learner", address,
+                   "--max-episodes", str(episodes), "--connect-timeout", "60"]
+        if batch_steps is not None:
+            command += ["--batch-steps", str(batch_steps)]
+        if compression is not None:
+            command += ["--compression", str(compression)]
+        processes.append(subprocess.Popen(command, cwd=str(project_root)))
+    return processes
+
+
+def run_loopback(args):
+    """运行回环测试
+
+    Returns:
+        dict: 测试结果
+    """
+    import numpy as np
+    from src.model.q_network import build_q_model
+    from src.utils.replay_buffer import ReplayBuffer
+    from src.utils.remote_learner import RemoteLearnerServer
+
+    if args.unix:
+        address = f"unix:{os.path.join(tempfile.gettempdir(), f'snake_loopback_{os.getpid()}.sock')}"
+    else:
+        address = "127.0.0.1:0"
+    server = RemoteLearnerServer(address, max_inflight=args.max_inflight, queue_batches=args.queue_batches,
+                                 compression=args.compression, expected_actors=args.actors)
+    model = build_q_model(Config.STATE_SIZE, Config.ACTION_SIZE)
+    weights = model.get_weights()
+    version = 0
+    server.publish(weights, version)
+    server.start()
+    ColorLogger.info(f"学习器监听 {server.address} | 执行者 {args.actors} | 每个执行者 {args.episodes} 轮")
+
+    replay_buffer = ReplayBuffer(max(Config.BATCH_SIZE, args.replay_size))
+    processes = launch_actors(server.address, args.actors, args.episodes, args.batch_steps, args.compression)
+    expected_episodes = args.actors * args.episodes
+    received = {'transitions': 0, 'batches': 0, 'episodes': 0, 'steps_in_episodes': 0}
+    versions_seen = {}
+    max_queue = 0
+    start = time.perf_counter()
+    deadline = time.time() + args.timeout
+    try:
+        while received['episodes'] < expected_episodes and time.time() < deadline:
+            if all(p.poll() is not None for p in processes) and server.connected_actors() == 0 and server.inbox.empty():
+                ColorLogger.warning("所有执行者均已退出，但未收到全部轮次")
+                break
+            max_queue = max(max_queue, server.inbox.qsize())
+            try:
+                kind, actor_id, data = server.inbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if kind == 'transitions':
+                fields, policy_version = data
+                for row in zip(fields['states'], fields['actions'], fields['rewards'],
+                               fields['next_states'], fields['dones'], fields['ends']):
+                    state, action, reward, next_state, done, end = row
+                    replay_buffer.add((state, int(action), float(reward), next_state, bool(end), bool(end and not done)))
+                received['transitions'] += len(fields['actions'])
+                received['batches'] += 1
+                versions_seen.setdefault(actor_id, set()).add(policy_version)
+                if args.learner_delay_ms > 0:
+                    time.sleep(args.learner_delay_ms / 1000)
+                if received['batches'] % args.publish_every == 0:
+                    # 模拟一次训练更新后发布新权重
+                    version += 1
+                    weights = [w + np.float32(0.001) for w in weights]
+                    server.publish(weights, version)
+            elif kind == 'episode':
+                received['episodes'] += 1
+                received['steps_in_episodes'] += data['steps']
+        elapsed = time.perf_counter() - start
+        for process in processes:
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    finally:
+        server.close()
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+
+    stats = server.snapshot_stats()
+    wire_bytes = sum(s['wire_bytes'] for s in stats.values())
+    raw_bytes = sum(s['raw_bytes'] for s in stats.values())
+    checks = {
+        "all_episodes_received": received['episodes'] == expected_episodes,
+        "transitions_match_episodes": received['transitions'] == received['steps_in_episodes'],
+        "every_actor_got_weights": len(stats) == args.actors and all(s['weights_sent'] > 0 for s in stats.values()),
+        "policy_versions_advanced": all(max(v) > 0 for v in versions_seen.values()) and len(versions_seen) == args.actors,
+        "queue_bounded": max_queue <= server.inbox.maxsize,
+        "actors_exited_cleanly": all(p.returncode == 0 for p in processes),
+    }
+    return {
+        "address": server.address,
+        "elapsed_sec": elapsed,
+        "transitions": received['transitions'],
+        "batches": received['batches'],
+        "episodes": received['episodes'],
+        "transitions_per_sec": received['transitions'] / max(elapsed, 1e-9),
+        "wire_bytes": wire_bytes,
+        "raw_bytes": raw_bytes,
+        "compression_ratio": raw_bytes / max(wire_bytes, 1),
+        "weights_published": version + 1,
+        "weight_message_bytes": max((s['weight_wire_bytes'] for s in stats.values()), default=0),
+        "max_queue": max_queue,
+        "replay_size": len(replay_buffer),
+        "per_actor": {str(actor_id): {k: v for k, v in s.items() if k != 'connected'} for actor_id, s in stats.items()},
+        "checks": checks,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="远程执行者协议本机回环测试")
+    parser.add_argument("--actors", type=int, default=2, help="执行者子进程数")
+    parser.add_argument("--episodes", type=int, default=5, help="每个执行者运行的轮数")
+    parser.add_argument("--unix", action="store_true", help="使用Unix套接字代替TCP")
+    parser.add_argument("--batch-steps", type=int, default=None, help="每批经验条数，默认Config.REMOTE_BATCH_STEPS")
+    parser.add_argument("--compression", type=int, default=None, help="zlib压缩级别，默认Config.REMOTE_COMPRESSION")
+    parser.add_argument("--max-inflight", type=int, default=None, help="每个执行者的信用数")
+    parser.add_argument("--queue-batches", type=int, default=None, help="学习器接收队列长度")
+    parser.add_argument("--publish-every", type=int, default=4, help="每接收多少批发布一次新权重")
+    parser.add_argument("--learner-delay-ms", type=float, default=0.0, help="每批的模拟处理时间(验证背压)")
+    parser.add_argument("--replay-size", type=int, default=100000, help="回放缓冲区容量")
+    parser.add_argument("--timeout", type=float, default=300.0, help="最长运行时间(秒)")
+    args = parser.parse_args()
+    args.publish_every = max(1, args.publish_every)
+
+    ColorLogger.highlight("===== 远程执行者回环测试 =====")
+    result = run_loopback(args)
+
+    print("\n" + "=" * 70)
+    print(f"  经验: {result['transitions']}条 / {result['batches']}批 | 轮次: {result['episodes']}")
+    print(f"  吞吐量: {result['transitions_per_sec']:.0f}条/秒 | 耗时: {result['elapsed_sec']:.1f}秒")
+    print(f"  传输: {result['wire_bytes'] / 1024:.1f}KB (原始{result['raw_bytes'] / 1024:.1f}KB，"
+          f"压缩比{result['compression_ratio']:.2f}) | 权重消息: {result['weight_message_bytes']}B")
+    print(f"  接收队列峰值: {result['max_queue']}")
+    for name, passed in result['checks'].items():
+        print(f"  [{'通过' if passed else '失败'}] {name}")
+    print("=" * 70)
+
+    Config.LOG_DIR.mkdir(parents=True, exist_ok=True)
+    report_path = Config.LOG_DIR / f"remote_loopback_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_path, 'w') as f:
+        json.dump({"args": vars(args), "result": result}, f, indent=2)
+    ColorLogger.success(f"测试结果已保存至: {report_path}")
+
+    if not all(result['checks'].values()):
+        ColorLogger.error("回环测试未通过")
+        sys.exit(1)
+    ColorLogger.success("回环测试通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+经验回放基准测试工具
+
+两项测试：
+- sampling: 不同缓冲区大小下，均匀采样与优先采样(求和树)每批的采样/优先级更新耗时
+- learning: 使用与trainer相同的训练流程，比较均匀回放与优先回放达到目标平均分所需的轮次
+
+用法:
+    python src/tools/replay_bench.py sampling --sizes 1000,10000,100000,1000000
+    python src/tools/replay_bench.py learning --seeds 0,1,2 --target-score 5 --max-episodes 2000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+import numpy as np
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils.replay_buffer import ReplayBuffer
+from src.utils.prioritized_replay import PrioritizedReplayBuffer
+
+
+def filled_buffer(size, prioritized):
+    """创建并直接写满随机经验的缓冲区(按数组整体赋值，避免逐条add的开销)"""
+    rng = np.random.default_rng(0)
+    buffer = ReplayBuffer(size)
+    buffer.states[:] = rng.random((size, Config.STATE_SIZE), dtype=np.float32)
+    buffer.actions[:] = rng.integers(Config.ACTION_SIZE, size=size)
+    buffer.rewards[:] = rng.random(size, dtype=np.float32)
+    buffer.next_states[:] = rng.random((size, Config.STATE_SIZE), dtype=np.float32)
+    buffer.dones[:] = rng.random(size) < 0.05
+    buffer.size = size
+    if prioritized:
+        # 已有经验以最大优先级进入求和树，再随机打散优先级
+        buffer = PrioritizedReplayBuffer(buffer)
+        buffer.update_priorities(np.arange(size), rng.exponential(size=size))
+    return buffer
+
+
+def bench_sampling(sizes, batch_size, repeats):
+    """测量不同缓冲区大小下单批采样(及优先级更新)的平均耗时(微秒)"""
+    results = []
+    for size in sizes:
+        row = {"size": size}
+        for method in ("uniform", "prioritized"):
+            buffer = filled_buffer(size, prioritized=(method == "prioritized"))
+
+            start = time.perf_counter()
+            for _ in range(repeats):
+                batch = buffer.sample_batch(batch_size)
+            row[f"{method}_sample_us"] = (time.perf_counter() - start) * 1e6 / repeats
+
+            if method == "prioritized":
+                td_errors = np.random.random((repeats, batch_size))
+                start = time.perf_counter()
+                for i in range(repeats):
+                    buffer.update_priorities(batch.indices, td_errors[i])
+                row["prioritized_update_us"] = (time.perf_counter() - start) * 1e6 / repeats
+        results.append(row)
+        print(f"  {size:>9}条: 均匀 {row['uniform_sample_us']:8.1f}us | 优先 {row['prioritized_sample_us']:8.1f}us"
+              f" + 更新 {row['prioritized_update_us']:8.1f}us")
+    return results
+
+
+def episodes_to_target(method, seed, target_score, window, max_episodes):
+    """进程池任务：按trainer的训练流程训练，返回滑动平均分首次达到目标时的轮次"""
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+    from src.utils.cpu_profile import apply_cpu_profile
+    apply_cpu_profile()
+
+    import random
+    import tensorflow as tf
+    from src.utils.device import configure_cpu_threads
+    configure_cpu_threads(1, 1)  # 每个进程单线程，避免进程池内线程争用
+
+    from src.model.q_network import QNetwork
+    from src.utils.env_handler import EnvironmentHandler
+    from src.utils.agent_trainer import AgentTrainer
+
+    random.seed(seed)
+    np.random.seed(seed)
+    tf.random.set_seed(seed)
+    start_time = time.time()
+
+    with tf.device('/CPU:0'):
+        env_handler = EnvironmentHandler(seed=seed)
+        agent = QNetwork(Config.STATE_SIZE, Config.ACTION_SIZE, Config.LEARNING_RATE)
+        replay_buffer = ReplayBuffer(Config.REPLAY_BUFFER_SIZE)
+        if method == "prioritized":
+            replay_buffer = PrioritizedReplayBuffer(replay_buffer)
+        trainer = AgentTrainer(agent, env_handler, replay_buffer, model_manager=None, logger=None)
+
+        scores = []
+        reached = None
+        for episode in range(max_episodes):
+            epsilon = max(Config.EPSILON_MIN, Config.EPSILON_INIT * (Config.EPSILON_DECAY ** episode))
+            state = env_handler.reset()
+            done = False
+            while not done:
+                action = trainer._choose_action(state, epsilon)
+                next_state, reward, done = env_handler.step(action)
+                trainer._store_experience((state, action, reward, next_state, done, env_handler.truncated))
+                trainer._experience_replay()
+                state = next_state
+            scores.append(env_handler.score)
+            if episode % Config.TARGET_UPDATE_FREQ == 0:
+                agent.update_target_network()
+            if len(scores) >= window and np.mean(scores[-window:]) >= target_score:
+                reached = episode + 1
+                break
+
+    return {"method": method, "seed": seed, "episodes": reached,
+            "final_avg_score": float(np.mean(scores[-window:])), "train_seconds": time.time() - start_time}
+
+
+def bench_learning(seeds, target_score, window, max_episodes, workers):
+    """并行比较均匀回放与优先回放达到目标分数所需的轮次"""
+    tasks = [(method, seed) for method in ("uniform", "prioritized") for seed in seeds]
+    results = []
+    # 使用spawn避免子进程继承父进程的TensorFlow运行时状态
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(episodes_to_target, method, seed, target_score, window, max_episodes): (method, seed)
+                   for method, seed in tasks}
+        for future in as_completed(futures):
+            method, seed = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                ColorLogger.error(f"{method}(种子{seed})运行失败: {str(e)}")
+                continue
+            results.append(result)
+            reached = result["episodes"] if result["episodes"] is not None else f">{max_episodes}"
+            print(f"  {method:<12} 种子{seed}: {reached}轮达到目标 | 最终平均分 {result['final_avg_score']:.2f}")
+
+    print("\n" + "=" * 60)
+    for method in ("uniform", "prioritized"):
+        runs = [r for r in results if r["method"] == method]
+        episodes = [r["episodes"] if r["episodes"] is not None else max_episodes for r in runs]
+        if episodes:
+            failed = sum(r["episodes"] is None for r in runs)
+            print(f"  {method:<12} 平均 {np.mean(episodes):8.1f}轮 | 中位数 {np.median(episodes):8.1f}轮 | 未达到 {failed}/{len(runs)}")
+    print("=" * 60)
+    return results
+
+
+def parse_int_list(text):
+    return [int(x) for x in text.split(",") if x.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="经验回放基准测试")
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    sampling = subparsers.add_parser("sampling", help="采样耗时随缓冲区大小的变化")
+    sampling.add_argument("--sizes", type=str, default="1000,10000,100000,1000000", help="缓冲区大小")
+    sampling.add_argument("--batch-size", type=int, default=Config.BATCH_SIZE, help="批量大小")
+    sampling.add_argument("--repeats", type=int, default=2000, help="每种配置的采样次数")
+
+    learning = subparsers.add_parser("learning", help="达到目标分数所需的训练轮次")
+    learning.add_argument("--seeds", type=str, default="0,1,2", help="随机种子")
+    learning.add_argument("--target-score", type=float, default=5.0, help="目标平均分")
+    learning.add_argument("--window", type=int, default=50, help="滑动平均窗口(轮)")
+    learning.add_argument("--max-episodes", type=int, default=2000, help="每次运行的最大轮次")
+    learning.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1), help="并行进程数")
+    args = parser.parse_args()
+
+    ColorLogger.highlight(f"===== 经验回放基准测试: {args.mode} =====")
+    if args.mode == "sampling":
+        results = bench_sampling(parse_int_list(args.sizes), args.batch_size, args.repeats)
+    else:
+        results = bench_learning(parse_int_list(args.seeds), args.target_score, args.window,
+                                 args.max_episodes, args.workers)
+
+    Config.LOG_DIR.mkdir(parents=True, exist_ok=True)
+    report_path = Config.LOG_DIR / f"replay_bench_{args.mode}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_path, 'w') as f:
+        json.dump({"args": vars(args), "results": results}, f, indent=2)
+    ColorLogger.success(f"测试结果已保存至: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+超参数扫描工具
+
+按网格或随机搜索生成试验，每个试验在独立的进程中运行完整的训练(src/trainer/trainer.py)：
+- 每个试验有自己的配置文件(通过环境变量SNAKE_CONFIG传入)与输出目录(模型、日志、TensorBoard)
+- 每个试验固定在一组互不重叠的CPU上(cpu.CPU_AFFINITY)，TensorFlow线程数与之匹配，并行试验之间互不干扰
+- 最多同时运行的试验数由可用CPU数与--cpus-per-trial决定
+
+结束后按 每CPU小时得分(最后--score-window轮的平均得分 / 消耗的CPU小时)排名输出对比表，
+结果保存为扫描目录下的JSON报告。
+
+参数写法(--param可重复，键为"配置段.键"，配置段唯一时可省略):
+    training.BATCH_SIZE=32,64,128     候选值列表(网格与随机搜索均可用)
+    LEARNING_RATE=log:1e-4:1e-2       对数均匀分布(仅随机搜索)
+    GAMMA=uniform:0.9:0.99            均匀分布(仅随机搜索)
+    TARGET_UPDATE_FREQ=int:5:20       整数均匀分布，含两端(仅随机搜索)
+    HIDDEN_UNITS=[64,32],[128,64]     取值按JSON解析，列表取值用方括号
+
+用法:
+    python src/tools/sweep.py --param BATCH_SIZE=32,64 --param LEARNING_RATE=0.001,0.0005 --episodes 300
+    python src/tools/sweep.py --method random --trials 8 --param LEARNING_RATE=log:1e-4:1e-2 \\
+        --param EPSILON_DECAY=uniform:0.99:0.999 --cpus-per-trial 2
+"""
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import datetime
+import itertools
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.utils.config import Config, config_loader
+from src.utils.logger import ColorLogger
+
+RESULT_MARKER = "SWEEP_RESULT "
+DISTRIBUTIONS = ("log", "uniform", "int")
+
+
+def parse_value(text):
+    """按JSON解析单个取值(数字、布尔、列表等)，失败时作为字符串"""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def split_values(spec):
+    """按顶层逗号拆分候选值(方括号内的逗号属于列表取值，如 [64,32],[128,64])"""
+    values, depth, current = [], 0, ""
+    for char in spec:
+        depth += {"[": 1, "]": -1}.get(char, 0)
+        if char == "," and depth == 0:
+            values.append(current)
+            current = ""
+        else:
+            current += char
+    values.append(current)
+    return [value.strip() for value in values if value.strip()]
+
+
+def resolve_key(key, config):
+    """把"配置段.键"或"键"解析为(配置段, 键)"""
+    if "." in key:
+        section, name = key.split(".", 1)
+        return section, name
+    sections = [section for section, values in config.items() if isinstance(values, dict) and key in values]
+    if len(sections) != 1:
+        raise ValueError(f"无法确定参数{key}所在的配置段(候选: {sections or '无'})，请写成 配置段.{key}")
+    return sections[0], key
+
+
+def parse_param(text, config):
+    """解析一条--param
+
+    Returns:
+        tuple: ((配置段, 键), 取值列表或(分布, 下限, 上限))
+    """
+    key, separator, spec = text.partition("=")
+    if not separator:
+        raise ValueError(f"无效的参数: {text} (应为 键=取值)")
+    head = spec.split(":", 1)[0]
+    if head in DISTRIBUTIONS:
+        _, low, high = spec.split(":")
+        return resolve_key(key.strip(), config), (head, float(low), float(high))
+    return resolve_key(key.strip(), config), [parse_value(v) for v in split_values(spec)]
+
+
+def generate_trials(params, method, trials, seed):
+    """生成试验的参数组合
+
+    Args:
+        params (dict): (配置段, 键) -> 取值列表或分布
+        method (str): grid或random
+        trials (int): 随机搜索的试验数
+        seed (int): 随机搜索的种子
+
+    Returns:
+        list: 每个试验一个字典 (配置段, 键) -> 取值
+    """
+    import numpy as np
+
+    keys = list(params)
+    if method == "grid":
+        for key, spec in params.items():
+            if isinstance(spec, tuple):
+                raise ValueError(f"网格搜索不支持分布取值: {key[0]}.{key[1]}")
+        return [dict(zip(keys, values)) for values in itertools.product(*(params[k] for k in keys))]
+
+    rng = np.random.default_rng(seed)
+    results = []
+    for _ in range(trials):
+        trial = {}
+        for key, spec in params.items():
+            if not isinstance(spec, tuple):
+                trial[key] = spec[int(rng.integers(len(spec)))]
+                continue
+            distribution, low, high = spec
+            if distribution == "log":
+                trial[key] = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+            elif distribution == "uniform":
+                trial[key] = float(rng.uniform(low, high))
+            else:
+                trial[key] = int(rng.integers(int(low), int(high) + 1))
+        results.append(trial)
+    return results
+
+
+def available_cpu_sets(cpus_per_trial, workers):
+    """把本进程可用的CPU划分为互不重叠的若干组，每组运行一个试验"""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+    else:
+        cpus = list(range(os.cpu_count() or 1))
+    slots = max(1, len(cpus) // cpus_per_trial)
+    if workers:
+        slots = min(slots, workers)
+    return [cpus[i * cpus_per_trial:(i + 1) * cpus_per_trial] or cpus for i in range(slots)]
+
+
+def write_trial_config(base_config, trial, trial_dir, cpus, episodes):
+    """写入试验的配置文件：覆盖扫描参数，并把输出目录与CPU绑定指向该试验"""
+    config = json.loads(json.dumps(base_config))
+    for (section, key), value in trial.items():
+        config.setdefault(section, {})[key] = value
+    if episodes is not None:
+        config.setdefault("training", {})["EPISODES"] = episodes
+    config.setdefault("model", {}).update({
+        "MODEL_DIR": str(trial_dir / "models"),
+        "LOG_DIR": str(trial_dir / "logs"),
+        "TENSORBOARD_LOG_DIR": str(trial_dir / "logs" / "tensorboard"),
+    })
+    config.setdefault("cpu", {}).update({
+        "CPU_AFFINITY": ",".join(str(cpu) for cpu in cpus),
+        "INTRA_OP_THREADS": len(cpus),
+        "INTER_OP_THREADS": 1,
+    })
+    path = trial_dir / "config.json"
+    with open(path, 'w') as f:
+        json.dump(config, f, indent=4)
+    return path
+
+
+def run_trial(index, trial, sweep_dir, base_config, cpu_sets, args):
+    """在子进程中运行一个试验(占用一组CPU，结束后归还)
+
+    Returns:
+        dict: 试验结果
+    """
+    cpus = cpu_sets.get()
+    trial_dir = sweep_dir / f"trial_{index:03d}"
+    trial_dir.mkdir(parents=True, exist_ok=True)
+    params = {f"{section}.{key}": value for (section, key), value in trial.items()}
+    result = {"trial": index, "params": params, "cpus": cpus, "dir": str(trial_dir), "status": "failed"}
+    try:
+        config_path = write_trial_config(base_config, trial, trial_dir, cpus, args.episodes)
+        env = dict(os.environ, SNAKE_CONFIG=str(config_path), TF_CPP_MIN_LOG_LEVEL="2")
+        command = [sys.executable, str(Path(__file__).resolve()), "--worker", "--score-window", str(args.score_window)]
+        start = time.perf_counter()
+        process = subprocess.run(command, env=env, cwd=str(project_root), stdout=subprocess.PIPE,
+                                 stderr=subprocess.STDOUT, text=True, timeout=args.trial_timeout)
+        with open(trial_dir / "train.log", 'w', encoding='utf-8') as f:
+            f.write(process.stdout)
+        result["wall_seconds"] = time.perf_counter() - start
+        for line in process.stdout.splitlines():
+            if line.startswith(RESULT_MARKER):
+                result.update(json.loads(line[len(RESULT_MARKER):]))
+                result["status"] = "ok"
+        if result["status"] != "ok":
+            result["error"] = f"退出码{process.returncode}，详见{trial_dir / 'train.log'}"
+    except subprocess.TimeoutExpired:
+        result["status"] = "timeout"
+        result["error"] = f"超过{args.trial_timeout}秒"
+    finally:
+        cpu_sets.put(cpus)
+    return result
+
+
+def cpu_seconds():
+    """本进程与已结束(已被回收)的子进程消耗的CPU时间(用户态+内核态，秒)
+
+    试验中的后台评估进程与多进程执行者都是训练进程的子进程，训练结束时已被join回收，
+    计入os.times()的children_user/children_system；Windows上这两项为0，只统计本进程。
+    """
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def run_worker(score_window):
+    """试验子进程入口：按SNAKE_CONFIG指定的配置从头训练，结果以RESULT_MARKER开头的单行JSON输出"""
+    cpu_start = cpu_seconds()
+    import numpy as np
+    from src.trainer.trainer import main as train_main
+
+    result = train_main(load_prev_model=False)
+    histories = result[0] if Config.NUM_AGENTS > 1 else [result[0]]
+    scores = [float(np.mean(history[-score_window:])) for history in histories if len(history) > 0]
+    best = [float(np.max(history)) for history in histories if len(history) > 0]
+    print(RESULT_MARKER + json.dumps({
+        "score": float(np.mean(scores)) if scores else 0.0,
+        "best_score": max(best) if best else 0.0,
+        "episodes": max((len(history) for history in histories), default=0),
+        "cpu_seconds": cpu_seconds() - cpu_start,
+    }), flush=True)
+    os._exit(0)  # 跳过TensorFlow与后台线程的退出清理
+
+
+def main():
+    parser = argparse.ArgumentParser(description="超参数扫描(每个试验一个进程)")
+    parser.add_argument("--param", action="append", default=[], help="扫描参数，如 BATCH_SIZE=32,64 或 LEARNING_RATE=log:1e-4:1e-2")
+    parser.add_argument("--method", type=str, default="grid", choices=["grid", "random"], help="网格或随机搜索")
+    parser.add_argument("--trials", type=int, default=8, help="随机搜索的试验数")
+    parser.add_argument("--seed", type=int, default=0, help="随机搜索的种子")
+    parser.add_argument("--episodes", type=int, default=None, help="每个试验的训练轮数，默认使用配置中的EPISODES")
+    parser.add_argument("--cpus-per-trial", type=int, default=1, help="每个试验绑定的CPU数")
+    parser.add_argument("--workers", type=int, default=None, help="同时运行的试验数上限，默认 可用CPU数 / cpus-per-trial")
+    parser.add_argument("--score-window", type=int, default=100, help="以最后多少轮的平均得分作为试验得分")
+    parser.add_argument("--trial-timeout", type=float, default=None, help="单个试验的最长运行时间(秒)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.score_window)
+        return
+    if not args.param:
+        parser.error("至少需要一个--param")
+
+    base_config = config_loader.load_config()
+    params = dict(parse_param(text, base_config) for text in args.param)
+    trials = generate_trials(params, args.method, args.trials, args.seed)
+    cpu_sets = available_cpu_sets(max(1, args.cpus_per_trial), args.workers)
+    free_cpu_sets = queue.Queue()
+    for cpus in cpu_sets:
+        free_cpu_sets.put(cpus)
+
+    sweep_dir = Config.LOG_DIR.resolve() / "sweeps" / f"sweep_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    sweep_dir.mkdir(parents=True, exist_ok=True)
+    ColorLogger.highlight("===== 超参数扫描 =====")
+    ColorLogger.info(f"{args.method}搜索 | 试验数: {len(trials)} | 并行: {len(cpu_sets)} "
+                     f"(每个试验{args.cpus_per_trial}个CPU) | 输出目录: {sweep_dir}")
+
+    results = []
+    # 线程只负责启动与等待试验进程，训练都在各自绑定CPU的子进程中进行
+    with ThreadPoolExecutor(max_workers=len(cpu_sets)) as pool:
+        futures = [pool.submit(run_trial, i, trial, sweep_dir, base_config, free_cpu_sets, args)
+                   for i, trial in enumerate(trials)]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result["status"] == "ok":
+                result["cpu_hours"] = result["cpu_seconds"] / 3600
+                result["score_per_cpu_hour"] = result["score"] / max(result["cpu_hours"], 1e-9)
+                print(f"  完成 #{result['trial']} {result['params']}: 得分 {result['score']:.2f}, "
+                      f"CPU {result['cpu_seconds']:.0f}秒")
+            else:
+                ColorLogger.error(f"试验#{result['trial']} {result['params']} 失败: {result.get('error')}")
+
+    ranked = sorted((r for r in results if r["status"] == "ok"), key=lambda r: -r["score_per_cpu_hour"])
+    failed = sorted((r for r in results if r["status"] != "ok"), key=lambda r: r["trial"])
+
+    print("\n" + "=" * 100)
+    print(f"  {'排名':<4} {'试验':<6} {'得分':<8} {'最高':<6} {'轮次':<6} {'CPU小时':<9} {'墙钟(秒)':<10} {'得分/CPU小时':<14} 参数")
+    for rank, r in enumerate(ranked, 1):
+        print(f"  {rank:<6} #{r['trial']:<5} {r['score']:<8.2f} {r['best_score']:<6.0f} {r['episodes']:<6} "
+              f"{r['cpu_hours']:<9.3f} {r['wall_seconds']:<10.0f} {r['score_per_cpu_hour']:<14.1f} {r['params']}")
+    for r in failed:
+        print(f"  {'-':<6} #{r['trial']:<5} {r['status']:<8} {r['params']}")
+    print("=" * 100)
+
+    report_path = sweep_dir / "sweep_report.json"
+    with open(report_path, 'w') as f:
+        json.dump({"args": vars(args), "ranked": ranked, "failed": failed}, f, indent=2, ensure_ascii=False)
+    ColorLogger.success(f"扫描结果已保存至: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+训练控制工具
+
+向正在运行的训练进程发送控制命令(代替原先的键盘热键，可在SSH会话与容器中使用)：
+- stop: 本轮结束后保存并退出训练
+- save: 本轮结束时保存当前模型
+- dump: 本轮结束时导出当前指标(写入LOG_DIR，并打印导出内容)
+- verbosity N: 切换日志详细程度(0只输出警告与错误，1正常，2额外输出每轮指标)
+- status: 查看最近一轮的状态摘要(不打断训练)
+
+默认通过控制套接字(control.SOCKET)发送；control.SOCKET为"auto"且LOG_DIR下只有一个训练进程时自动选择。
+--signal时改为向--pid指定的进程发送信号(stop=SIGTERM，save=SIGUSR1，dump=SIGUSR2，verbosity=SIGHUP循环切换)。
+
+用法:
+    python src/tools/trainctl.py save
+    python src/tools/trainctl.py verbosity 2 --pid 12345
+    python src/tools/trainctl.py dump --socket unix:/tmp/snake_control.sock
+    python src/tools/trainctl.py stop --pid 12345 --signal
+"""
+import os
+import sys
+import json
+import signal
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils import remote_protocol as protocol
+
+SIGNALS = {"stop": "SIGTERM", "save": "SIGUSR1", "dump": "SIGUSR2", "verbosity": "SIGHUP"}
+
+
+def find_control_socket(pid=None):
+    """确定控制套接字地址(与TrainingMonitor的解析规则一致)"""
+    if Config.CONTROL_SOCKET and Config.CONTROL_SOCKET != "auto":
+        return Config.CONTROL_SOCKET
+    if not Config.CONTROL_SOCKET:
+        raise ValueError("control.SOCKET为空，训练进程未开启控制套接字，请使用--signal")
+    if pid is not None:
+        return f"unix:{Config.LOG_DIR / f'control_{pid}.sock'}"
+    candidates = sorted(Config.LOG_DIR.glob("control_*.sock"))
+    if len(candidates) == 1:
+        return f"unix:{candidates[0]}"
+    if not candidates:
+        raise ValueError(f"{Config.LOG_DIR}下没有控制套接字，训练进程是否在运行?")
+    pids = ", ".join(path.stem[len("control_"):] for path in candidates)
+    raise ValueError(f"找到多个训练进程({pids})，请用--pid指定")
+
+
+def send_command(address, command, timeout):
+    """发送一条控制命令并返回回复"""
+    sock = protocol.connect(address, timeout=timeout)
+    try:
+        sock.settimeout(timeout)
+        sock.sendall((command + "\n").encode('utf-8'))
+        reply = sock.makefile('r', encoding='utf-8').readline()
+    finally:
+        sock.close()
+    if not reply:
+        raise ConnectionError("训练进程没有回复")
+    return json.loads(reply)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="训练控制工具")
+    parser.add_argument("command", choices=["stop", "save", "dump", "verbosity", "status"], help="控制命令")
+    parser.add_argument("level", nargs="?", type=int, choices=[0, 1, 2], help="verbosity的日志详细程度")
+    parser.add_argument("--pid", type=int, default=None, help="训练进程号")
+    parser.add_argument("--socket", type=str, default=None, help="控制套接字地址，默认由control.SOCKET确定")
+    parser.add_argument("--signal", action="store_true", help="向--pid发送信号代替控制套接字")
+    parser.add_argument("--timeout", type=float, default=90.0, help="等待回复的最长时间(秒)")
+    args = parser.parse_args()
+
+    if args.signal:
+        if args.pid is None:
+            parser.error("--signal需要--pid")
+        if args.command not in SIGNALS or not hasattr(signal, SIGNALS[args.command]):
+            parser.error(f"当前平台不支持以信号发送{args.command}")
+        os.kill(args.pid, getattr(signal, SIGNALS[args.command]))
+        ColorLogger.success(f"已向进程{args.pid}发送{SIGNALS[args.command]}")
+        return
+    if args.command == "verbosity" and args.level is None:
+        parser.error("verbosity需要日志详细程度(0/1/2)")
+
+    command = args.command if args.level is None else f"{args.command} {args.level}"
+    try:
+        address = args.socket or find_control_socket(args.pid)
+        reply = send_command(address, command, args.timeout)
+    except (ValueError, OSError) as e:
+        ColorLogger.error(f"发送控制命令失败: {str(e)}")
+        sys.exit(1)
+
+    if not reply.get('ok'):
+        ColorLogger.error(reply.get('message', "命令执行失败"))
+        sys.exit(1)
+    ColorLogger.success(reply.get('message', ""))
+    for key in ('status', 'dump'):
+        if key in reply:
+            print(json.dumps(reply[key], indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
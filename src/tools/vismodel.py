@@ -1,21 +1,29 @@
-import tensorflow as tf
-from tensorflow.keras.models import load_model
 import os
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import tensorflow as tf
+from src.utils.model_catalog import ModelCatalog
+from src.model.q_network import load_q_model
 
 def simple_visualize_model(model_path):
     """可视化模型结构"""
-    model = load_model(model_path)
+    model = load_q_model(model_path)
     print("=" * 50)
     print(f"模型结构摘要 - {os.path.basename(model_path)}")
     print("=" * 50)
     model.summary()
 
 def get_available_models(folder_path):
-    """扫描文件夹内的.keras文件，排除final_snake_model.keras"""
-    keras_files = []
+    """扫描文件夹内的.keras与只含权重的.npz文件，排除final_snake_model.keras(有模型索引时直接查询索引)"""
+    keras_files = [str(entry['path']) for entry in ModelCatalog(folder_path).entries(kinds=None)
+                   if entry['path'].suffix in ('.keras', '.npz') and entry['name'] != 'final_snake_model.keras']
+    if keras_files:
+        return keras_files
     if os.path.exists(folder_path) and os.path.isdir(folder_path):
         for file in os.listdir(folder_path):
-            if file.endswith('.keras') and file != 'final_snake_model.keras':
+            if file.endswith(('.keras', '.npz')) and file != 'final_snake_model.keras':
                 keras_files.append(os.path.join(folder_path, file))
     return keras_files
 
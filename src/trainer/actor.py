@@ -0,0 +1,213 @@
+"""
+远程执行者
+
+连接到学习器(trainer.py在distributed.REMOTE_LISTEN非空时作为学习器监听)，在本地环境中以学习器分配的
+固定探索率运行，经验按批量经压缩后发送给学习器，并接收学习器推送的新权重。
+执行者用完信用后暂停交互，等待学习器归还信用(背压)；学习器关闭连接后执行者退出。
+
+用法:
+    python -m src.trainer.actor --learner 127.0.0.1:5555
+    python -m src.trainer.actor --learner unix:/tmp/snake_learner.sock --epsilon 0.1 --max-episodes 100
+"""
+import os
+import sys
+import time
+import random
+import select
+import socket
+import argparse
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+# oneDNN与CPU亲和性需在导入TensorFlow之前设置
+from src.utils.cpu_profile import apply_cpu_profile
+apply_cpu_profile()
+
+import numpy as np
+
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils import remote_protocol as protocol
+
+
+class RemoteActor:
+    """通过套接字与学习器通信的执行者"""
+
+    def __init__(self, address, actor_id=-1, epsilon=None, batch_steps=None, compression=None, connect_timeout=30.0):
+        """连接学习器并完成握手
+
+        Args:
+            address (str): 学习器地址("host:port"或"unix:/path")
+            actor_id (int): 请求的执行者编号，-1表示由学习器分配
+            epsilon (float): 固定探索率，默认使用学习器分配的值
+            batch_steps (int): 每批发送的经验条数，默认Config.REMOTE_BATCH_STEPS
+            compression (int): zlib压缩级别，默认Config.REMOTE_COMPRESSION
+            connect_timeout (float): 学习器尚未启动时重试连接的最长时间(秒)
+        """
+        self.batch_steps = max(1, Config.REMOTE_BATCH_STEPS if batch_steps is None else batch_steps)
+        self.compression = Config.REMOTE_COMPRESSION if compression is None else compression
+        self.sock = self._connect(address, connect_timeout)
+        protocol.send_message(self.sock, protocol.HELLO, protocol.encode_json(
+            {'actor_id': actor_id, 'host': socket.gethostname(), 'pid': os.getpid()}))
+        message_type, payload, _ = protocol.recv_message(self.sock)
+        if message_type != protocol.WELCOME:
+            raise protocol.ProtocolError(f"期望WELCOME，收到{protocol.MESSAGE_NAMES.get(message_type, message_type)}")
+        welcome = protocol.decode_json(payload)
+        if (welcome['state_size'], welcome['action_size']) != (Config.STATE_SIZE, Config.ACTION_SIZE):
+            raise protocol.ProtocolError(
+                f"状态/动作维度与学习器不一致: 学习器({welcome['state_size']}, {welcome['action_size']})，"
+                f"本地({Config.STATE_SIZE}, {Config.ACTION_SIZE})")
+
+        self.actor_id = welcome['actor_id']
+        self.epsilon = welcome['epsilon'] if epsilon is None else epsilon
+        self.seed = welcome['seed']
+        self.credits = welcome['credits']
+        self.version = -1
+        self.wire_bytes = 0
+        self.raw_bytes = 0
+
+        import tensorflow as tf
+        from src.utils.device import configure_cpu_threads
+        configure_cpu_threads(1, 1)  # 每个执行者单线程，执行者数量按核心数扩展
+        from src.model.q_network import build_q_model
+        from src.utils.env_handler import EnvironmentHandler
+
+        random.seed(self.seed)
+        np.random.seed(self.seed)
+        tf.random.set_seed(self.seed)
+        self.env_handler = EnvironmentHandler(seed=self.seed)
+        self.model = build_q_model(Config.STATE_SIZE, Config.ACTION_SIZE, welcome['hidden_units'], welcome['batch_norm'])
+        ColorLogger.info(f"执行者{self.actor_id}已连接 {address} | ε={self.epsilon:.4f} | 种子 {self.seed} | "
+                         f"每批{self.batch_steps}条 | 信用 {self.credits}")
+
+    @staticmethod
+    def _connect(address, timeout):
+        """连接学习器，学习器尚未就绪时每秒重试直到超时"""
+        deadline = time.time() + timeout
+        while True:
+            try:
+                return protocol.connect(address, timeout=5.0)
+            except OSError as e:
+                if time.time() >= deadline:
+                    raise ConnectionError(f"无法连接学习器 {address}: {str(e)}")
+                time.sleep(1.0)
+
+    def _handle(self, message_type, payload):
+        """处理学习器发来的一条消息
+
+        Returns:
+            bool: 学习器要求结束时返回False
+        """
+        if message_type == protocol.CREDIT:
+            self.credits += protocol.decode_credit(payload)
+        elif message_type == protocol.WEIGHTS:
+            weights, version = protocol.decode_weights(payload)
+            self.model.set_weights(weights)
+            self.version = version
+        elif message_type == protocol.BYE:
+            return False
+        else:
+            raise protocol.ProtocolError(f"意外的消息类型: {message_type}")
+        return True
+
+    def _poll(self, block):
+        """处理已到达的消息；block为True时至少等待一条"""
+        while block or select.select([self.sock], [], [], 0)[0]:
+            message_type, payload, _ = protocol.recv_message(self.sock)
+            if not self._handle(message_type, payload):
+                raise ConnectionAbortedError("学习器结束了训练")
+            block = False
+
+    def _send_batch(self, batch):
+        """发送一批经验，信用用完时阻塞等待学习器归还"""
+        while self.credits <= 0:
+            self._poll(block=True)
+        states, actions, rewards, next_states, dones, ends = zip(*batch)
+        payload = protocol.encode_transitions(np.stack(states), actions, rewards, np.stack(next_states),
+                                              dones, ends, self.version)
+        self.wire_bytes += protocol.send_message(self.sock, protocol.TRANSITIONS, payload, self.compression)
+        self.raw_bytes += protocol.HEADER.size + len(payload)
+        self.credits -= 1
+        batch.clear()
+        self._poll(block=False)  # 学习器只在收到批量后回复信用与权重，因此每批检查一次即可
+
+    def _close_gracefully(self):
+        """发送BYE后半关闭连接，继续处理学习器对最后几批经验的回复，直到学习器关闭连接"""
+        protocol.send_message(self.sock, protocol.BYE)
+        self.sock.shutdown(socket.SHUT_WR)
+        try:
+            while True:
+                self._handle(*protocol.recv_message(self.sock)[:2])
+        except protocol.ProtocolError:
+            pass
+
+    def _choose_action(self, state):
+        if self.version < 0 or random.random() < self.epsilon:  # 收到第一份权重之前随机探索
+            return random.randint(0, Config.ACTION_SIZE-1)
+        return int(np.argmax(self.model(state[np.newaxis, :], training=False).numpy()[0]))
+
+    def run(self, max_episodes=0):
+        """与环境交互直到学习器断开或达到max_episodes轮(0表示不限)
+
+        Returns:
+            int: 完成的轮数
+        """
+        episodes, total_steps, start = 0, 0, time.time()
+        batch = []
+        try:
+            while max_episodes <= 0 or episodes < max_episodes:
+                start_time = time.time()
+                state = self.env_handler.reset()
+                total_reward, steps, done = 0, 0, False
+                while not done:
+                    action = self._choose_action(state)
+                    next_state, reward, done = self.env_handler.step(action)
+                    truncated = self.env_handler.truncated
+                    batch.append((state, action, reward, next_state, done and not truncated, done))
+                    total_reward += reward
+                    steps += 1
+                    state = next_state
+                    if len(batch) >= self.batch_steps:
+                        self._send_batch(batch)
+
+                # 先发出本轮剩余的经验，保证学习器汇总单轮统计时已收到其全部经验
+                if batch:
+                    self._send_batch(batch)
+                stats = {'score': self.env_handler.score, 'total_reward': float(total_reward), 'steps': steps,
+                         'epsilon': self.epsilon, 'episode_time': time.time() - start_time}
+                protocol.send_message(self.sock, protocol.EPISODE, protocol.encode_json(stats))
+                episodes += 1
+                total_steps += steps
+            self._close_gracefully()
+        except (ConnectionAbortedError, protocol.ProtocolError, OSError) as e:
+            ColorLogger.warning(f"执行者{self.actor_id}与学习器的连接已结束: {str(e)}")
+        finally:
+            self.sock.close()
+            self.env_handler.close()
+
+        elapsed = max(time.time() - start, 1e-9)
+        ratio = self.raw_bytes / max(self.wire_bytes, 1)
+        ColorLogger.info(f"执行者{self.actor_id}退出 | {episodes}轮 {total_steps}步 ({total_steps / elapsed:.0f}步/秒) | "
+                         f"发送{self.wire_bytes / 1024:.0f}KB，压缩比{ratio:.2f} | 权重版本 {self.version}")
+        return episodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="远程执行者")
+    parser.add_argument("--learner", type=str, required=True, help="学习器地址(host:port或unix:/path)")
+    parser.add_argument("--actor-id", type=int, default=-1, help="请求的执行者编号，-1表示由学习器分配")
+    parser.add_argument("--epsilon", type=float, default=None, help="固定探索率，默认由学习器分配")
+    parser.add_argument("--batch-steps", type=int, default=None, help="每批发送的经验条数")
+    parser.add_argument("--compression", type=int, default=None, help="zlib压缩级别(0-9)，0表示不压缩")
+    parser.add_argument("--max-episodes", type=int, default=0, help="运行的轮数，0表示直到学习器断开")
+    parser.add_argument("--connect-timeout", type=float, default=30.0, help="等待学习器启动的最长时间(秒)")
+    args = parser.parse_args()
+
+    actor = RemoteActor(args.learner, args.actor_id, args.epsilon, args.batch_steps, args.compression,
+                        args.connect_timeout)
+    actor.run(args.max_episodes)
+
+
+if __name__ == "__main__":
+    main()
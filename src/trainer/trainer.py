@@ -1,15 +1,21 @@
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent.parent))
+
+# oneDNN与CPU亲和性需在导入TensorFlow之前设置
+from src.utils.cpu_profile import apply_cpu_profile
+apply_cpu_profile()
+
 import tensorflow as tf
 
-from src.model.q_network import QNetwork
+from src.model.q_network import QNetwork, StackedQNetwork
 from src.utils.logger import ColorLogger
 from src.utils.config import Config
 from src.utils.device import get_training_device
 from src.utils.agent_trainer import AgentTrainer
+from src.utils.stacked_trainer import StackedAgentTrainer
 from src.utils.model_manager import ModelManager
-from src.utils.replay_buffer import ReplayBuffer
+from src.utils.replay_buffer import create_replay_buffer
 from src.utils.train_log import TrainingLogger
 from src.utils.env_handler import EnvironmentHandler
 
@@ -21,11 +27,19 @@ def main(render_mode=None, load_prev_model=True):
     device = get_training_device()
     ColorLogger.info(f"训练设备: {device}")
     
+    if Config.NUM_AGENTS > 1:
+        return train_stacked(device, render_mode)
+    if Config.REMOTE_LISTEN:
+        return train_remote(device, load_prev_model)
+    if Config.NUM_ACTORS > 0:
+        return train_distributed(device, load_prev_model)
+
     with tf.device(device):
         # 初始化核心组件
         env_handler = EnvironmentHandler(render_mode=render_mode)
         agent = QNetwork(Config.STATE_SIZE, Config.ACTION_SIZE, Config.LEARNING_RATE)
-        replay_buffer = ReplayBuffer(Config.REPLAY_BUFFER_SIZE)
+        replay_buffer = create_replay_buffer(resume=load_prev_model)
+        replay_buffer.report_memory_usage()
         
         # 初始化辅助模块
         model_manager = ModelManager(agent)
@@ -50,6 +64,64 @@ def main(render_mode=None, load_prev_model=True):
         env_handler.close()
         return score_history, loss_history, episodes_x
 
+def train_stacked(device, render_mode=None):
+    """多智能体批量训练入口：K个智能体使用不同随机种子，共享一次融合的梯度更新"""
+    seeds = [Config.AGENT_SEED_BASE + k for k in range(Config.NUM_AGENTS)]
+    ColorLogger.info(f"多智能体批量训练模式: {Config.NUM_AGENTS}个智能体，种子 {seeds}")
+
+    with tf.device(device):
+        env_handlers = [EnvironmentHandler(render_mode=render_mode, seed=seed) for seed in seeds]
+        agent = StackedQNetwork(Config.STATE_SIZE, Config.ACTION_SIZE, Config.LEARNING_RATE,
+                                Config.NUM_AGENTS, seeds=seeds)
+        replay_buffers = [create_replay_buffer(name=f"agent{k}", resume=False) for k in range(Config.NUM_AGENTS)]
+        replay_buffers[0].report_memory_usage()
+        loggers = [TrainingLogger(run_name=f"agent{k}") for k in range(Config.NUM_AGENTS)]
+
+        trainer = StackedAgentTrainer(agent, env_handlers, replay_buffers, loggers)
+        score_history, loss_history = trainer.train()
+
+        for env_handler in env_handlers:
+            env_handler.close()
+        return score_history, loss_history
+
+def train_distributed(device, load_prev_model=True):
+    """多进程执行者训练入口：NUM_ACTORS个执行者进程写入共享内存回放分片，本进程作为学习器"""
+    from src.utils.distributed_trainer import DistributedTrainer
+    ColorLogger.info(f"多进程执行者模式: {Config.NUM_ACTORS}个执行者进程")
+
+    with tf.device(device):
+        env_handler = EnvironmentHandler()
+        agent = QNetwork(Config.STATE_SIZE, Config.ACTION_SIZE, Config.LEARNING_RATE)
+        model_manager = ModelManager(agent)
+        logger = TrainingLogger()
+        start_episode = model_manager.load_latest_model(load_prev_model)
+
+        trainer = DistributedTrainer(agent, env_handler, model_manager, logger)
+        trainer.replay_buffer.report_memory_usage()
+        score_history, loss_history, episodes_x = trainer.train(start_episode)
+
+        env_handler.close()
+        return score_history, loss_history, episodes_x
+
+def train_remote(device, load_prev_model=True, address=None):
+    """远程执行者训练入口：本进程作为学习器监听REMOTE_LISTEN，执行者通过套接字连接并发送经验"""
+    from src.utils.remote_learner import RemoteLearnerTrainer
+
+    with tf.device(device):
+        env_handler = EnvironmentHandler()
+        agent = QNetwork(Config.STATE_SIZE, Config.ACTION_SIZE, Config.LEARNING_RATE)
+        replay_buffer = create_replay_buffer(resume=load_prev_model)
+        replay_buffer.report_memory_usage()
+        model_manager = ModelManager(agent)
+        logger = TrainingLogger()
+        start_episode = model_manager.load_latest_model(load_prev_model)
+
+        trainer = RemoteLearnerTrainer(agent, env_handler, replay_buffer, model_manager, logger, address=address)
+        score_history, loss_history, episodes_x = trainer.train(start_episode)
+
+        env_handler.close()
+        return score_history, loss_history, episodes_x
+
 if __name__ == "__main__":
     config = Config()  
     main()  
@@ -0,0 +1,138 @@
+import queue
+import random
+import threading
+import time
+import numpy as np
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.model.q_network import build_q_model
+
+class PolicySnapshot:
+    """执行者线程使用的策略快照
+
+    学习器线程不断更新主网络，执行者若直接读主网络会读到更新了一半的权重，
+    因此执行者持有一份独立的模型副本：学习器每隔若干次梯度更新发布一份权重(NumPy数组)与版本号，
+    执行者在两步之间检查并载入，载入与推理都只发生在执行者线程中，不需要和训练加锁。
+    版本号为发布时学习器的累计梯度更新次数，参数滞后 = 学习器当前更新次数 - 执行者所用快照的版本号。
+    """
+
+    def __init__(self, agent):
+        """按智能体的网络结构构建快照模型并载入当前权重
+
+        Args:
+            agent (QNetwork): 学习器训练的Q网络
+        """
+        self.model = build_q_model(agent.state_size, agent.action_size, agent.hidden_units, agent.use_batch_norm)
+        self.model.set_weights(agent.model.get_weights())
+        self.version = 0  # 执行者当前使用的版本
+        self.lock = threading.Lock()
+        self.pending = None  # (weights, version)，尚未被执行者载入的最新快照
+
+    def publish(self, weights, version):
+        """学习器线程调用：发布一份新权重(未被载入的旧快照直接被覆盖)"""
+        with self.lock:
+            self.pending = (weights, version)
+
+    def refresh(self):
+        """执行者线程调用：有新快照时载入
+
+        Returns:
+            int: 当前使用的快照版本
+        """
+        with self.lock:
+            pending, self.pending = self.pending, None
+        if pending is not None:
+            self.model.set_weights(pending[0])
+            self.version = pending[1]
+        return self.version
+
+    def predict_single(self, state):
+        """预测单个状态的Q值"""
+        return self.model(np.expand_dims(state, axis=0), training=False).numpy()[0]
+
+
+class ActorThread(threading.Thread):
+    """执行者线程：用策略快照与环境交互，把经验放入有界队列交给学习器
+
+    队列中的消息:
+    - ('step', experience, policy_version): 一条经验及产生它的快照版本
+    - ('episode', episode, stats): 一轮结束时的统计
+    - ('done', None, None): 全部轮次完成或被要求停止
+    - ('error', exception, None): 执行者异常退出
+    队列满时执行者阻塞，因此执行者最多领先学习器queue_size步，回放比由学习器按调度精确维持。
+    环境只在执行者线程中访问(训练时不应开启pygame渲染)。
+    """
+
+    def __init__(self, env_handler, policy, schedule, start_episode, end_episode, queue_size=None):
+        """初始化执行者线程
+
+        Args:
+            env_handler (EnvironmentHandler): 环境(之后只由执行者线程访问)
+            policy (PolicySnapshot): 策略快照
+            schedule (TrainingSchedule): 训练调度(用于计算ε)
+            start_episode (int): 起始轮次
+            end_episode (int): 结束轮次(不含)
+            queue_size (int): 经验队列长度，默认Config.ACTOR_QUEUE_SIZE
+        """
+        super().__init__(name="Actor", daemon=True)
+        self.env_handler = env_handler
+        self.policy = policy
+        self.schedule = schedule
+        self.start_episode = start_episode
+        self.end_episode = end_episode
+        self.queue = queue.Queue(maxsize=Config.ACTOR_QUEUE_SIZE if queue_size is None else queue_size)
+        self.stop_event = threading.Event()
+        self.env_steps = 0  # 执行者累计环境步数(由学习器在启动前设置为恢复的步数)
+
+    def _put(self, message):
+        """放入队列，队列满时阻塞直到有空位或被要求停止"""
+        while not self.stop_event.is_set():
+            try:
+                self.queue.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(self):
+        try:
+            for episode in range(self.start_episode, self.end_episode):
+                if self.stop_event.is_set():
+                    break
+                self._run_episode(episode)
+            self._put(('done', None, None))
+        except Exception as e:
+            ColorLogger.error(f"执行者线程异常退出: {str(e)}")
+            self._put(('error', e, None))
+
+    def _run_episode(self, episode):
+        stats = {'start_time': time.time(), 'total_reward': 0, 'steps': 0, 'inference_time': 0}
+        state = self.env_handler.reset()
+        while not self.stop_event.is_set():
+            version = self.policy.refresh()
+            epsilon = self.schedule.epsilon(episode, self.env_steps)
+            if random.random() < epsilon:
+                action = random.randint(0, Config.ACTION_SIZE-1)
+            else:
+                action = np.argmax(self.policy.predict_single(state))
+
+            start_time = time.time()
+            next_state, reward, done = self.env_handler.step(action)
+            stats['inference_time'] += (time.time() - start_time) * 1000
+            stats['total_reward'] += reward
+            stats['steps'] += 1
+            self.env_steps += 1
+            if not self._put(('step', (state, action, reward, next_state, done, self.env_handler.truncated), version)):
+                return
+            state = next_state
+
+            if done:
+                stats['epsilon'] = epsilon
+                stats['score'] = self.env_handler.score
+                self._put(('episode', episode, stats))
+                return
+
+    def stop(self):
+        """要求执行者在当前步结束后退出"""
+        self.stop_event.set()
+        self.join(timeout=5.0)
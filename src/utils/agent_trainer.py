@@ -1,238 +1,532 @@
-import numpy as np
-import random
-import time
-import tensorflow as tf
-import datetime
-from src.utils.config import Config
-from src.utils.logger import ColorLogger
-from src.utils.tmonitor import TrainingMonitor
-from src.utils.device import get_training_device
-
-devive = get_training_device()
-
-class AgentTrainer:
-    """智能体训练核心模块，实现强化学习训练逻辑"""
-    
-    def __init__(self, agent, env_handler, replay_buffer, model_manager, logger):
-        self.agent = agent  # QNetwork实例
-        self.env_handler = env_handler  # EnvironmentHandler实例
-        self.replay_buffer = replay_buffer  # ReplayBuffer实例
-        self.model_manager = model_manager  # ModelManager实例
-        self.logger = logger  # TrainingLogger实例
-        self.monitor = TrainingMonitor()
-        
-        # 训练状态
-        self.score_history = []
-        self.loss_history = []
-        self.episodes_x = []
-    def _cleanup_resources(self, episode):
-        """资源清理函数"""
-        # 每轮清理TensorFlow会话
-        tf.keras.backend.clear_session()
-        
-        # 每10轮强制Python垃圾回收
-        if episode % 10 == 0:
-            import gc
-            gc.collect()
-            
-        # 清空未使用的变量引用
-        if hasattr(self, 'temp_variables'):
-            del self.temp_variables
-            self.temp_variables = {}
-        
-    def train(self, start_episode=0):
-        """开始训练主循环
-        
-        Args:
-            start_episode (int): 起始训练轮次
-            
-        Returns:
-            tuple: (score_history, loss_history, episodes_x)
-        """
-        # 初始化训练状态
-        training_start_time = time.time()
-        start_datetime = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        ColorLogger.highlight(f"\n===== 训练开始于: {start_datetime} =====\n")
-        ColorLogger.info(f"总训练轮次: {Config.EPISODES} | 起始轮次: {start_episode}")
-        
-        # 进度条配置
-        from tqdm import tqdm
-        pbar = tqdm(range(start_episode, Config.EPISODES), desc="训练进度", 
-                   initial=start_episode, total=Config.EPISODES,
-                   bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}, {postfix}]")
-        
-        try:
-            for episode in pbar:
-                # 检查退出信号
-                if self.monitor.should_end():
-                    ColorLogger.warning("\n用户请求退出训练...")
-                    self.model_manager.save_model(episode, is_interrupted=True)
-                    break
-                    
-                # 单轮训练
-                episode_metrics = self._train_single_episode(episode, pbar)
-                self._record_training_history(episode_metrics)
-                
-                # 定期更新目标网络
-                if episode % Config.TARGET_UPDATE_FREQ == 0:
-                    self.agent.update_target_network()
-                    ColorLogger.info(f"目标网络更新完成，轮次: {episode}\n")
-                    
-                # 自动保存模型
-                if episode > 0 and episode % Config.SAVE_INTERVAL == 0:
-                    self.model_manager.save_model(episode)
-                    
-                # 清理资源
-                self._cleanup_resources(episode)
-                
-            # 训练完成处理
-            self.model_manager.save_model(episode, is_final=True)
-            self.model_manager.convert_to_tflite(self.env_handler)
-            
-        except Exception as e:
-            ColorLogger.error(f"\n训练过程中发生错误: {str(e)}")
-            self.model_manager.save_model(episode, is_interrupted=True)
-        finally:
-            # 训练总结
-            self.logger.close()
-            end_datetime = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            total_training_time = str(datetime.timedelta(seconds=int(time.time()-training_start_time)))
-            ColorLogger.highlight(f"\n===== 训练结束于: {end_datetime} =====\n")
-            ColorLogger.info(f"总训练轮次: {episode+1 - start_episode} | 总耗时: {total_training_time}")
-            
-        return self.score_history, self.loss_history, self.episodes_x
-        
-    def _train_single_episode(self, episode, pbar):
-        """训练单轮episode
-        
-        Returns:
-            dict: 包含轮次指标的字典
-        """
-        episode_start_time = time.time()
-        state = self.env_handler.reset()
-        total_reward = 0
-        steps = 0
-        loss_sum = 0
-        inference_time = 0
-
-        global_episode = episode
-        
-        while True:
-            # ε-贪婪策略选择动作
-            epsilon = max(Config.EPSILON_MIN, Config.EPSILON_INIT * (Config.EPSILON_DECAY ** global_episode))
-            action = self._choose_action(state, epsilon)
-            
-            # 执行动作
-            start_time = time.time()
-            next_state, reward, done = self.env_handler.step(action)
-            inference_time += (time.time() - start_time) * 1000  # 毫秒
-            
-            # 存储经验
-            self.replay_buffer.add((state, action, reward, next_state, done))
-            total_reward += reward
-            steps += 1
-            
-            # 经验回放训练
-            loss = self._experience_replay()
-            loss_sum += loss
-            
-            state = next_state
-            
-            if done:
-                # 计算轮次指标
-                metrics = self._calculate_episode_metrics(
-                    episode, episode_start_time, total_reward, steps, loss_sum, 
-                    inference_time, epsilon
-                )
-                
-                # 更新进度条
-                pbar.set_postfix({
-                    '分数': metrics['score'],
-                    'ε': f"{metrics['epsilon']:.3f}",
-                    '损失': f"{metrics['avg_loss']:.4f}",
-                    '耗时': metrics['elapsed_time_str']
-                })
-                
-                # 记录日志
-                self.logger.log_episode_metrics(episode, metrics)
-                return metrics
-                
-    def _choose_action(self, state, epsilon):
-        """基于ε-贪婪策略选择动作
-        
-        Args:
-            state: 当前状态
-            epsilon: 探索率
-            
-        Returns:
-            int: 选择的动作
-        """
-        if random.random() < epsilon:
-            return random.randint(0, Config.ACTION_SIZE-1)
-        else:
-            q_values = self.agent.predict_single(state)
-            return np.argmax(q_values)
-            
-    def _experience_replay(self):
-        """经验回放训练
-        
-        Returns:
-            float: 训练损失
-        """
-        if len(self.replay_buffer) < Config.BATCH_SIZE:
-            return 0
-            
-        # 采样并转换为张量
-        batch = self.replay_buffer.sample(Config.BATCH_SIZE)
-        states = tf.convert_to_tensor([exp[0] for exp in batch], dtype=tf.float32)
-        actions = tf.convert_to_tensor([exp[1] for exp in batch], dtype=tf.int32)
-        rewards = tf.convert_to_tensor([exp[2] for exp in batch], dtype=tf.float32)
-        next_states = tf.convert_to_tensor([exp[3] for exp in batch], dtype=tf.float32)
-        dones = tf.convert_to_tensor([exp[4] for exp in batch], dtype=tf.float32)
-        
-        # 计算目标Q值（双Q学习）
-        next_q = self.agent.target_predict_batch(next_states)
-        max_next_q = np.max(next_q, axis=1)
-        targets = self.agent.predict_batch(states)
-        
-        actions_one_hot = tf.one_hot(actions, Config.ACTION_SIZE)
-        targets = rewards + (Config.GAMMA * max_next_q * (1 - dones))
-        targets = tf.expand_dims(targets, 1)
-        targets = tf.where(actions_one_hot == 1, targets, self.agent.model.predict(states, verbose=0))
-            
-        # 训练并返回损失
-        loss = self.agent.train(states, targets)
-        
-        # 显式释放张量
-        del states, actions, rewards, next_states, dones
-        return loss
-            
-    def _calculate_episode_metrics(self, episode, start_time, total_reward, steps, loss_sum, inference_time, epsilon):
-        """计算单轮训练指标
-        
-        Returns:
-            dict: 包含各类指标的字典
-        """
-        episode_time = time.time() - start_time
-        elapsed_time = time.time() - self.logger.training_start_time
-        gpu_memory = self.monitor.record_memory_usage(episode, device=devive)
-        
-        return {
-            'score': self.env_handler.score,
-            'total_reward': total_reward,
-            'steps': steps,
-            'avg_loss': loss_sum / steps if steps > 0 else 0,
-            'avg_inference_time': inference_time / steps if steps > 0 else 0,
-            'epsilon': epsilon,
-            'episode_time': episode_time,
-            'episode_time_str': str(datetime.timedelta(seconds=int(episode_time))),
-            'elapsed_time': elapsed_time,
-            'elapsed_time_str': str(datetime.timedelta(seconds=int(elapsed_time))),
-            'gpu_memory': gpu_memory
-        }
-        
-    def _record_training_history(self, metrics):
-        """记录训练历史"""
-        self.score_history.append(metrics['score'])
-        self.loss_history.append(metrics['avg_loss'])
+import queue
+import numpy as np
+import random
+import time
+import tensorflow as tf
+import datetime
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils.tmonitor import TrainingMonitor
+from src.utils.device import get_training_device
+from src.utils.batch_prefetcher import BatchPrefetcher
+from src.utils.memory_guard import MemoryGuard, read_rss_bytes, MB
+from src.utils.schedule import TrainingSchedule
+from src.utils.actor_learner import PolicySnapshot, ActorThread
+from src.utils.evaluator import BackgroundEvaluator
+from src.utils import checkpoint
+
+devive = get_training_device()
+
+class AgentTrainer:
+    """智能体训练核心模块，实现强化学习训练逻辑"""
+    
+    def __init__(self, agent, env_handler, replay_buffer, model_manager, logger):
+        self.agent = agent  # QNetwork实例
+        self.env_handler = env_handler  # EnvironmentHandler实例
+        self.replay_buffer = replay_buffer  # ReplayBuffer实例
+        self.model_manager = model_manager  # ModelManager实例
+        self.logger = logger  # TrainingLogger实例
+        self.monitor = TrainingMonitor()
+        # 后台批量预取(Config.PREFETCH_DEPTH为0时在主线程同步采样)
+        self.prefetcher = BatchPrefetcher(replay_buffer, Config.BATCH_SIZE) if Config.PREFETCH_DEPTH > 0 else None
+        # 按内存水位线清理资源
+        self.memory_guard = MemoryGuard(tf_device=devive.lstrip('/'))
+        # 按环境步数调度训练、目标网络同步、保存与日志
+        self.schedule = TrainingSchedule()
+        
+        # 训练状态
+        self.score_history = []
+        self.loss_history = []
+        self.episodes_x = []
+        self.batch_wait_time = 0.0  # 本轮学习器等待批量的累计时间(秒)
+        self.env_steps = 0  # 累计环境步数
+        self.grad_steps = 0  # 累计梯度更新次数
+        self.last_log_point = (time.perf_counter(), 0, 0)  # 上次记录吞吐量时的(时间, 环境步数, 更新次数)
+        self.current_episode = 0
+        self.policy = None  # 执行者/学习器分离时的策略快照
+        self.lag_sum = 0  # 本轮经验的参数滞后累计(梯度更新次数)
+        self.evaluator = None  # 后台贪婪评估进程(训练开始时按Config.EVAL_INTERVAL创建)
+        self.next_episode = 0  # 下一轮要训练的轮次(写入检查点，恢复时从这里继续)
+        # 保存模型时一并写入完整检查点；已加载检查点时在这里恢复计数器、随机数与回放缓冲区
+        # (cpu_autotune、arch_search、replay_bench只计时训练步骤，不传入模型管理器)
+        if model_manager is not None:
+            model_manager.bind_trainer(self)
+
+    def _cleanup_resources(self, episode):
+        """资源清理函数
+        
+        每轮clear_session会丢弃已编译的计算图并导致反复重新追踪，
+        改为采样进程内存，只有超过水位线时才执行gc.collect()/clear_session()
+        """
+        self.memory_guard.check(episode)
+        
+    def train(self, start_episode=0):
+        """开始训练主循环
+        
+        Args:
+            start_episode (int): 起始训练轮次
+            
+        Returns:
+            tuple: (score_history, loss_history, episodes_x)
+        """
+        # 初始化训练状态
+        training_start_time = time.time()
+        start_datetime = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ColorLogger.highlight(f"\n===== 训练开始于: {start_datetime} =====\n")
+        ColorLogger.info(f"总训练轮次: {Config.EPISODES} | 起始轮次: {start_episode}")
+        ColorLogger.info(self.schedule.describe())
+        if Config.ACTOR_LEARNER:
+            ColorLogger.info(f"执行者/学习器分离: 每{Config.POLICY_SYNC_STEPS}次更新刷新策略快照 | "
+                             f"经验队列长度 {Config.ACTOR_QUEUE_SIZE}")
+        
+        # 进度条配置
+        from tqdm import tqdm
+        pbar = tqdm(range(start_episode, Config.EPISODES), desc="训练进度", 
+                   initial=start_episode, total=Config.EPISODES,
+                   bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}, {postfix}]")
+        
+        if Config.EVAL_INTERVAL > 0:
+            self.evaluator = BackgroundEvaluator(self.agent, self.logger)
+            self.evaluator.start()
+
+        self.monitor.start()
+        episode = self.current_episode = self.next_episode = start_episode
+        try:
+            episode = self._run_training(start_episode, pbar)
+                
+            # 训练完成处理
+            self.model_manager.save_model(episode, is_final=True)
+            self.model_manager.convert_to_tflite(self.env_handler)
+            
+        except Exception as e:
+            ColorLogger.error(f"\n训练过程中发生错误: {str(e)}")
+            episode = self.current_episode
+            self._save_model(episode, is_interrupted=True)
+        finally:
+            # 训练总结
+            if self.prefetcher is not None:
+                self.prefetcher.close()
+            if self.evaluator is not None:
+                if self.evaluator.last_episode != episode:
+                    self.evaluator.submit(episode, self.env_steps, self.grad_steps, keep=True)  # 最终(或中断时)的权重
+                self.evaluator.close()
+                for evaluated_episode, score in self.evaluator.collect_results():
+                    self.model_manager.record_eval_score(evaluated_episode, score)
+            self.monitor.close()
+            self.model_manager.close()
+            self.logger.close()
+            self.replay_buffer.report_memory_usage()
+            self.replay_buffer.close()
+            end_datetime = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            total_training_time = str(datetime.timedelta(seconds=int(time.time()-training_start_time)))
+            ColorLogger.highlight(f"\n===== 训练结束于: {end_datetime} =====\n")
+            ColorLogger.info(f"总训练轮次: {episode+1 - start_episode} | 总耗时: {total_training_time}")
+            
+        return self.score_history, self.loss_history, self.episodes_x
+        
+    def _run_training(self, start_episode, pbar):
+        """运行训练循环(子类可替换为其它执行方式)
+
+        Returns:
+            int: 最后处理的轮次
+        """
+        if Config.ACTOR_LEARNER:
+            return self._train_actor_learner(start_episode, pbar)
+
+        episode = start_episode
+        for episode in pbar:
+            self.current_episode = episode
+            # 检查退出信号
+            if self.monitor.should_end():
+                ColorLogger.warning("\n用户请求退出训练...")
+                self._save_model(episode, is_interrupted=True)
+                break
+                
+            # 单轮训练
+            episode_metrics = self._train_single_episode(episode, pbar)
+            self._finish_episode(episode, episode_metrics)
+        return episode
+        
+    def _train_single_episode(self, episode, pbar):
+        """训练单轮episode
+        
+        Returns:
+            dict: 包含轮次指标的字典
+        """
+        episode_start_time = time.time()
+        state = self.env_handler.reset()
+        total_reward = 0
+        steps = 0
+        loss_sum = 0
+        updates = 0
+        inference_time = 0
+        
+        while True:
+            # ε-贪婪策略选择动作(按调度模式由轮次或累计环境步数决定)
+            epsilon = self.schedule.epsilon(episode, self.env_steps)
+            action = self._choose_action(state, epsilon)
+            
+            # 执行动作
+            start_time = time.time()
+            next_state, reward, done = self.env_handler.step(action)
+            inference_time += (time.time() - start_time) * 1000  # 毫秒
+            
+            # 存储经验(截断标志用于区分步数上限与真正的终止状态)
+            self._store_experience((state, action, reward, next_state, done, self.env_handler.truncated))
+            total_reward += reward
+            steps += 1
+            self.env_steps += 1
+            
+            # 经验回放训练：每TRAIN_EVERY步执行GRADIENT_STEPS次更新
+            for _ in range(self.schedule.updates_due(self.env_steps)):
+                loss = self._experience_replay()
+                if loss is not None:
+                    loss_sum += loss
+                    updates += 1
+            self._on_env_step(episode)
+            
+            state = next_state
+            
+            if done:
+                # 计算轮次指标
+                metrics = self._calculate_episode_metrics(
+                    episode, episode_start_time, total_reward, steps, loss_sum, 
+                    inference_time, epsilon, updates
+                )
+                self._report_episode(episode, metrics, pbar)
+                return metrics
+
+    def _report_episode(self, episode, metrics, pbar):
+        """更新进度条并记录单轮日志"""
+        postfix = {
+            '分数': metrics['score'],
+            'ε': f"{metrics['epsilon']:.3f}",
+            '损失': f"{metrics['avg_loss']:.4f}",
+            '步数': self.env_steps,
+            '耗时': metrics['elapsed_time_str']
+        }
+        if 'param_lag' in metrics:
+            postfix['滞后'] = f"{metrics['param_lag']:.0f}"
+        pbar.set_postfix(postfix)
+        self.logger.log_episode_metrics(episode, metrics)
+        if ColorLogger.verbosity >= ColorLogger.VERBOSE:
+            ColorLogger.debug(f"轮次{episode}: 分数 {metrics['score']} | 奖励 {metrics['total_reward']:.2f} | "
+                              f"步数 {metrics['steps']} | 损失 {metrics['avg_loss']:.4f} | ε {metrics['epsilon']:.3f} | "
+                              f"环境步数 {self.env_steps} | 更新次数 {self.grad_steps}")
+
+    def _finish_episode(self, episode, metrics):
+        """轮末处理：记录历史、按轮次调度的目标网络同步与保存、提交评估快照、处理控制请求、资源清理"""
+        self.next_episode = episode + 1
+        self._record_training_history(metrics)
+        self.monitor.update_status(episode=episode, env_steps=self.env_steps, grad_steps=self.grad_steps,
+                                   score=metrics['score'], epsilon=metrics['epsilon'])
+        
+        # 按轮次调度时，轮末更新目标网络与保存模型(按步数调度时在步循环中处理)
+        if self.schedule.target_sync_due(episode=episode):
+            self.agent.update_target_network()
+            ColorLogger.info(f"目标网络更新完成，轮次: {episode}\n")
+            
+        if self.schedule.save_due(episode=episode):
+            self._save_model(episode)
+
+        # 把权重快照交给后台评估进程(不等待评估结果)
+        if self.evaluator is not None:
+            if self.evaluator.due(episode):
+                self.evaluator.submit(episode, self.env_steps, self.grad_steps)
+            else:
+                self.evaluator.poll()
+            for evaluated_episode, score in self.evaluator.collect_results():
+                self.model_manager.record_eval_score(evaluated_episode, score)
+
+        # 控制通道的保存/导出请求(没有请求时只读取一个属性)
+        if self.monitor.pending:
+            self._handle_control_requests(episode, metrics)
+            
+        # 清理资源
+        self._cleanup_resources(episode)
+
+    def _save_model(self, episode, is_interrupted=False):
+        """保存模型，并把同一份权重交给后台评估(评估得分按保存的轮次记录，检查点保留策略据此挑选评估最好的模型)"""
+        self.model_manager.save_model(episode, is_interrupted=is_interrupted)
+        if self.evaluator is not None:
+            self.evaluator.submit(episode, self.env_steps, self.grad_steps, keep=True)
+
+    def _handle_control_requests(self, episode, metrics):
+        """处理控制通道在本轮期间收到的保存与导出指标请求"""
+        save, dump = self.monitor.take_requests()
+        if save:
+            ColorLogger.success(f"收到手动保存请求，轮次: {episode}")
+            self._save_model(episode)
+        if dump:
+            self.monitor.write_dump(self._metrics_report(episode, metrics))
+
+    def _metrics_report(self, episode, metrics):
+        """整理导出用的当前训练指标"""
+        recent = self.score_history[-100:]
+        return {
+            'episode': episode,
+            'env_steps': self.env_steps,
+            'grad_steps': self.grad_steps,
+            'recent_score_mean': float(np.mean(recent)) if recent else 0.0,
+            'best_score': max(self.score_history) if self.score_history else 0,
+            'replay_size': len(self.replay_buffer),
+            'rss_mb': read_rss_bytes() / MB,
+            'last_episode': {key: value for key, value in metrics.items() if isinstance(value, (int, float, np.number))},
+            'timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def checkpoint_state(self):
+        """导出训练器一侧的检查点内容：计数器、训练历史、随机数状态与可选的回放缓冲区
+
+        启用批量预取(PREFETCH_DEPTH>0)时，预取线程与训练循环交替使用全局随机数，队列中已采样的批量
+        也不写入检查点，恢复后的训练因此不会与中断前逐步一致；PREFETCH_DEPTH为0时逐步一致。
+
+        Returns:
+            tuple: (数组字典, 元信息字典)
+        """
+        arrays, rng_meta = checkpoint.capture_rng_state(self.env_handler.env)
+        arrays['history/scores'] = np.asarray(self.score_history, dtype=np.int64)
+        arrays['history/losses'] = np.asarray(self.loss_history, dtype=np.float64)
+        meta = {'next_episode': self.next_episode, 'env_steps': self.env_steps, 'grad_steps': self.grad_steps,
+                'rng': rng_meta, 'replay': False}
+        if Config.CHECKPOINT_SAVE_REPLAY and hasattr(self.replay_buffer, 'state_dict'):
+            if self.prefetcher is not None:
+                with self.prefetcher.lock:
+                    replay_state = self.replay_buffer.state_dict()
+            else:
+                replay_state = self.replay_buffer.state_dict()
+            if replay_state is not None:
+                arrays.update({f"replay/{name}": value for name, value in replay_state.items()})
+                meta['replay'] = True
+        return arrays, meta
+
+    def restore_checkpoint_state(self, arrays, meta):
+        """恢复checkpoint_state导出的内容，恢复后的训练与中断前逐步一致"""
+        self.next_episode = self.current_episode = meta['next_episode']
+        self.env_steps = meta['env_steps']
+        self.grad_steps = meta['grad_steps']
+        self.last_log_point = (time.perf_counter(), self.env_steps, self.grad_steps)
+        self.score_history = arrays['history/scores'].tolist()
+        self.loss_history = arrays['history/losses'].tolist()
+        self.episodes_x = list(range(1, len(self.score_history) + 1))
+        replay_state = checkpoint.group(arrays, "replay")
+        if replay_state and hasattr(self.replay_buffer, 'load_state_dict'):
+            if self.prefetcher is not None:
+                with self.prefetcher.lock:
+                    restored = self.replay_buffer.load_state_dict(replay_state)
+            else:
+                restored = self.replay_buffer.load_state_dict(replay_state)
+            if restored:
+                ColorLogger.success(f"已从检查点恢复回放缓冲区: {len(self.replay_buffer)}条经验")
+        checkpoint.restore_rng_state(arrays, meta['rng'], self.env_handler.env)
+        ColorLogger.info(f"已恢复训练状态: 轮次{self.next_episode} | 环境步数{self.env_steps} | "
+                         f"梯度更新{self.grad_steps}次 | 历史{len(self.score_history)}轮")
+        if self.prefetcher is not None:
+            ColorLogger.info("已启用批量预取: 恢复后的采样顺序与中断前不同(PREFETCH_DEPTH为0时逐步一致)")
+
+    def _train_actor_learner(self, start_episode, pbar):
+        """执行者/学习器分离的训练循环(在调用线程中运行学习器)
+
+        执行者线程用策略快照推进环境并把经验放入有界队列；本线程作为学习器取出经验写入回放缓冲区，
+        按调度为每个环境步累积应执行的梯度更新，执行完欠下的更新后再取下一条经验，回放比因此与同步模式一致。
+        TensorFlow算子执行时释放GIL，环境模拟与梯度更新因此可以在两个核心上重叠。
+        每POLICY_SYNC_STEPS次更新向执行者发布一次权重，参数滞后按经验记录。
+
+        Returns:
+            int: 最后处理的轮次
+        """
+        self.policy = PolicySnapshot(self.agent)
+        self.policy.version = self.grad_steps
+        actor = ActorThread(self.env_handler, self.policy, self.schedule, start_episode, Config.EPISODES)
+        actor.env_steps = self.env_steps
+        actor.start()
+        episode = start_episode
+        pending_updates = 0  # 已欠下、尚未执行的梯度更新次数
+        loss_sum, updates = 0, 0
+        try:
+            while True:
+                # 先执行已欠下的更新，执行者在此期间继续推进环境
+                if pending_updates > 0:
+                    loss = self._experience_replay()
+                    if loss is None:
+                        pending_updates = 0  # 经验不足一个批量时与同步模式一样跳过
+                        continue
+                    pending_updates -= 1
+                    loss_sum += loss
+                    updates += 1
+                    if self.grad_steps % max(1, Config.POLICY_SYNC_STEPS) == 0:
+                        self.policy.publish(self.agent.model.get_weights(), self.grad_steps)
+                    continue
+
+                try:
+                    kind, payload, extra = actor.queue.get(timeout=1.0)
+                except queue.Empty:
+                    if not actor.is_alive():
+                        raise RuntimeError("执行者线程意外退出")
+                    continue
+
+                if kind == 'step':
+                    self._store_experience(payload)
+                    self.env_steps += 1
+                    self.lag_sum += self.grad_steps - extra
+                    pending_updates += self.schedule.updates_due(self.env_steps)
+                    self._on_env_step(episode)
+                elif kind == 'episode':
+                    episode = self.current_episode = payload
+                    metrics = self._calculate_episode_metrics(
+                        episode, extra['start_time'], extra['total_reward'], extra['steps'], loss_sum,
+                        extra['inference_time'], extra['epsilon'], updates
+                    )
+                    metrics['score'] = extra['score']
+                    metrics['param_lag'] = self.lag_sum / extra['steps'] if extra['steps'] > 0 else 0
+                    metrics['actor_queue'] = actor.queue.qsize()
+                    self.lag_sum = 0
+                    loss_sum, updates = 0, 0
+                    pbar.update(1)
+                    self._report_episode(episode, metrics, pbar)
+                    self._finish_episode(episode, metrics)
+                    if self.monitor.should_end():
+                        ColorLogger.warning("\n用户请求退出训练...")
+                        self._save_model(episode, is_interrupted=True)
+                        break
+                elif kind == 'done':
+                    break
+                elif kind == 'error':
+                    raise payload
+        finally:
+            actor.stop()
+        return episode
+                
+    def _on_env_step(self, episode):
+        """按环境步数触发的调度事件：目标网络同步、保存模型与吞吐量日志"""
+        if self.schedule.target_sync_due(env_steps=self.env_steps):
+            self.agent.update_target_network()
+        if self.schedule.save_due(env_steps=self.env_steps):
+            self._save_model(episode)
+        if self.schedule.log_due(self.env_steps):
+            now = time.perf_counter()
+            last_time, last_env_steps, last_grad_steps = self.last_log_point
+            elapsed = max(now - last_time, 1e-9)
+            self.logger.log_step_metrics(self.env_steps, {
+                'grad_steps': self.grad_steps,
+                'env_steps_per_sec': (self.env_steps - last_env_steps) / elapsed,
+                'grad_steps_per_sec': (self.grad_steps - last_grad_steps) / elapsed,
+                'replay_ratio': self.grad_steps / self.env_steps
+            })
+            self.last_log_point = (now, self.env_steps, self.grad_steps)
+                
+    def _choose_action(self, state, epsilon):
+        """基于ε-贪婪策略选择动作
+        
+        Args:
+            state: 当前状态
+            epsilon: 探索率
+            
+        Returns:
+            int: 选择的动作
+        """
+        if random.random() < epsilon:
+            return random.randint(0, Config.ACTION_SIZE-1)
+        else:
+            q_values = self.agent.predict_single(state)
+            return np.argmax(q_values)
+            
+    def _store_experience(self, experience):
+        """写入一条经验(启用预取时经由预取器加锁写入)"""
+        if self.prefetcher is not None:
+            self.prefetcher.add(experience)
+        else:
+            self.replay_buffer.add(experience)
+            
+    def _next_batch(self):
+        """获取下一个训练批量，并累计学习器的等待时间"""
+        start_time = time.perf_counter()
+        if self.prefetcher is not None:
+            batch = self.prefetcher.get()
+        else:
+            batch = self.replay_buffer.sample_batch(Config.BATCH_SIZE)
+        self.batch_wait_time += time.perf_counter() - start_time
+        return batch
+            
+    def _experience_replay(self):
+        """经验回放训练
+        
+        Returns:
+            float: 训练损失，经验不足一个批量(未执行更新)时返回None
+        """
+        if len(self.replay_buffer) < Config.BATCH_SIZE:
+            return None
+            
+        # 向量化采样(或从预取队列取出已转换好的张量)
+        batch = self._next_batch()
+        if batch is None:
+            return None
+        states = tf.convert_to_tensor(batch.states, dtype=tf.float32)
+        actions = tf.convert_to_tensor(batch.actions, dtype=tf.int32)
+        rewards = tf.convert_to_tensor(batch.rewards, dtype=tf.float32)
+        next_states = tf.convert_to_tensor(batch.next_states, dtype=tf.float32)
+        dones = tf.convert_to_tensor(batch.dones, dtype=tf.float32)
+        discounts = tf.convert_to_tensor(batch.discounts, dtype=tf.float32)
+        
+        # 计算目标Q值（双Q学习，n步回报：rewards已是n步折扣回报，discounts为γ^n）
+        next_q = self.agent.target_predict_batch(next_states)
+        max_next_q = np.max(next_q, axis=1)
+        
+        actions_one_hot = tf.one_hot(actions, Config.ACTION_SIZE)
+        target_values = rewards + (discounts * max_next_q * (1 - dones))
+        current_q = self.agent.predict_batch(states)
+        targets = tf.where(actions_one_hot == 1, tf.expand_dims(target_values, 1), current_q)
+            
+        # 训练并返回损失(优先经验回放时按重要性采样权重加权)
+        loss = self.agent.train(states, targets, sample_weights=batch.weights)
+        self.grad_steps += 1
+        
+        # 优先经验回放：用本次的TD误差更新被采样经验的优先级
+        if batch.indices is not None:
+            td_errors = target_values.numpy() - current_q[np.arange(len(batch.indices)), np.asarray(batch.actions)]
+            if self.prefetcher is not None:
+                self.prefetcher.update_priorities(batch.indices, td_errors)
+            else:
+                self.replay_buffer.update_priorities(batch.indices, td_errors)
+        
+        # 显式释放张量
+        del states, actions, rewards, next_states, dones, discounts
+        return loss
+            
+    def _calculate_episode_metrics(self, episode, start_time, total_reward, steps, loss_sum, inference_time, epsilon,
+                                   updates):
+        """计算单轮训练指标
+        
+        Returns:
+            dict: 包含各类指标的字典
+        """
+        episode_time = time.time() - start_time
+        elapsed_time = time.time() - self.logger.training_start_time
+        gpu_memory = self.monitor.record_memory_usage(episode, device=devive)
+        learner_wait_ms = self.batch_wait_time * 1000 / steps if steps > 0 else 0
+        self.batch_wait_time = 0.0
+        
+        return {
+            'score': self.env_handler.score,
+            'total_reward': total_reward,
+            'steps': steps,
+            'avg_loss': loss_sum / updates if updates > 0 else 0,
+            'avg_inference_time': inference_time / steps if steps > 0 else 0,
+            'epsilon': epsilon,
+            'episode_time': episode_time,
+            'episode_time_str': str(datetime.timedelta(seconds=int(episode_time))),
+            'elapsed_time': elapsed_time,
+            'elapsed_time_str': str(datetime.timedelta(seconds=int(elapsed_time))),
+            'gpu_memory': gpu_memory,
+            'learner_wait_ms': learner_wait_ms,
+            'rss_mb': read_rss_bytes() / MB,
+            'prefetch_queue': self.prefetcher.queue_size() if self.prefetcher is not None else 0,
+            'env_steps': self.env_steps,
+            'grad_steps': self.grad_steps
+        }
+        
+    def _record_training_history(self, metrics):
+        """记录训练历史"""
+        self.score_history.append(metrics['score'])
+        self.loss_history.append(metrics['avg_loss'])
         self.episodes_x.append(len(self.episodes_x) + 1)  
\ No newline at end of file
@@ -0,0 +1,105 @@
+import os
+import time
+import queue
+import random
+import numpy as np
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils.shared_replay import SharedReplayShard, SharedWeights
+
+def actor_epsilon(actor_id, num_actors, base=None, alpha=None):
+    """第actor_id个执行者的固定探索率(Ape-X): ε_i = base^(1 + alpha·i/(N-1))
+
+    不同执行者的探索程度从base到base^(1+alpha)依次递减，合起来覆盖从大量探索到几乎贪婪的各种行为。
+    """
+    base = Config.ACTOR_EPSILON_BASE if base is None else base
+    alpha = Config.ACTOR_EPSILON_ALPHA if alpha is None else alpha
+    if num_actors <= 1:
+        return base
+    return base ** (1 + alpha * actor_id / (num_actors - 1))
+
+
+def run_actor(actor_id, num_actors, shard_name, shard_capacity, weights_name, weight_shapes,
+              step_counters, weight_versions, episode_queue, stop_event):
+    """执行者进程入口
+
+    在自己的环境(种子AGENT_SEED_BASE + actor_id)中以固定探索率运行，经验直接写入自己独占的共享内存分片；
+    每步检查一次共享权重的版本号，有新版本时才复制权重。累计步数与所用权重版本写入共享计数器，
+    每轮结束时把统计放入episode_queue。
+
+    Args:
+        actor_id (int): 执行者编号
+        num_actors (int): 执行者总数
+        shard_name (str): 回放分片的共享内存名称
+        shard_capacity (int): 回放分片容量
+        weights_name (str): 权重块的共享内存名称
+        weight_shapes (list): 各权重数组的形状
+        step_counters (RawArray): 各执行者的累计环境步数
+        weight_versions (RawArray): 各执行者当前使用的权重版本
+        episode_queue (Queue): 单轮统计队列
+        stop_event (Event): 停止信号
+    """
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+    from src.utils.cpu_profile import apply_cpu_profile
+    apply_cpu_profile()
+
+    import tensorflow as tf
+    from src.utils.device import configure_cpu_threads
+    configure_cpu_threads(1, 1)  # 每个执行者单线程，执行者数量按核心数扩展
+
+    from src.model.q_network import build_q_model
+    from src.utils.env_handler import EnvironmentHandler
+
+    seed = Config.AGENT_SEED_BASE + actor_id
+    random.seed(seed)
+    np.random.seed(seed)
+    tf.random.set_seed(seed)
+
+    shard = SharedReplayShard(shard_capacity, name=shard_name, create=False)
+    weights = SharedWeights(weight_shapes, name=weights_name, create=False)
+    epsilon = actor_epsilon(actor_id, num_actors)
+    try:
+        with tf.device('/CPU:0'):
+            env_handler = EnvironmentHandler(seed=seed)
+            model = build_q_model(Config.STATE_SIZE, Config.ACTION_SIZE)
+            version = -1
+            while not stop_event.is_set():
+                start_time = time.time()
+                state = env_handler.reset()
+                total_reward, steps = 0, 0
+                while not stop_event.is_set():
+                    update = weights.read(newer_than=version)
+                    if update is not None:
+                        model.set_weights(update[0])
+                        version = weight_versions[actor_id] = update[1]
+
+                    if random.random() < epsilon:
+                        action = random.randint(0, Config.ACTION_SIZE-1)
+                    else:
+                        action = int(np.argmax(model(state[np.newaxis, :], training=False).numpy()[0]))
+                    next_state, reward, done = env_handler.step(action)
+                    shard.add((state, action, reward, next_state, done, env_handler.truncated))
+                    step_counters[actor_id] += 1
+                    total_reward += reward
+                    steps += 1
+                    state = next_state
+                    if done:
+                        break
+                else:
+                    break
+
+                stats = {'actor': actor_id, 'score': env_handler.score, 'total_reward': total_reward,
+                         'steps': steps, 'epsilon': epsilon, 'episode_time': time.time() - start_time}
+                while not stop_event.is_set():
+                    try:
+                        episode_queue.put(stats, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+    except Exception as e:
+        ColorLogger.error(f"执行者{actor_id}异常退出: {str(e)}")
+        raise
+    finally:
+        episode_queue.cancel_join_thread()  # 退出时不等待未被学习器取走的统计
+        shard.close()
+        weights.close()
@@ -0,0 +1,104 @@
+import queue
+import threading
+import tensorflow as tf
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+
+class BatchPrefetcher:
+    """后台批量预取模块
+
+    由一个采样线程从回放缓冲区采样并转换为张量，放入有界队列；
+    学习器直接从队列取出已经准备好的批量，采样和类型转换与梯度更新重叠执行。
+    - 队列满时采样线程阻塞，最多提前准备depth个批量
+    - 回放缓冲区的写入、采样和优先级更新通过同一把锁串行化，避免读到写了一半的经验
+
+    批量的张量签名固定：states/next_states为(batch_size, STATE_SIZE) float32，
+    actions为(batch_size,) int32，rewards/dones/discounts/weights为(batch_size,) float32；
+    indices保持NumPy数组，用于更新优先级。
+    """
+    def __init__(self, replay_buffer, batch_size, depth=None):
+        """初始化并启动采样线程
+
+        Args:
+            replay_buffer (ReplayBuffer): 回放缓冲区
+            batch_size (int): 批量大小
+            depth (int): 预取队列长度，默认Config.PREFETCH_DEPTH
+        """
+        self.replay_buffer = replay_buffer
+        self.batch_size = batch_size
+        self.depth = Config.PREFETCH_DEPTH if depth is None else depth
+        self.lock = threading.Lock()  # 保护回放缓冲区
+        self.queue = queue.Queue(maxsize=self.depth)
+        self.stop_event = threading.Event()
+        self.ready = threading.Event()  # 缓冲区中已有足够经验
+        if len(replay_buffer) >= batch_size:  # 恢复的磁盘缓冲区可能已有足够经验
+            self.ready.set()
+        self.thread = threading.Thread(target=self._sample_loop, name="BatchPrefetcher", daemon=True)
+        self.thread.start()
+
+    def add(self, experience):
+        """线程安全地写入一条经验"""
+        with self.lock:
+            self.replay_buffer.add(experience)
+            if not self.ready.is_set() and len(self.replay_buffer) >= self.batch_size:
+                self.ready.set()
+
+    def update_priorities(self, indices, td_errors):
+        """线程安全地更新优先级(仅优先经验回放)"""
+        with self.lock:
+            self.replay_buffer.update_priorities(indices, td_errors)
+
+    def _sample_loop(self):
+        try:
+            while not self.stop_event.is_set():
+                if not self.ready.wait(timeout=0.1):
+                    # 经验也可能由其它进程直接写入共享内存(多进程执行者)，不经过add()
+                    with self.lock:
+                        if len(self.replay_buffer) >= self.batch_size:
+                            self.ready.set()
+                    continue
+                with self.lock:
+                    batch = self.replay_buffer.sample_batch(self.batch_size)
+                batch = self._to_tensors(batch)
+                while not self.stop_event.is_set():
+                    try:
+                        self.queue.put(batch, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        except Exception as e:
+            ColorLogger.error(f"批量预取线程异常退出: {str(e)}")
+            self.queue.put(e)
+
+    def _to_tensors(self, batch):
+        return batch._replace(
+            states=tf.convert_to_tensor(batch.states, dtype=tf.float32),
+            actions=tf.convert_to_tensor(batch.actions, dtype=tf.int32),
+            rewards=tf.convert_to_tensor(batch.rewards, dtype=tf.float32),
+            next_states=tf.convert_to_tensor(batch.next_states, dtype=tf.float32),
+            dones=tf.convert_to_tensor(batch.dones, dtype=tf.float32),
+            discounts=tf.convert_to_tensor(batch.discounts, dtype=tf.float32),
+            weights=None if batch.weights is None else tf.convert_to_tensor(batch.weights, dtype=tf.float32)
+        )
+
+    def get(self):
+        """取出下一个批量(必要时等待采样线程)
+
+        Returns:
+            ReplayBatch: 字段已转换为张量的批量；缓冲区经验不足时返回None
+        """
+        if not self.ready.is_set():
+            return None
+        batch = self.queue.get()
+        if isinstance(batch, Exception):
+            raise batch
+        return batch
+
+    def queue_size(self):
+        """当前已就绪的批量数"""
+        return self.queue.qsize()
+
+    def close(self):
+        """停止采样线程"""
+        self.stop_event.set()
+        self.thread.join(timeout=1.0)
@@ -0,0 +1,300 @@
+import os
+import io
+import json
+import hashlib
+import random
+import threading
+import numpy as np
+from pathlib import Path
+from src.utils.logger import ColorLogger
+
+# 训练检查点：一个未压缩的.npz文件(写入与读取都接近磁盘带宽)，数组按前缀分组：
+#   model/NNN、target/NNN   主网络与目标网络权重(get_weights顺序)
+#   optimizer/NNN           优化器变量(迭代次数与各参数的一阶/二阶矩)
+#   replay/<字段>           回放缓冲区(可选，见Config.CHECKPOINT_SAVE_REPLAY)
+#   history/<名称>          训练历史(每轮得分与损失)
+#   rng/numpy_keys          NumPy全局随机数生成器的MT19937状态
+#   meta                    JSON(UTF-8字节)：计数器、Python随机数状态等标量信息
+CHECKPOINT_EXTENSION = ".ckpt"
+FORMAT_VERSION = 1
+# 只含权重的轻量模型文件：同样的.npz格式，数组为weights/NNN，meta中记录网络结构与权重摘要
+WEIGHTS_EXTENSION = ".npz"
+
+
+def checkpoint_path_for(model_path):
+    """与模型文件同名的检查点路径(saved_models/snake_agent_500.keras -> saved_models/snake_agent_500.ckpt)"""
+    model_path = Path(model_path)
+    return model_path.with_name(model_path.stem + CHECKPOINT_EXTENSION)
+
+
+def atomic_write_bytes(path, data):
+    """先写同目录下的临时文件并落盘，再用os.replace原子替换目标文件
+
+    写入过程中崩溃只会留下.tmp文件，目标路径要么是旧文件要么是完整的新文件。
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def atomic_save_model(model, path):
+    """原子地保存Keras模型：先保存为同目录下以.tmp_开头的文件(不会被模型搜索模式匹配)，落盘后再替换"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(".tmp_" + path.name)
+    model.save(tmp_path)
+    with open(tmp_path, 'rb+') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_checkpoint(path, arrays, meta):
+    """把数组与元信息原子地写入检查点文件
+
+    Args:
+        path (Path): 检查点路径
+        arrays (dict): 名称 -> NumPy数组
+        meta (dict): 可JSON序列化的元信息
+
+    Returns:
+        int: 写入的字节数
+    """
+    meta = dict(meta, format_version=FORMAT_VERSION)
+    buffer = io.BytesIO()
+    np.savez(buffer, meta=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8), **arrays)
+    data = buffer.getbuffer()
+    atomic_write_bytes(path, data)
+    return data.nbytes
+
+
+def read_checkpoint(path):
+    """读取检查点
+
+    Returns:
+        tuple: (数组字典, 元信息字典)
+    """
+    with np.load(path, allow_pickle=False) as archive:
+        arrays = {name: archive[name] for name in archive.files}
+    meta = json.loads(arrays.pop('meta').tobytes().decode('utf-8'))
+    if meta.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"不支持的检查点版本: {meta.get('format_version')}")
+    return arrays, meta
+
+
+def group(arrays, prefix):
+    """取出某一前缀下的数组
+
+    Returns:
+        dict: 去掉前缀后的名称 -> 数组(按名称排序)
+    """
+    prefix = prefix + "/"
+    return {name[len(prefix):]: arrays[name] for name in sorted(arrays) if name.startswith(prefix)}
+
+
+def numbered(prefix, values):
+    """把数组列表编号为prefix/000、prefix/001……"""
+    return {f"{prefix}/{i:03d}": np.asarray(value) for i, value in enumerate(values)}
+
+
+def weights_hash(weights):
+    """权重列表的SHA-256摘要(包含每个数组的类型与形状，结构不同的网络不会得到相同的摘要)"""
+    digest = hashlib.sha256()
+    for value in weights:
+        value = np.ascontiguousarray(value)
+        digest.update(f"{value.dtype.str}{value.shape}".encode('ascii'))
+        digest.update(value.data)
+    return digest.hexdigest()
+
+
+def write_weights(path, weights, architecture):
+    """原子地写入只含权重的模型文件(不含Keras的结构与元数据，保存与加载只需几毫秒)
+
+    Args:
+        path (Path): 模型文件路径(.npz)
+        weights (list): 权重数组(get_weights顺序)
+        architecture (dict): 重建网络所需的结构(build_q_model的参数)
+
+    Returns:
+        int: 写入的字节数
+    """
+    weights = [np.asarray(value) for value in weights]
+    meta = {'architecture': architecture, 'weights_hash': weights_hash(weights)}
+    return write_checkpoint(path, numbered("weights", weights), meta)
+
+
+def read_weights(path):
+    """读取只含权重的模型文件并校验权重摘要
+
+    Returns:
+        tuple: (权重列表, 网络结构字典)
+    """
+    arrays, meta = read_checkpoint(path)
+    weights = list(group(arrays, "weights").values())
+    if weights_hash(weights) != meta['weights_hash']:
+        raise ValueError(f"权重摘要不一致，文件可能已损坏: {path}")
+    return weights, meta['architecture']
+
+
+def pack_weights(weights):
+    """把权重打包为一段连续字节(附带各数组的类型、形状与摘要)，跨进程传递时只序列化一个缓冲区
+
+    Returns:
+        tuple: (字节, [(类型, 形状), ...], 摘要)
+    """
+    weights = [np.ascontiguousarray(value) for value in weights]
+    specs = [(value.dtype.str, value.shape) for value in weights]
+    return b"".join(value.tobytes() for value in weights), specs, weights_hash(weights)
+
+
+def unpack_weights(packed):
+    """还原pack_weights打包的权重(数组直接引用接收到的缓冲区，不再复制)并校验摘要"""
+    data, specs, digest = packed
+    weights, offset = [], 0
+    for dtype, shape in specs:
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape, dtype=np.int64))
+        weights.append(np.frombuffer(data, dtype=dtype, count=count, offset=offset).reshape(shape))
+        offset += count * dtype.itemsize
+    if offset != len(data) or weights_hash(weights) != digest:
+        raise ValueError("权重快照摘要不一致")
+    return weights
+
+
+def optimizer_variables(optimizer):
+    """优化器变量列表(Keras 3为属性，旧版optimizer_v2为方法)"""
+    variables = optimizer.variables
+    return list(variables() if callable(variables) else variables)
+
+
+def capture_agent_state(agent):
+    """导出QNetwork的主网络、目标网络与优化器状态"""
+    arrays = numbered("model", agent.model.get_weights())
+    arrays.update(numbered("target", agent.target_model.get_weights()))
+    arrays.update(numbered("optimizer", [v.numpy() for v in optimizer_variables(agent.optimizer)]))
+    return arrays
+
+
+def restore_agent_state(agent, arrays):
+    """恢复QNetwork的主网络、目标网络与优化器状态
+
+    优化器的矩估计在第一次更新时才创建，这里先按主网络的可训练变量建好再逐个赋值，
+    恢复后的第一步更新与中断前的下一步完全相同(不需要重新预热)。
+    """
+    agent.model.set_weights(list(group(arrays, "model").values()))
+    agent.target_model.set_weights(list(group(arrays, "target").values()))
+    saved = list(group(arrays, "optimizer").values())
+    variables = optimizer_variables(agent.optimizer)
+    if len(variables) != len(saved):
+        if hasattr(agent.optimizer, 'build'):
+            agent.optimizer.build(agent.model.trainable_variables)
+        else:
+            agent.optimizer._create_all_weights(agent.model.trainable_variables)
+        variables = optimizer_variables(agent.optimizer)
+    if len(variables) != len(saved) or any(tuple(v.shape) != s.shape for v, s in zip(variables, saved)):
+        raise ValueError(f"优化器状态与当前网络结构不一致({len(saved)}个变量 → {len(variables)}个)")
+    for variable, value in zip(variables, saved):
+        variable.assign(value)
+
+
+def capture_rng_state(env=None):
+    """导出Python/NumPy全局随机数状态与环境自带的随机数生成器状态
+
+    Returns:
+        tuple: (数组字典, 元信息字典)
+    """
+    name, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    meta = {'python': random.getstate(), 'numpy': [name, int(pos), int(has_gauss), float(cached_gaussian)]}
+    rng = getattr(env, 'rng', None)
+    if isinstance(rng, random.Random):
+        meta['env'] = rng.getstate()
+    return {'rng/numpy_keys': keys}, meta
+
+
+def _as_state_tuple(state):
+    """JSON还原出的列表转换回random.setstate所需的元组"""
+    version, internal, gauss_next = state
+    return version, tuple(internal), gauss_next
+
+
+def restore_rng_state(arrays, meta, env=None):
+    """恢复capture_rng_state导出的随机数状态"""
+    random.setstate(_as_state_tuple(meta['python']))
+    name, pos, has_gauss, cached_gaussian = meta['numpy']
+    np.random.set_state((name, arrays['rng/numpy_keys'], pos, has_gauss, cached_gaussian))
+    rng = getattr(env, 'rng', None)
+    if 'env' in meta and isinstance(rng, random.Random):
+        rng.setstate(_as_state_tuple(meta['env']))
+
+
+class CheckpointWriter:
+    """后台检查点写入线程
+
+    训练循环只在内存中复制一份快照(权重、优化器状态等)就返回，序列化与落盘由本线程完成。
+    同一时刻最多一个写入在进行；写入期间又提交的快照只保留最新的一份(合并)，
+    被合并掉的快照不会写入。需要确保落盘的保存(最终模型、中断保存)提交后调用flush等待。
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.pending = None  # (名称, 写入函数)，尚未开始写入的最新快照
+        self.busy = False
+        self.closed = False
+        self.written = 0
+        self.coalesced = 0
+        self.thread = threading.Thread(target=self._run, name="CheckpointWriter", daemon=True)
+        self.thread.start()
+
+    def submit(self, name, write):
+        """提交一份快照的写入函数(不阻塞)
+
+        Args:
+            name (str): 快照名称(用于日志)
+            write (callable): 在写入线程中执行的写入函数
+        """
+        with self.condition:
+            if self.pending is not None:
+                self.coalesced += 1
+                ColorLogger.warning(f"上一个检查点仍在写入，{self.pending[0]}被更新的{name}替换")
+            self.pending = (name, write)
+            self.condition.notify_all()
+
+    def flush(self, timeout=None):
+        """等待已提交的快照全部写入完成
+
+        Returns:
+            bool: 超时前是否已全部写入
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: self.pending is None and not self.busy, timeout=timeout)
+
+    def close(self, timeout=None):
+        """写完剩余快照后结束写入线程"""
+        self.flush(timeout)
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending is not None or self.closed)
+                if self.pending is None:
+                    return
+                name, write = self.pending
+                self.pending = None
+                self.busy = True
+            try:
+                write()
+                self.written += 1
+            except Exception as e:
+                ColorLogger.error(f"检查点{name}写入失败: {str(e)}")
+            finally:
+                with self.condition:
+                    self.busy = False
+                    self.condition.notify_all()
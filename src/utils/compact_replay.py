@@ -0,0 +1,167 @@
+import sys
+import numpy as np
+from src.utils.config import Config
+from src.utils.replay_buffer import ReplayBuffer, ReplayBatch, unpack_experience
+
+class StateCodec:
+    """12维状态特征的无损压缩编解码器
+
+    SnakeEnv._get_state的特征大多是0/1或以固定分母归一化的整数，可以无损压缩为5字节：
+        0: 食物相对x坐标 × GRID_WIDTH  (int8)
+        1: 食物相对y坐标 × GRID_HEIGHT (int8)
+        2: 方向one-hot(4位)与碰撞检测(4位)按位打包
+        3: 蛇身长度 × 50  (uint8)
+        4: 分数 × 100     (uint8)
+    解码时以float32相除还原，结果与原始float32特征逐位相等；
+    编码时会校验这一点，无法精确还原的状态直接报错而不是悄悄丢失精度。
+    """
+    CODE_SIZE = 5
+
+    def __init__(self):
+        if Config.STATE_SIZE != 12:
+            raise ValueError(f"压缩存储只支持12维状态特征，当前STATE_SIZE={Config.STATE_SIZE}")
+        if max(Config.GRID_WIDTH, Config.GRID_HEIGHT) > 127 or Config.GRID_WIDTH * Config.GRID_HEIGHT > 255:
+            raise ValueError("压缩存储要求网格宽高不超过127且格子总数不超过255")
+        self.position_scales = np.array([Config.GRID_WIDTH, Config.GRID_HEIGHT], dtype=np.float32)
+        self.count_scales = np.array([50, 100], dtype=np.float32)
+
+    def encode(self, state):
+        """将单个状态编码为5字节
+
+        Args:
+            state (np.array): 形状为(12,)的状态特征
+
+        Returns:
+            np.array: 形状为(5,)的uint8编码
+        """
+        state = np.asarray(state, dtype=np.float32)
+        code = np.empty(self.CODE_SIZE, dtype=np.uint8)
+        code[0:2] = np.rint(state[0:2] * self.position_scales).astype(np.int8).view(np.uint8)
+        code[2] = np.packbits(state[2:10].astype(np.uint8))[0]
+        code[3:5] = np.rint(state[10:12] * self.count_scales).astype(np.uint8)
+        if not np.array_equal(self.decode(code)[0], state):
+            raise ValueError(f"状态无法被无损压缩: {state}")
+        return code
+
+    def decode(self, codes):
+        """将编码批量还原为float32状态
+
+        Args:
+            codes (np.array): 形状为(batch_size, 5)或(5,)的编码
+
+        Returns:
+            np.array: 形状为(batch_size, 12)的状态特征
+        """
+        codes = np.atleast_2d(codes)
+        states = np.empty((len(codes), 12), dtype=np.float32)
+        states[:, 0:2] = codes[:, 0:2].view(np.int8).astype(np.float32) / self.position_scales
+        states[:, 2:10] = np.unpackbits(codes[:, 2:3], axis=1)
+        states[:, 10:12] = codes[:, 3:5].astype(np.float32) / self.count_scales
+        return states
+
+
+class CompactReplayBuffer(ReplayBuffer):
+    """压缩存储的经验回放缓冲区
+
+    在ReplayBuffer的环形数组基础上：
+    - 状态经StateCodec无损压缩为5字节
+    - 不单独存储next_state：同一片段内第i条经验的下一状态就是第i+1条经验的状态；
+      只有片段结束(或与上一条经验不连续)时，才把下一状态存入一个很小的旁路表
+    每条经验约11字节(原始数组实现约106字节)，相同内存可以容纳约十倍的经验。
+
+    要求经验按时间顺序逐条写入(单个环境)；若检测到不连续，会自动把上一条经验视为片段边界。
+    """
+    def __init__(self, capacity):
+        self.codec = StateCodec()
+        self.final_codes = {}  # 片段边界经验的槽位 -> 下一状态编码(bytes)
+        self.pending_next = None  # 最新一条经验的下一状态编码，等待下一条经验写入
+        super().__init__(capacity)
+
+    def _init_storage(self):
+        self.codes = self._allocate('codes', (self.capacity, StateCodec.CODE_SIZE), np.uint8)
+        self.actions = self._allocate('actions', (self.capacity,), np.uint8)
+        self.rewards = self._allocate('rewards', (self.capacity,), np.float32)
+        self.dones = self._allocate('dones', (self.capacity,), np.bool_)  # 真正的终止状态
+        self.ends = self._allocate('ends', (self.capacity,), np.bool_)  # 片段边界：该经验的下一状态在旁路表中
+
+    def add(self, experience):
+        """添加经验到缓冲区
+
+        Args:
+            experience (tuple): 包含(state, action, reward, next_state, done[, truncated])的经验元组
+        """
+        state, action, reward, next_state, terminal, episode_end = unpack_experience(experience)
+        code = self.codec.encode(state)
+        next_code = self.codec.encode(next_state)
+
+        # 与上一条经验不连续：上一条经验的下一状态无法从本条推出，转存到旁路表
+        if self.pending_next is not None and not np.array_equal(self.pending_next, code):
+            prev = (self.position - 1) % self.capacity
+            self.ends[prev] = True
+            self.final_codes[prev] = self.pending_next.tobytes()
+
+        i = self.position
+        self.final_codes.pop(i, None)
+        self.codes[i] = code
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.dones[i] = terminal
+        if episode_end:
+            self.ends[i] = True
+            self.final_codes[i] = next_code.tobytes()
+            self.pending_next = None
+        else:
+            self.ends[i] = False
+            self.pending_next = next_code
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def _next_codes(self, idx):
+        """推导一批经验的下一状态编码"""
+        next_codes = self.codes[(idx + 1) % self.capacity]
+        newest = (self.position - 1) % self.capacity
+        next_codes[(idx == newest) & ~self.ends[idx]] = self.pending_next
+        for j in np.flatnonzero(self.ends[idx]):
+            next_codes[j] = np.frombuffer(self.final_codes[idx[j]], dtype=np.uint8)
+        return next_codes
+
+    def gather(self, idx):
+        """按槽位索引取出一批经验(解码为float32状态)
+
+        Returns:
+            ReplayBatch: 与ReplayBuffer.gather格式一致
+        """
+        returns, last, discounts = self._n_step_returns(idx)
+        return ReplayBatch(
+            states=self.codec.decode(self.codes[idx]),
+            actions=self.actions[idx].astype(np.int32),
+            rewards=returns,
+            next_states=self.codec.decode(self._next_codes(last)),
+            dones=self.dones[last].astype(np.float32),
+            discounts=discounts
+        )
+
+    def state_dict(self):
+        """导出缓冲区完整状态(包含片段边界旁路表与等待中的下一状态)"""
+        state = super().state_dict()
+        state['final_slots'] = np.fromiter(self.final_codes.keys(), dtype=np.int64, count=len(self.final_codes))
+        state['final_codes'] = np.frombuffer(b''.join(self.final_codes.values()),
+                                             dtype=np.uint8).reshape(-1, StateCodec.CODE_SIZE)
+        state['pending_next'] = (np.zeros(0, dtype=np.uint8) if self.pending_next is None
+                                 else np.asarray(self.pending_next, dtype=np.uint8))
+        return state
+
+    def load_state_dict(self, state):
+        if not super().load_state_dict(state):
+            return False
+        self.final_codes = {int(slot): code.tobytes() for slot, code in zip(state['final_slots'], state['final_codes'])}
+        self.pending_next = state['pending_next'].copy() if len(state['pending_next']) else None
+        return True
+
+    def memory_usage(self):
+        """统计缓冲区内存占用(包含片段边界旁路表)"""
+        usage = super().memory_usage()
+        side_bytes = sys.getsizeof(self.final_codes) + sum(sys.getsizeof(c) for c in self.final_codes.values())
+        usage['total_bytes'] += side_bytes
+        usage['bytes_per_transition'] = usage['total_bytes'] / self.capacity
+        return usage
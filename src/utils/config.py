@@ -1,236 +1,490 @@
-import sys
-import json
-from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent.parent))
-
-class ConfigLoader:
-    def __init__(self, config_file="config.json"):
-        self.config_file = Path(config_file)
-        self.config_data = self.load_config()
-        # 定义每个配置项的预期类型
-        self.type_definitions = {
-            "game": {
-                "GRID_WIDTH": int,
-                "GRID_HEIGHT": int,
-                "STATE_SIZE": int,
-                "ACTION_SIZE": int
-            },
-            "training": {
-                "EPISODES": int,
-                "BATCH_SIZE": int,
-                "GAMMA": float,
-                "LEARNING_RATE": float,
-                "EPSILON_INIT": float,
-                "EPSILON_MIN": float,
-                "EPSILON_DECAY": float,
-                "REPLAY_BUFFER_SIZE": int,
-                "TARGET_UPDATE_FREQ": int
-            },
-            "model": {
-                "SAVE_INTERVAL": int,
-                "MODEL_DIR": str,
-                "LOG_DIR": str,
-                "CHECKPOINT_PREFIX": str,
-                "MODEL_EXTENSION": str,
-                "TENSORBOARD_LOG_DIR": str
-            },
-            "test": {
-                "GRID_SIZE": int,
-                "TEST_EPISODES": int,
-                "MAX_STEPS": int,
-                "FPS": int,
-                "EXPLORATION_RATE": float,
-                "MIN_SCORE_THRESHOLD": int,
-                "MIN_LENGTH_THRESHOLD": int,
-                "PERFORMANCE_WINDOW": int,
-                "MIN_AVG_REWARD": float,
-                "MAX_TIME_PER_EPISODE": int,
-                "SNAKE_GROWTH_RATE_THRESHOLD": float,
-                "CONVERGENCE_THRESHOLD": float,
-                "EXPLORATION_EFFICIENCY_THRESHOLD": float,
-                "DECISION_QUALITY_THRESHOLD": float,
-                "STABILITY_WINDOW": int,
-                "MIN_Q_VALUE_DIFFERENCE": float,
-                "MODEL_DIR": str,
-                "MODEL_EXTENSION": str,
-                "RESULT_DIR": str,
-                "RESULT_IMG_DIR": str,
-                "RESULT_DATA_DIR": str,
-                "SAVE_GAMEPLAY_SCREEN": bool,
-                "SCREENSHOT_DIR": str,
-                "SCREENSHOT_QUALITY": int,
-                "SAVE_GAMEPLAY_GIF": bool,
-                "GIF_FPS": int,
-                "GIF_LOOP": int,
-                "GIF_QUALITY": int,
-                "GIF_SUBSAMPLE": int
-            }
-        }
-    
-    def load_config(self):
-        if self.config_file.exists():
-            with open(self.config_file, 'r') as f:
-                return json.load(f)
-        return {}
-    
-    def get_value(self, section, key, default=None):
-        if section in self.config_data and key in self.config_data[section]:
-            value = self.config_data[section][key]
-            # 尝试转换类型
-            if section in self.type_definitions and key in self.type_definitions[section]:
-                try:
-                    target_type = self.type_definitions[section][key]
-                    if target_type == bool:
-                        # 特殊处理布尔值
-                        return value.lower() == 'true' if isinstance(value, str) else bool(value)
-                    else:
-                        return target_type(value)
-                except (ValueError, TypeError) as e:
-                    print(f"警告: 无法将配置值 {section}.{key}={value} 转换为 {target_type.__name__} 类型")
-                    return default
-            return value
-        return default
-
-# 加载配置
-config_loader = ConfigLoader()
-
-class Config:
-    # ========================
-    # 游戏环境参数配置
-    # ========================
-
-    # 游戏网格宽度(单位：格子数)
-    GRID_WIDTH = config_loader.get_value("game", "GRID_WIDTH", 16)
-    # 游戏网格高度(单位：格子数)     
-    GRID_HEIGHT = config_loader.get_value("game", "GRID_HEIGHT", 8)
-    # 状态向量维度(12维特征)
-    STATE_SIZE = config_loader.get_value("game", "STATE_SIZE", 12)
-    # 动作空间大小(上、下、左、右)  
-    ACTION_SIZE = config_loader.get_value("game", "ACTION_SIZE", 4)
-    
-    # ========================
-    # 强化学习训练参数
-    # ========================
-
-    # 总训练轮次
-    EPISODES = config_loader.get_value("training", "EPISODES", 10000)
-    # 经验回放采样批量大小  
-    BATCH_SIZE = config_loader.get_value("training", "BATCH_SIZE", 64)
-    # 折扣因子(权衡当前奖励与未来奖励)
-    GAMMA = config_loader.get_value("training", "GAMMA", 0.90)
-    # 神经网络学习率
-    LEARNING_RATE = config_loader.get_value("training", "LEARNING_RATE", 0.0005)
-    # ε-贪婪策略初始探索率
-    EPSILON_INIT = config_loader.get_value("training", "EPSILON_INIT", 1.0)
-    # 最小探索率(保证持续探索)
-    EPSILON_MIN = config_loader.get_value("training", "EPSILON_MIN", 0.05)
-    # 探索率衰减系数(每轮乘以该值)
-    EPSILON_DECAY = config_loader.get_value("training", "EPSILON_DECAY", 0.995)
-    # 经验回放缓冲区容量
-    REPLAY_BUFFER_SIZE = config_loader.get_value("training", "REPLAY_BUFFER_SIZE", 20000)
-    # 目标网络更新频率
-    TARGET_UPDATE_FREQ = config_loader.get_value("training", "TARGET_UPDATE_FREQ", 300)
-    
-    # ========================
-    # 模型保存与日志配置
-    # ========================
-
-    # 每隔多少轮保存一次模型
-    SAVE_INTERVAL = config_loader.get_value("model", "SAVE_INTERVAL", 500)
-    # 模型保存目录
-    MODEL_DIR = Path(config_loader.get_value("model", "MODEL_DIR", "saved_models"))
-    # 训练日志目录
-    LOG_DIR = Path(config_loader.get_value("model", "LOG_DIR", "logs"))
-    # 模型文件名前缀           
-    CHECKPOINT_PREFIX = config_loader.get_value("model", "CHECKPOINT_PREFIX", "snake_agent_")
-    # 模型文件扩展名
-    MODEL_EXTENSION = config_loader.get_value("model", "MODEL_EXTENSION", ".keras")
-    
-    # TensorBoard配置
-    TENSORBOARD_LOG_DIR = Path(config_loader.get_value("model", "TENSORBOARD_LOG_DIR", "logs/tensorboard"))
-    
-    # 模型搜索模式
-    MODEL_PATTERNS = [
-        f"{CHECKPOINT_PREFIX}*" + MODEL_EXTENSION,  # 常规保存模型  
-        "interrupted_model_*" + MODEL_EXTENSION,    # 中断保存模型
-        "final_snake_model" + MODEL_EXTENSION,      # 最终模型 
-        "error_snake_model_*" + MODEL_EXTENSION     # 错误保存模型
-    ]
-
-class TestConfig:
-    # 游戏参数
-    GRID_SIZE = config_loader.get_value("test", "GRID_SIZE", 40)  # 每个格子的像素大小
-    GRID_WIDTH = config_loader.get_value("test", "GRID_WIDTH", 16)  # 与训练配置一致
-    GRID_HEIGHT = config_loader.get_value("test", "GRID_HEIGHT", 8)  # 与训练配置一致
-    
-    # 状态大小（与训练一致）
-    STATE_SIZE = config_loader.get_value("test", "STATE_SIZE", 12)
-    # 动作空间大小（与训练一致）
-    ACTION_SIZE = config_loader.get_value("test", "ACTION_SIZE", 4)
-    
-    # 颜色配置
-    BG_COLOR = (50, 50, 50)
-    GRID_COLOR = (80, 80, 80)
-    SNAKE_COLOR = (0, 255, 0)
-    HEAD_COLOR = (255, 0, 0)
-    FOOD_COLOR = (0, 0, 255)
-    TEXT_COLOR = (255, 255, 255)
-    
-    # 测试参数
-    # 测试轮次
-    TEST_EPISODES = config_loader.get_value("test", "TEST_EPISODES", 20)
-    # 每轮最大步数
-    MAX_STEPS = config_loader.get_value("test", "MAX_STEPS", 1000)
-    # 游戏帧率
-    FPS = config_loader.get_value("test", "FPS", 10)
-    # 测试时的探索率
-    EXPLORATION_RATE = config_loader.get_value("test", "EXPLORATION_RATE", 0.1)
-    # 最低分数阈值
-    MIN_SCORE_THRESHOLD = config_loader.get_value("test", "MIN_SCORE_THRESHOLD", 5)
-    # 最低长度阈值
-    MIN_LENGTH_THRESHOLD = config_loader.get_value("test", "MIN_LENGTH_THRESHOLD", 5)
-    # 性能评估窗口大小
-    PERFORMANCE_WINDOW = config_loader.get_value("test", "PERFORMANCE_WINDOW", 5)
-    # 最低平均奖励阈值
-    MIN_AVG_REWARD = config_loader.get_value("test", "MIN_AVG_REWARD", 0.5)
-    # 单轮最大允许时间(秒)
-    MAX_TIME_PER_EPISODE = config_loader.get_value("test", "MAX_TIME_PER_EPISODE", 60)
-    # 蛇长度增长率阈值
-    SNAKE_GROWTH_RATE_THRESHOLD = config_loader.get_value("test", "SNAKE_GROWTH_RATE_THRESHOLD", 0.3)
-    
-    # 收敛阈值(分数标准差)
-    CONVERGENCE_THRESHOLD = config_loader.get_value("test", "CONVERGENCE_THRESHOLD", 0.1)
-    # 探索效率阈值
-    EXPLORATION_EFFICIENCY_THRESHOLD = config_loader.get_value("test", "EXPLORATION_EFFICIENCY_THRESHOLD", 0.7)
-    # 决策质量阈值
-    DECISION_QUALITY_THRESHOLD = config_loader.get_value("test", "DECISION_QUALITY_THRESHOLD", 0.8)
-    # 稳定性评估窗口大小
-    STABILITY_WINDOW = config_loader.get_value("test", "STABILITY_WINDOW", 3)
-    # 最小Q值差异阈值
-    MIN_Q_VALUE_DIFFERENCE = config_loader.get_value("test", "MIN_Q_VALUE_DIFFERENCE", 0.5)
-    
-    # 模型路径
-    MODEL_DIR = Path(config_loader.get_value("test", "MODEL_DIR", "saved_models"))
-    MODEL_EXTENSION = config_loader.get_value("test", "MODEL_EXTENSION", ".keras")
-    MODEL_PATTERNS = [
-        "final_snake_model" + MODEL_EXTENSION,
-        "snake_agent_*" + MODEL_EXTENSION,
-        "interrupted_model_*" + MODEL_EXTENSION
-    ]
-    
-    # 结果保存路径
-    RESULT_DIR = Path(config_loader.get_value("test", "RESULT_DIR", "test_results"))
-    RESULT_IMG_DIR = Path(config_loader.get_value("test", "RESULT_IMG_DIR", "test_results/images"))
-    RESULT_DATA_DIR = Path(config_loader.get_value("test", "RESULT_DATA_DIR", "test_results/data"))
-    
-    # 游戏画面截图参数
-    SAVE_GAMEPLAY_SCREEN = config_loader.get_value("test", "SAVE_GAMEPLAY_SCREEN", True)  # 是否保存游戏画面
-    SCREENSHOT_DIR = Path(config_loader.get_value("test", "SCREENSHOT_DIR", "game_img"))  # 游戏画面保存目录
-    SCREENSHOT_QUALITY = config_loader.get_value("test", "SCREENSHOT_QUALITY", 95)  # 截图质量(1-100)
-    
-    # GIF生成参数
-    SAVE_GAMEPLAY_GIF = config_loader.get_value("test", "SAVE_GAMEPLAY_GIF", True)  # 是否保存游戏画面为GIF
-    GIF_FPS = config_loader.get_value("test", "GIF_FPS", 10)  # GIF帧率
-    GIF_LOOP = config_loader.get_value("test", "GIF_LOOP", 0)  # GIF循环次数，0表示无限循环
-    GIF_QUALITY = config_loader.get_value("test", "GIF_QUALITY", 85)  # GIF质量百分比
+import os
+import sys
+import json
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+class ConfigLoader:
+    def __init__(self, config_file="config.json"):
+        self.config_file = Path(config_file)
+        self.config_data = self.load_config()
+        # 定义每个配置项的预期类型
+        self.type_definitions = {
+            "game": {
+                "GRID_WIDTH": int,
+                "GRID_HEIGHT": int,
+                "STATE_SIZE": int,
+                "ACTION_SIZE": int
+            },
+            "training": {
+                "EPISODES": int,
+                "BATCH_SIZE": int,
+                "GAMMA": float,
+                "LEARNING_RATE": float,
+                "EPSILON_INIT": float,
+                "EPSILON_MIN": float,
+                "EPSILON_DECAY": float,
+                "REPLAY_BUFFER_SIZE": int,
+                "TARGET_UPDATE_FREQ": int,
+                "NUM_AGENTS": int,
+                "AGENT_SEED_BASE": int,
+                "N_STEP": int,
+                "MAX_EPISODE_STEPS": int
+            },
+            "schedule": {
+                "MODE": str,
+                "TRAIN_EVERY": int,
+                "GRADIENT_STEPS": int,
+                "EPSILON_DECAY_STEPS": int,
+                "TARGET_UPDATE_STEPS": int,
+                "SAVE_INTERVAL_STEPS": int,
+                "LOG_INTERVAL_STEPS": int,
+                "ACTOR_LEARNER": bool,
+                "POLICY_SYNC_STEPS": int,
+                "ACTOR_QUEUE_SIZE": int
+            },
+            "evaluation": {
+                "INTERVAL": int,
+                "EPISODES": int,
+                "SEED": int,
+                "MAX_STEPS": int
+            },
+            "control": {
+                "SOCKET": str,
+                "VERBOSITY": int
+            },
+            "logging": {
+                "QUEUE_SIZE": int,
+                "FLUSH_ROWS": int,
+                "FLUSH_INTERVAL": float,
+                "CHUNK_ROWS": int,
+                "CSV": bool
+            },
+            "checkpoint": {
+                "SAVE_REPLAY": bool,
+                "ASYNC": bool,
+                "KEEP_LAST": int,
+                "KEEP_BEST": int,
+                "THIN_BASE": int,
+                "WEIGHTS_ONLY": bool
+            },
+            "model": {
+                "SAVE_INTERVAL": int,
+                "MODEL_DIR": str,
+                "LOG_DIR": str,
+                "CHECKPOINT_PREFIX": str,
+                "MODEL_EXTENSION": str,
+                "TENSORBOARD_LOG_DIR": str
+            },
+            "replay": {
+                "BACKEND": str,
+                "FLUSH_INTERVAL": float,
+                "PRIORITIZED": bool,
+                "PRIORITY_ALPHA": float,
+                "PRIORITY_BETA_START": float,
+                "PRIORITY_BETA_STEPS": int,
+                "PRIORITY_EPSILON": float,
+                "PREFETCH_DEPTH": int
+            },
+            "distributed": {
+                "NUM_ACTORS": int,
+                "ACTOR_EPSILON_BASE": float,
+                "ACTOR_EPSILON_ALPHA": float,
+                "REMOTE_LISTEN": str,
+                "REMOTE_ACTORS": int,
+                "REMOTE_BATCH_STEPS": int,
+                "REMOTE_COMPRESSION": int,
+                "REMOTE_MAX_INFLIGHT": int,
+                "REMOTE_QUEUE_BATCHES": int
+            },
+            "network": {
+                "HIDDEN_UNITS": list,
+                "USE_BATCH_NORM": bool
+            },
+            "memory": {
+                "RSS_WATERMARK_MB": int,
+                "TF_WATERMARK_MB": int,
+                "CHECK_INTERVAL": int,
+                "LOG_INTERVAL": int
+            },
+            "cpu": {
+                "FORCE_CPU": bool,
+                "INTRA_OP_THREADS": int,
+                "INTER_OP_THREADS": int,
+                "ENABLE_ONEDNN": bool,
+                "CPU_AFFINITY": str
+            },
+            "test": {
+                "GRID_SIZE": int,
+                "TEST_EPISODES": int,
+                "MAX_STEPS": int,
+                "FPS": int,
+                "EXPLORATION_RATE": float,
+                "MIN_SCORE_THRESHOLD": int,
+                "MIN_LENGTH_THRESHOLD": int,
+                "PERFORMANCE_WINDOW": int,
+                "MIN_AVG_REWARD": float,
+                "MAX_TIME_PER_EPISODE": int,
+                "SNAKE_GROWTH_RATE_THRESHOLD": float,
+                "CONVERGENCE_THRESHOLD": float,
+                "EXPLORATION_EFFICIENCY_THRESHOLD": float,
+                "DECISION_QUALITY_THRESHOLD": float,
+                "STABILITY_WINDOW": int,
+                "MIN_Q_VALUE_DIFFERENCE": float,
+                "MODEL_DIR": str,
+                "MODEL_EXTENSION": str,
+                "RESULT_DIR": str,
+                "RESULT_IMG_DIR": str,
+                "RESULT_DATA_DIR": str,
+                "SAVE_GAMEPLAY_SCREEN": bool,
+                "SCREENSHOT_DIR": str,
+                "SCREENSHOT_QUALITY": int,
+                "SAVE_GAMEPLAY_GIF": bool,
+                "GIF_FPS": int,
+                "GIF_LOOP": int,
+                "GIF_QUALITY": int,
+                "GIF_SUBSAMPLE": int
+            }
+        }
+    
+    def load_config(self):
+        if self.config_file.exists():
+            with open(self.config_file, 'r') as f:
+                return json.load(f)
+        return {}
+    
+    def get_value(self, section, key, default=None):
+        if section in self.config_data and key in self.config_data[section]:
+            value = self.config_data[section][key]
+            # 尝试转换类型
+            if section in self.type_definitions and key in self.type_definitions[section]:
+                try:
+                    target_type = self.type_definitions[section][key]
+                    if target_type == bool:
+                        # 特殊处理布尔值
+                        return value.lower() == 'true' if isinstance(value, str) else bool(value)
+                    else:
+                        return target_type(value)
+                except (ValueError, TypeError) as e:
+                    print(f"警告: 无法将配置值 {section}.{key}={value} 转换为 {target_type.__name__} 类型")
+                    return default
+            return value
+        return default
+
+# 加载配置(环境变量SNAKE_CONFIG可指定其它配置文件，参数扫描时每个试验进程使用自己的配置)
+config_loader = ConfigLoader(os.environ.get("SNAKE_CONFIG", "config.json"))
+
+class Config:
+    # ========================
+    # 游戏环境参数配置
+    # ========================
+
+    # 游戏网格宽度(单位：格子数)
+    GRID_WIDTH = config_loader.get_value("game", "GRID_WIDTH", 16)
+    # 游戏网格高度(单位：格子数)     
+    GRID_HEIGHT = config_loader.get_value("game", "GRID_HEIGHT", 8)
+    # 状态向量维度(12维特征)
+    STATE_SIZE = config_loader.get_value("game", "STATE_SIZE", 12)
+    # 动作空间大小(上、下、左、右)  
+    ACTION_SIZE = config_loader.get_value("game", "ACTION_SIZE", 4)
+    
+    # ========================
+    # 强化学习训练参数
+    # ========================
+
+    # 总训练轮次
+    EPISODES = config_loader.get_value("training", "EPISODES", 10000)
+    # 经验回放采样批量大小  
+    BATCH_SIZE = config_loader.get_value("training", "BATCH_SIZE", 64)
+    # 折扣因子(权衡当前奖励与未来奖励)
+    GAMMA = config_loader.get_value("training", "GAMMA", 0.90)
+    # 神经网络学习率
+    LEARNING_RATE = config_loader.get_value("training", "LEARNING_RATE", 0.0005)
+    # ε-贪婪策略初始探索率
+    EPSILON_INIT = config_loader.get_value("training", "EPSILON_INIT", 1.0)
+    # 最小探索率(保证持续探索)
+    EPSILON_MIN = config_loader.get_value("training", "EPSILON_MIN", 0.05)
+    # 探索率衰减系数(每轮乘以该值)
+    EPSILON_DECAY = config_loader.get_value("training", "EPSILON_DECAY", 0.995)
+    # 经验回放缓冲区容量
+    REPLAY_BUFFER_SIZE = config_loader.get_value("training", "REPLAY_BUFFER_SIZE", 20000)
+    # 目标网络更新频率
+    TARGET_UPDATE_FREQ = config_loader.get_value("training", "TARGET_UPDATE_FREQ", 300)
+    # 同时训练的独立智能体数量(大于1时使用堆叠网络批量训练)
+    NUM_AGENTS = config_loader.get_value("training", "NUM_AGENTS", 1)
+    # 多智能体训练时的随机种子起始值(第k个智能体使用AGENT_SEED_BASE+k)
+    AGENT_SEED_BASE = config_loader.get_value("training", "AGENT_SEED_BASE", 0)
+    # n步回报的步数(1为单步TD目标)，奖励可以更快地沿轨迹向前传播
+    N_STEP = config_loader.get_value("training", "N_STEP", 1)
+    # 单轮最大步数，超过后截断片段(截断不视为终止状态，仍从下一状态自举)；0表示不限制
+    MAX_EPISODE_STEPS = config_loader.get_value("training", "MAX_EPISODE_STEPS", 0)
+
+    # ========================
+    # 训练调度配置
+    # ========================
+
+    # 调度模式: "episode"(按轮次计，ε按EPSILON_DECAY每轮衰减，与原有行为一致) / "step"(各间隔按环境步数计)
+    SCHEDULE_MODE = config_loader.get_value("schedule", "MODE", "episode")
+    # 每隔多少个环境步训练一次
+    TRAIN_EVERY = config_loader.get_value("schedule", "TRAIN_EVERY", 1)
+    # 每次训练执行的梯度更新次数(回放比 = GRADIENT_STEPS / TRAIN_EVERY)
+    GRADIENT_STEPS = config_loader.get_value("schedule", "GRADIENT_STEPS", 1)
+    # ε从EPSILON_INIT线性衰减到EPSILON_MIN所需的环境步数(step模式)
+    EPSILON_DECAY_STEPS = config_loader.get_value("schedule", "EPSILON_DECAY_STEPS", 100000)
+    # 每隔多少个环境步同步一次目标网络(step模式)
+    TARGET_UPDATE_STEPS = config_loader.get_value("schedule", "TARGET_UPDATE_STEPS", 5000)
+    # 每隔多少个环境步保存一次模型(step模式)，0表示只在训练结束时保存
+    SAVE_INTERVAL_STEPS = config_loader.get_value("schedule", "SAVE_INTERVAL_STEPS", 50000)
+    # 每隔多少个环境步记录一次步数/更新次数计数器与吞吐量，0表示不记录
+    LOG_INTERVAL_STEPS = config_loader.get_value("schedule", "LOG_INTERVAL_STEPS", 1000)
+    # 是否在独立线程中分别运行执行者(环境交互)与学习器(梯度更新)
+    ACTOR_LEARNER = config_loader.get_value("schedule", "ACTOR_LEARNER", False)
+    # 学习器每隔多少次梯度更新向执行者发布一次策略快照
+    POLICY_SYNC_STEPS = config_loader.get_value("schedule", "POLICY_SYNC_STEPS", 100)
+    # 执行者到学习器的经验队列长度(执行者最多领先学习器的步数)
+    ACTOR_QUEUE_SIZE = config_loader.get_value("schedule", "ACTOR_QUEUE_SIZE", 256)
+
+    # ========================
+    # 后台评估配置
+    # ========================
+
+    # 每隔多少轮把权重快照交给后台评估进程，0表示不评估
+    EVAL_INTERVAL = config_loader.get_value("evaluation", "INTERVAL", 100)
+    # 每次评估运行的贪婪策略轮数
+    EVAL_EPISODES = config_loader.get_value("evaluation", "EPISODES", 10)
+    # 评估环境的起始种子(第i轮为SEED + i，各次评估使用相同的局面)
+    EVAL_SEED = config_loader.get_value("evaluation", "SEED", 10000)
+    # 评估时每轮的最大步数
+    EVAL_MAX_STEPS = config_loader.get_value("evaluation", "MAX_STEPS", 1000)
+
+    # ========================
+    # 训练控制配置
+    # ========================
+
+    # 控制套接字地址("unix:/path"或"host:port")，"auto"表示LOG_DIR/control_<pid>.sock，""表示只用信号控制
+    CONTROL_SOCKET = config_loader.get_value("control", "SOCKET", "auto")
+    # 日志详细程度: 0只输出警告与错误，1正常，2额外输出每轮指标
+    LOG_VERBOSITY = config_loader.get_value("control", "VERBOSITY", 1)
+
+    # ========================
+    # 训练日志配置
+    # ========================
+
+    # 日志队列长度(训练循环放入记录后立即返回，队列满时等待日志线程写入)
+    LOG_QUEUE_SIZE = config_loader.get_value("logging", "QUEUE_SIZE", 1024)
+    # 日志线程每写入多少条记录刷新一次指标文件与TensorBoard文件
+    LOG_FLUSH_ROWS = config_loader.get_value("logging", "FLUSH_ROWS", 100)
+    # 有未刷新的记录时，最长多少秒刷新一次
+    LOG_FLUSH_INTERVAL = config_loader.get_value("logging", "FLUSH_INTERVAL", 5.0)
+    # 列式指标存储(LOG_DIR/training_metrics_<时间戳>)每个.npy分块的行数
+    LOG_CHUNK_ROWS = config_loader.get_value("logging", "CHUNK_ROWS", 4096)
+    # 训练时是否同时写入CSV日志(默认只写列式存储，需要时用python src/tools/metrics.py export导出CSV)
+    LOG_CSV = config_loader.get_value("logging", "CSV", False)
+
+    # ========================
+    # 训练检查点配置
+    # ========================
+
+    # 训练检查点是否包含回放缓冲区(恢复后无需重新积累经验；memmap缓冲区自行持久化，不受此项影响)
+    CHECKPOINT_SAVE_REPLAY = config_loader.get_value("checkpoint", "SAVE_REPLAY", False)
+    # 是否由后台线程写入检查点(训练循环只复制内存快照；写入期间的新快照合并为最新一份)
+    CHECKPOINT_ASYNC = config_loader.get_value("checkpoint", "ASYNC", True)
+    # 保留最近多少个带轮次的检查点(常规/中断/错误保存)，0表示不清理
+    CHECKPOINT_KEEP_LAST = config_loader.get_value("checkpoint", "KEEP_LAST", 5)
+    # 另外保留后台评估得分最高的多少个检查点
+    CHECKPOINT_KEEP_BEST = config_loader.get_value("checkpoint", "KEEP_BEST", 3)
+    # 更早的检查点按与最新轮次距离的对数分桶，每桶保留一个(底数)，小于2表示不保留更早的检查点
+    CHECKPOINT_THIN_BASE = config_loader.get_value("checkpoint", "THIN_BASE", 2)
+    # 间隔保存与中断保存是否只保存权重(.npz，按QNetwork结构重建)，完整的.keras只用于最终模型与导出
+    CHECKPOINT_WEIGHTS_ONLY = config_loader.get_value("checkpoint", "WEIGHTS_ONLY", True)
+    
+    # ========================
+    # 模型保存与日志配置
+    # ========================
+
+    # 每隔多少轮保存一次模型
+    SAVE_INTERVAL = config_loader.get_value("model", "SAVE_INTERVAL", 500)
+    # 模型保存目录
+    MODEL_DIR = Path(config_loader.get_value("model", "MODEL_DIR", "saved_models"))
+    # 训练日志目录
+    LOG_DIR = Path(config_loader.get_value("model", "LOG_DIR", "logs"))
+    # 模型文件名前缀           
+    CHECKPOINT_PREFIX = config_loader.get_value("model", "CHECKPOINT_PREFIX", "snake_agent_")
+    # 模型文件扩展名
+    MODEL_EXTENSION = config_loader.get_value("model", "MODEL_EXTENSION", ".keras")
+    
+    # TensorBoard配置
+    TENSORBOARD_LOG_DIR = Path(config_loader.get_value("model", "TENSORBOARD_LOG_DIR", "logs/tensorboard"))
+    
+    # 模型搜索模式
+    MODEL_PATTERNS = [
+        f"{CHECKPOINT_PREFIX}*" + MODEL_EXTENSION,  # 常规保存模型  
+        "interrupted_model_*" + MODEL_EXTENSION,    # 中断保存模型
+        "final_snake_model" + MODEL_EXTENSION,      # 最终模型 
+        "error_snake_model_*" + MODEL_EXTENSION,    # 错误保存模型
+        f"{CHECKPOINT_PREFIX}*.npz",                # 只含权重的常规保存模型
+        "interrupted_model_*.npz"                   # 只含权重的中断保存模型
+    ]
+
+    # ========================
+    # 经验回放配置
+    # ========================
+
+    # 回放缓冲区存储方式: "array"(预分配数组) / "compact"(压缩存储，约11字节/条)
+    #                    / "memmap"(磁盘映射文件，容量可超过内存，重启后自动恢复)
+    #                    / "dedup"(重复经验只存一份并计数)
+    REPLAY_BACKEND = config_loader.get_value("replay", "BACKEND", "array")
+    # 磁盘回放缓冲区的刷新间隔(秒)，崩溃时最多丢失这段时间内的经验
+    REPLAY_FLUSH_INTERVAL = config_loader.get_value("replay", "FLUSH_INTERVAL", 5.0)
+    # 是否启用优先经验回放(按TD误差比例采样，可与任一存储方式组合)
+    PRIORITIZED_REPLAY = config_loader.get_value("replay", "PRIORITIZED", False)
+    # 优先级指数α(0等价于均匀采样)
+    PRIORITY_ALPHA = config_loader.get_value("replay", "PRIORITY_ALPHA", 0.6)
+    # 重要性采样指数β的初值(随采样次数线性增加到1)
+    PRIORITY_BETA_START = config_loader.get_value("replay", "PRIORITY_BETA_START", 0.4)
+    # β增加到1所需的采样(训练)次数
+    PRIORITY_BETA_STEPS = config_loader.get_value("replay", "PRIORITY_BETA_STEPS", 100000)
+    # 加在|TD误差|上的小常数，避免优先级为0的经验永远不被采样
+    PRIORITY_EPSILON = config_loader.get_value("replay", "PRIORITY_EPSILON", 1e-6)
+    # 后台预取的批量数(采样线程提前准备好的张量批量)，0表示在训练线程中同步采样
+    PREFETCH_DEPTH = config_loader.get_value("replay", "PREFETCH_DEPTH", 2)
+
+    # ========================
+    # 多进程执行者配置
+    # ========================
+
+    # 执行者进程数(每个进程运行自己的环境并写入独占的共享内存回放分片)，0表示不使用多进程执行者
+    NUM_ACTORS = config_loader.get_value("distributed", "NUM_ACTORS", 0)
+    # 执行者探索率的底数(第i个执行者的ε = BASE^(1 + ALPHA·i/(N-1)))
+    ACTOR_EPSILON_BASE = config_loader.get_value("distributed", "ACTOR_EPSILON_BASE", 0.4)
+    # 执行者探索率的指数跨度
+    ACTOR_EPSILON_ALPHA = config_loader.get_value("distributed", "ACTOR_EPSILON_ALPHA", 7.0)
+    # 远程执行者的监听地址("host:port"或"unix:/path")，非空时本进程作为学习器等待通过套接字连接的执行者
+    REMOTE_LISTEN = config_loader.get_value("distributed", "REMOTE_LISTEN", "")
+    # 预计的远程执行者数(用于为第i个连接的执行者分配探索率)
+    REMOTE_ACTORS = config_loader.get_value("distributed", "REMOTE_ACTORS", 4)
+    # 远程执行者每批发送的经验条数
+    REMOTE_BATCH_STEPS = config_loader.get_value("distributed", "REMOTE_BATCH_STEPS", 64)
+    # 消息的zlib压缩级别(0-9)，0表示不压缩
+    REMOTE_COMPRESSION = config_loader.get_value("distributed", "REMOTE_COMPRESSION", 1)
+    # 每个远程执行者最多未被学习器接收的批量数(信用数)，用完后执行者暂停交互
+    REMOTE_MAX_INFLIGHT = config_loader.get_value("distributed", "REMOTE_MAX_INFLIGHT", 4)
+    # 学习器接收队列可容纳的批量数，队满时不再归还信用
+    REMOTE_QUEUE_BATCHES = config_loader.get_value("distributed", "REMOTE_QUEUE_BATCHES", 64)
+
+    # ========================
+    # 网络结构配置
+    # ========================
+
+    # 各隐藏层神经元数(可由arch_search.py搜索后写入)
+    HIDDEN_UNITS = config_loader.get_value("network", "HIDDEN_UNITS", [128, 64])
+    # 隐藏层后是否接BatchNormalization
+    USE_BATCH_NORM = config_loader.get_value("network", "USE_BATCH_NORM", True)
+
+    # ========================
+    # 内存清理配置
+    # ========================
+
+    # 进程常驻内存(RSS)水位线(MB)，超过时才执行垃圾回收/清理会话；0表示不检查
+    MEMORY_RSS_WATERMARK_MB = config_loader.get_value("memory", "RSS_WATERMARK_MB", 4096)
+    # TensorFlow分配器(GPU)用量水位线(MB)；0表示不检查
+    MEMORY_TF_WATERMARK_MB = config_loader.get_value("memory", "TF_WATERMARK_MB", 0)
+    # 内存采样间隔(轮)
+    MEMORY_CHECK_INTERVAL = config_loader.get_value("memory", "CHECK_INTERVAL", 1)
+    # 输出内存用量与增长速度的间隔(轮)，0表示不输出
+    MEMORY_LOG_INTERVAL = config_loader.get_value("memory", "LOG_INTERVAL", 100)
+
+    # ========================
+    # CPU执行配置
+    # ========================
+
+    # 强制使用CPU训练(忽略GPU)
+    FORCE_CPU = config_loader.get_value("cpu", "FORCE_CPU", False)
+    # 单个算子内部并行线程数(0表示由TensorFlow自动决定)
+    INTRA_OP_THREADS = config_loader.get_value("cpu", "INTRA_OP_THREADS", 0)
+    # 算子之间并行线程数(0表示由TensorFlow自动决定)
+    INTER_OP_THREADS = config_loader.get_value("cpu", "INTER_OP_THREADS", 0)
+    # 是否启用oneDNN优化(必须在导入TensorFlow之前生效)
+    ENABLE_ONEDNN = config_loader.get_value("cpu", "ENABLE_ONEDNN", True)
+    # 进程CPU亲和性，如"0-3"或"0,2,4"，留空表示不限制
+    CPU_AFFINITY = config_loader.get_value("cpu", "CPU_AFFINITY", "")
+
+class TestConfig:
+    # 游戏参数
+    GRID_SIZE = config_loader.get_value("test", "GRID_SIZE", 40)  # 每个格子的像素大小
+    GRID_WIDTH = config_loader.get_value("test", "GRID_WIDTH", 16)  # 与训练配置一致
+    GRID_HEIGHT = config_loader.get_value("test", "GRID_HEIGHT", 8)  # 与训练配置一致
+    
+    # 状态大小（与训练一致）
+    STATE_SIZE = config_loader.get_value("test", "STATE_SIZE", 12)
+    # 动作空间大小（与训练一致）
+    ACTION_SIZE = config_loader.get_value("test", "ACTION_SIZE", 4)
+    
+    # 颜色配置
+    BG_COLOR = (50, 50, 50)
+    GRID_COLOR = (80, 80, 80)
+    SNAKE_COLOR = (0, 255, 0)
+    HEAD_COLOR = (255, 0, 0)
+    FOOD_COLOR = (0, 0, 255)
+    TEXT_COLOR = (255, 255, 255)
+    
+    # 测试参数
+    # 测试轮次
+    TEST_EPISODES = config_loader.get_value("test", "TEST_EPISODES", 20)
+    # 每轮最大步数
+    MAX_STEPS = config_loader.get_value("test", "MAX_STEPS", 1000)
+    # 游戏帧率
+    FPS = config_loader.get_value("test", "FPS", 10)
+    # 测试时的探索率
+    EXPLORATION_RATE = config_loader.get_value("test", "EXPLORATION_RATE", 0.1)
+    # 最低分数阈值
+    MIN_SCORE_THRESHOLD = config_loader.get_value("test", "MIN_SCORE_THRESHOLD", 5)
+    # 最低长度阈值
+    MIN_LENGTH_THRESHOLD = config_loader.get_value("test", "MIN_LENGTH_THRESHOLD", 5)
+    # 性能评估窗口大小
+    PERFORMANCE_WINDOW = config_loader.get_value("test", "PERFORMANCE_WINDOW", 5)
+    # 最低平均奖励阈值
+    MIN_AVG_REWARD = config_loader.get_value("test", "MIN_AVG_REWARD", 0.5)
+    # 单轮最大允许时间(秒)
+    MAX_TIME_PER_EPISODE = config_loader.get_value("test", "MAX_TIME_PER_EPISODE", 60)
+    # 蛇长度增长率阈值
+    SNAKE_GROWTH_RATE_THRESHOLD = config_loader.get_value("test", "SNAKE_GROWTH_RATE_THRESHOLD", 0.3)
+    
+    # 收敛阈值(分数标准差)
+    CONVERGENCE_THRESHOLD = config_loader.get_value("test", "CONVERGENCE_THRESHOLD", 0.1)
+    # 探索效率阈值
+    EXPLORATION_EFFICIENCY_THRESHOLD = config_loader.get_value("test", "EXPLORATION_EFFICIENCY_THRESHOLD", 0.7)
+    # 决策质量阈值
+    DECISION_QUALITY_THRESHOLD = config_loader.get_value("test", "DECISION_QUALITY_THRESHOLD", 0.8)
+    # 稳定性评估窗口大小
+    STABILITY_WINDOW = config_loader.get_value("test", "STABILITY_WINDOW", 3)
+    # 最小Q值差异阈值
+    MIN_Q_VALUE_DIFFERENCE = config_loader.get_value("test", "MIN_Q_VALUE_DIFFERENCE", 0.5)
+    
+    # 模型路径
+    MODEL_DIR = Path(config_loader.get_value("test", "MODEL_DIR", "saved_models"))
+    MODEL_EXTENSION = config_loader.get_value("test", "MODEL_EXTENSION", ".keras")
+    MODEL_PATTERNS = [
+        "final_snake_model" + MODEL_EXTENSION,
+        "snake_agent_*" + MODEL_EXTENSION,
+        "interrupted_model_*" + MODEL_EXTENSION,
+        "snake_agent_*.npz",
+        "interrupted_model_*.npz"
+    ]
+    
+    # 结果保存路径
+    RESULT_DIR = Path(config_loader.get_value("test", "RESULT_DIR", "test_results"))
+    RESULT_IMG_DIR = Path(config_loader.get_value("test", "RESULT_IMG_DIR", "test_results/images"))
+    RESULT_DATA_DIR = Path(config_loader.get_value("test", "RESULT_DATA_DIR", "test_results/data"))
+    
+    # 游戏画面截图参数
+    SAVE_GAMEPLAY_SCREEN = config_loader.get_value("test", "SAVE_GAMEPLAY_SCREEN", True)  # 是否保存游戏画面
+    SCREENSHOT_DIR = Path(config_loader.get_value("test", "SCREENSHOT_DIR", "game_img"))  # 游戏画面保存目录
+    SCREENSHOT_QUALITY = config_loader.get_value("test", "SCREENSHOT_QUALITY", 95)  # 截图质量(1-100)
+    
+    # GIF生成参数
+    SAVE_GAMEPLAY_GIF = config_loader.get_value("test", "SAVE_GAMEPLAY_GIF", True)  # 是否保存游戏画面为GIF
+    GIF_FPS = config_loader.get_value("test", "GIF_FPS", 10)  # GIF帧率
+    GIF_LOOP = config_loader.get_value("test", "GIF_LOOP", 0)  # GIF循环次数，0表示无限循环
+    GIF_QUALITY = config_loader.get_value("test", "GIF_QUALITY", 85)  # GIF质量百分比
     GIF_SUBSAMPLE = config_loader.get_value("test", "GIF_SUBSAMPLE", 1)  # 每隔N帧取一帧，减少GIF文件大小
\ No newline at end of file
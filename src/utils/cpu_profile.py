@@ -0,0 +1,77 @@
+import os
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+
+
+def parse_cpu_list(spec):
+    """解析CPU编号列表
+
+    Args:
+        spec (str): 形如"0-3"、"0,2,4"或"0-1,6"的字符串
+
+    Returns:
+        list: 排序后的CPU编号，空字符串返回空列表
+    """
+    cpus = set()
+    for part in str(spec).replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cpus.update(range(int(start), int(end) + 1))
+        else:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+def set_cpu_affinity(spec):
+    """设置当前进程的CPU亲和性
+
+    Linux下使用os.sched_setaffinity，其它平台尝试使用psutil。
+
+    Args:
+        spec (str): CPU编号列表字符串
+
+    Returns:
+        bool: 设置成功返回True
+    """
+    cpus = parse_cpu_list(spec)
+    if not cpus:
+        return False
+    try:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cpus)
+        else:
+            import psutil
+            psutil.Process().cpu_affinity(cpus)
+        return True
+    except ImportError:
+        ColorLogger.warning("当前平台不支持设置CPU亲和性(缺少psutil)，已忽略CPU_AFFINITY")
+    except (OSError, ValueError) as e:
+        ColorLogger.warning(f"设置CPU亲和性失败: {str(e)}")
+    return False
+
+
+def apply_cpu_profile(enable_onednn=None, cpu_affinity=None):
+    """应用不依赖TensorFlow的CPU执行配置
+
+    oneDNN开关通过环境变量TF_ENABLE_ONEDNN_OPTS控制，只在导入TensorFlow之前设置才有效，
+    因此该函数应在训练入口最早处调用。线程池大小见device.configure_cpu_threads。
+
+    Args:
+        enable_onednn (bool): 是否启用oneDNN，默认读取Config.ENABLE_ONEDNN
+        cpu_affinity (str): CPU亲和性，默认读取Config.CPU_AFFINITY
+    """
+    enable_onednn = Config.ENABLE_ONEDNN if enable_onednn is None else enable_onednn
+    cpu_affinity = Config.CPU_AFFINITY if cpu_affinity is None else cpu_affinity
+
+    if "tensorflow" in sys.modules:
+        ColorLogger.warning("TensorFlow已导入，ENABLE_ONEDNN设置将不会生效")
+    os.environ["TF_ENABLE_ONEDNN_OPTS"] = "1" if enable_onednn else "0"
+
+    if cpu_affinity and set_cpu_affinity(cpu_affinity):
+        print(f"\n[设备]CPU亲和性: {parse_cpu_list(cpu_affinity)}")
@@ -0,0 +1,188 @@
+import sys
+import hashlib
+import numpy as np
+from src.utils.logger import ColorLogger
+from src.utils.replay_buffer import ReplayBuffer, ReplayBatch, unpack_experience
+
+class DedupReplayBuffer(ReplayBuffer):
+    """去重存储的经验回放缓冲区
+
+    12维状态、16x8的网格上大量经验完全相同(尤其是训练初期蛇在中央附近徘徊时)。
+    本实现以(state, action, reward, next_state, done)的64位哈希为键，每种不同的经验只存一份并记录出现次数：
+    - 环形数组中每个槽位只存一个指向去重表的编号(int32)和片段边界标志
+    - 去重表按需倍增，计数归零的条目回收复用
+    - 哈希命中时会逐字段核对，发生碰撞的经验单独存放而不会被错误合并
+    均匀采样槽位再映射到去重表，即按出现次数成比例采样，与ReplayBuffer在统计上完全等价
+    (包括FIFO淘汰与n步回报)，只是重复经验不再占用多份内存。
+    """
+    INITIAL_TABLE_SIZE = 1024
+    TABLE_FIELDS = ('unique_states', 'unique_actions', 'unique_rewards', 'unique_next_states', 'unique_dones', 'counts')
+
+    def __init__(self, capacity):
+        self.index = {}  # 经验哈希 -> 去重表编号
+        self.free_ids = []  # 可复用的去重表编号
+        self.keys = []  # 去重表编号 -> 经验哈希(回收时用于删除索引；未进入索引的碰撞条目为None)
+        self.table_size = 0  # 去重表已使用的最大编号
+        super().__init__(capacity)
+        self._allocate_table(min(self.capacity, self.INITIAL_TABLE_SIZE))
+
+    def _init_storage(self):
+        self.slot_ids = self._allocate('slot_ids', (self.capacity,), np.int32)  # 槽位 -> 去重表编号
+        self.ends = self._allocate('ends', (self.capacity,), np.bool_)  # 片段边界(终止、截断或不连续)
+
+    def _allocate_table(self, rows):
+        """分配(或扩容)去重表，保留已有条目"""
+        def grow(name, shape, dtype):
+            array = np.zeros(shape, dtype=dtype)
+            old = getattr(self, name, None)
+            if old is not None:
+                array[:len(old)] = old
+            setattr(self, name, array)
+
+        grow('unique_states', (rows, self.state_size), np.float32)
+        grow('unique_actions', (rows,), np.int32)
+        grow('unique_rewards', (rows,), np.float32)
+        grow('unique_next_states', (rows, self.state_size), np.float32)
+        grow('unique_dones', (rows,), np.bool_)
+        grow('counts', (rows,), np.int32)
+        self.keys.extend([None] * (rows - len(self.keys)))
+
+    def _release(self, uid):
+        """减少一个条目的计数，归零时回收"""
+        self.counts[uid] -= 1
+        if self.counts[uid] == 0:
+            if self.keys[uid] is not None:
+                del self.index[self.keys[uid]]
+            self.keys[uid] = None
+            self.free_ids.append(uid)
+
+    def _insert(self, key, state, action, reward, next_state, terminal):
+        """向去重表写入一种新经验并返回编号"""
+        if self.free_ids:
+            uid = self.free_ids.pop()
+        else:
+            if self.table_size == len(self.counts):
+                self._allocate_table(min(self.capacity, 2 * len(self.counts)))
+            uid = self.table_size
+            self.table_size += 1
+        self.unique_states[uid] = state
+        self.unique_actions[uid] = action
+        self.unique_rewards[uid] = reward
+        self.unique_next_states[uid] = next_state
+        self.unique_dones[uid] = terminal
+        self.counts[uid] = 0
+        if key is not None:
+            self.keys[uid] = key
+            self.index[key] = uid
+        return uid
+
+    def _matches(self, uid, state, action, reward, next_state, terminal):
+        """核对去重表条目与经验是否逐字段相同(排除哈希碰撞)"""
+        return (self.unique_actions[uid] == action and self.unique_rewards[uid] == np.float32(reward)
+                and self.unique_dones[uid] == terminal and np.array_equal(self.unique_states[uid], state)
+                and np.array_equal(self.unique_next_states[uid], next_state))
+
+    def add(self, experience):
+        """添加经验到缓冲区(重复经验只增加计数)
+
+        Args:
+            experience (tuple): 包含(state, action, reward, next_state, done[, truncated])的经验元组
+        """
+        state, action, reward, next_state, terminal, episode_end = unpack_experience(experience)
+        state = np.asarray(state, dtype=np.float32)
+        next_state = np.asarray(next_state, dtype=np.float32)
+        digest = hashlib.blake2b(state.tobytes(), digest_size=8)
+        digest.update(next_state.tobytes())
+        digest.update(np.int32(action).tobytes() + np.float32(reward).tobytes() + (b'\x01' if terminal else b'\x00'))
+        key = int.from_bytes(digest.digest(), 'little')
+
+        i = self.position
+        if self.size > 0:
+            prev = (i - 1) % self.capacity
+            if not self.ends[prev] and not np.array_equal(self.unique_next_states[self.slot_ids[prev]], state):
+                self.ends[prev] = True
+        if self.size == self.capacity:
+            self._release(self.slot_ids[i])
+
+        uid = self.index.get(key)
+        if uid is None:
+            uid = self._insert(key, state, action, reward, next_state, terminal)
+        elif not self._matches(uid, state, action, reward, next_state, terminal):
+            uid = self._insert(None, state, action, reward, next_state, terminal)
+        self.counts[uid] += 1
+        self.slot_ids[i] = uid
+        self.ends[i] = episode_end
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def _slot_rewards(self, idx):
+        return self.unique_rewards[self.slot_ids[idx]]
+
+    def gather(self, idx):
+        """按槽位索引取出一批经验(经去重表间接寻址)"""
+        ids = self.slot_ids[idx]
+        returns, last, discounts = self._n_step_returns(idx)
+        last_ids = self.slot_ids[last]
+        return ReplayBatch(
+            states=self.unique_states[ids],
+            actions=self.unique_actions[ids],
+            rewards=returns,
+            next_states=self.unique_next_states[last_ids],
+            dones=self.unique_dones[last_ids].astype(np.float32),
+            discounts=discounts
+        )
+
+    def state_dict(self):
+        """导出缓冲区完整状态(包含去重表、哈希与可复用编号，哈希索引在恢复时重建)"""
+        state = super().state_dict()
+        for name in self.TABLE_FIELDS:
+            state[name] = getattr(self, name)[:self.table_size]
+        keys = self.keys[:self.table_size]
+        state['keys'] = np.array([0 if key is None else key for key in keys], dtype=np.uint64)
+        state['has_key'] = np.array([key is not None for key in keys], dtype=np.bool_)
+        state['free_ids'] = np.array(self.free_ids, dtype=np.int64)
+        return state
+
+    def load_state_dict(self, state):
+        if not super().load_state_dict(state):
+            return False
+        rows = len(state['counts'])
+        self._allocate_table(max(rows, len(self.counts)))
+        for name in self.TABLE_FIELDS:
+            table = getattr(self, name)
+            table[:rows] = state[name]
+            table[rows:] = 0
+        self.table_size = rows
+        self.keys = [int(key) if has_key else None for key, has_key in zip(state['keys'], state['has_key'])]
+        self.keys.extend([None] * (len(self.counts) - rows))
+        self.index = {key: uid for uid, key in enumerate(self.keys) if key is not None}
+        self.free_ids = [int(uid) for uid in state['free_ids']]
+        return True
+
+    @property
+    def unique_count(self):
+        """当前不同经验的数量"""
+        return int(np.count_nonzero(self.counts[:self.table_size]))
+
+    def compression_ratio(self):
+        """已存经验数 / 不同经验数"""
+        return self.size / self.unique_count if self.unique_count else 1.0
+
+    def memory_usage(self):
+        """统计缓冲区内存占用(包含去重表与哈希索引)"""
+        usage = super().memory_usage()
+        table_bytes = sum(a.nbytes for a in (self.unique_states, self.unique_actions, self.unique_rewards,
+                                             self.unique_next_states, self.unique_dones, self.counts))
+        index_bytes = (sys.getsizeof(self.index) + sys.getsizeof(self.keys)
+                       + sum(sys.getsizeof(k) for k in self.index))
+        usage['total_bytes'] += table_bytes + index_bytes
+        usage['bytes_per_transition'] = usage['total_bytes'] / self.capacity
+        usage['unique'] = self.unique_count
+        usage['compression_ratio'] = self.compression_ratio()
+        return usage
+
+    def report_memory_usage(self):
+        """输出缓冲区内存占用与去重压缩比"""
+        super().report_memory_usage()
+        ColorLogger.info(f"去重存储: {self.size}条经验中有{self.unique_count}种不同经验，"
+                         f"压缩比 {self.compression_ratio():.2f}x")
@@ -1,23 +1,44 @@
-import tensorflow as tf
-
-def get_training_device(force_cpu=False):
-    """自动选择最优训练设备"""
-    if force_cpu:
-        print("\n[设备]强制使用CPU模式")
-        return '/CPU:0'
-    
-    gpus = tf.config.list_physical_devices('GPU')
-    if gpus:
-        try:
-            for gpu in gpus:
-                tf.config.experimental.set_memory_growth(gpu, True)
-            print(f"\n[设备]使用GPU: {tf.test.gpu_device_name()}")
-            return '/GPU:0'
-        except RuntimeError as e:
-            print(f"\n[设备]GPU初始化失败: {str(e)}")
-            return '/CPU:0'
-    else:
-        print("\n[设备] 未检测到GPU，使用CPU")
-        return '/CPU:0'
-    
+import tensorflow as tf
+from src.utils.config import Config
+
+_threads_configured = False  # 线程池是否已设置过(显式设置优先于配置文件)
+
+def configure_cpu_threads(intra_op_threads=None, inter_op_threads=None):
+    """设置TensorFlow CPU线程池大小(0表示由TensorFlow自动决定)
+
+    必须在TensorFlow运行时初始化(执行第一个算子)之前调用，否则设置不会生效。
+    """
+    global _threads_configured
+    _threads_configured = True
+    intra_op_threads = Config.INTRA_OP_THREADS if intra_op_threads is None else intra_op_threads
+    inter_op_threads = Config.INTER_OP_THREADS if inter_op_threads is None else inter_op_threads
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+    except RuntimeError as e:
+        print(f"\n[设备]线程池设置失败(TensorFlow已初始化): {str(e)}")
+
+def get_training_device(force_cpu=False):
+    """自动选择最优训练设备"""
+    if not _threads_configured:
+        configure_cpu_threads()
+
+    if force_cpu or Config.FORCE_CPU:
+        print("\n[设备]强制使用CPU模式")
+        return '/CPU:0'
+
+    gpus = tf.config.list_physical_devices('GPU')
+    if gpus:
+        try:
+            for gpu in gpus:
+                tf.config.experimental.set_memory_growth(gpu, True)
+            print(f"\n[设备]使用GPU: {tf.test.gpu_device_name()}")
+            return '/GPU:0'
+        except RuntimeError as e:
+            print(f"\n[设备]GPU初始化失败: {str(e)}")
+            return '/CPU:0'
+    else:
+        print("\n[设备] 未检测到GPU，使用CPU")
+        return '/CPU:0'
+
 get_training_device()
\ No newline at end of file
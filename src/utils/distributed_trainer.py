@@ -0,0 +1,264 @@
+import os
+import time
+import queue
+import datetime
+import multiprocessing
+import numpy as np
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils.agent_trainer import AgentTrainer
+from src.utils.shared_replay import SharedReplayShard, ShardedReplayBuffer, SharedWeights
+from src.utils.apex_actor import run_actor, actor_epsilon
+
+class MultiActorTrainer(AgentTrainer):
+    """多执行者训练的学习器基类
+
+    执行者在其它进程(或其它主机)中与环境交互，本进程只做学习器：汇总执行者上报的单轮统计、
+    收集经验、在回放比不超过调度的GRADIENT_STEPS / TRAIN_EVERY时持续训练，并每POLICY_SYNC_STEPS次更新发布一次权重。
+    环境步数为所有执行者的累计步数，目标网络同步、保存等按步数的调度在跨过间隔时触发；
+    每LOG_INTERVAL_STEPS个环境步输出一次每个执行者的步数/秒与参数滞后。
+    子类实现执行者的启动/停止、经验收集、单轮统计与权重发布等传输相关的部分。
+    """
+
+    def __init__(self, agent, env_handler, replay_buffer, model_manager, logger):
+        super().__init__(agent, env_handler, replay_buffer, model_manager, logger)
+        self.actor_log_point = (time.perf_counter(), {})  # 上次输出吞吐量时的(时间, 各执行者累计步数)
+
+    def _start_actors(self):
+        raise NotImplementedError
+
+    def _stop_actors(self):
+        raise NotImplementedError
+
+    def _actors_alive(self):
+        """执行者是否仍可能产生经验"""
+        raise NotImplementedError
+
+    def _collect_experience(self, timeout):
+        """收集执行者新产生的经验并更新self.env_steps，最多等待timeout秒"""
+        raise NotImplementedError
+
+    def _next_actor_episode(self):
+        """取出一条执行者上报的单轮统计，没有时返回None"""
+        raise NotImplementedError
+
+    def _publish_weights(self):
+        """向执行者发布当前权重"""
+        raise NotImplementedError
+
+    def _actor_step_counts(self):
+        """各执行者的累计环境步数
+
+        Returns:
+            dict: 执行者编号 -> 累计步数
+        """
+        raise NotImplementedError
+
+    def _param_lag(self):
+        """执行者所用权重平均落后于学习器的梯度更新次数"""
+        raise NotImplementedError
+
+    def _actor_queue_size(self):
+        """学习器尚未处理的执行者消息数"""
+        return 0
+
+    def _run_training(self, start_episode, pbar):
+        """学习器循环：汇总单轮统计、按步数调度、在回放比允许时训练，否则等待执行者的经验
+
+        Returns:
+            int: 最后处理的轮次
+        """
+        self._start_actors()
+        episode = start_episode
+        loss_sum, updates = 0, 0
+        try:
+            while episode < Config.EPISODES:
+                if self.monitor.should_end():
+                    ColorLogger.warning("\n用户请求退出训练...")
+                    self._save_model(episode, is_interrupted=True)
+                    break
+                if not self._actors_alive():
+                    raise RuntimeError("所有执行者均已退出")
+
+                # 汇总执行者完成的轮次(每轮以全局轮次编号记录)
+                while episode < Config.EPISODES:
+                    stats = self._next_actor_episode()
+                    if stats is None:
+                        break
+                    self.current_episode = episode
+                    metrics = self._actor_episode_metrics(stats, loss_sum, updates)
+                    loss_sum, updates = 0, 0
+                    pbar.update(1)
+                    self._report_episode(episode, metrics, pbar)
+                    self._finish_episode(episode, metrics)
+                    episode += 1
+
+                previous_steps = self.env_steps
+                # 回放比未超过调度时训练，否则等待执行者产生更多经验
+                if self.grad_steps < self.schedule.replay_ratio * self.env_steps:
+                    loss = self._experience_replay()
+                    if loss is None:
+                        self._collect_experience(timeout=0.01)
+                    else:
+                        loss_sum += loss
+                        updates += 1
+                        if self.grad_steps % max(1, Config.POLICY_SYNC_STEPS) == 0:
+                            self._publish_weights()
+                else:
+                    self._collect_experience(timeout=0.001)
+                self._on_env_steps(previous_steps, episode)
+        finally:
+            self._stop_actors()
+        return max(start_episode, episode - 1)
+
+    def _actor_episode_metrics(self, stats, loss_sum, updates):
+        """把执行者上报的单轮统计转换为日志指标"""
+        elapsed_time = time.time() - self.logger.training_start_time
+        return {
+            'score': stats['score'],
+            'total_reward': stats['total_reward'],
+            'steps': stats['steps'],
+            'avg_loss': loss_sum / updates if updates > 0 else 0,
+            'avg_inference_time': 0,
+            'epsilon': stats['epsilon'],
+            'episode_time': stats['episode_time'],
+            'episode_time_str': str(datetime.timedelta(seconds=int(stats['episode_time']))),
+            'elapsed_time': elapsed_time,
+            'elapsed_time_str': str(datetime.timedelta(seconds=int(elapsed_time))),
+            'gpu_memory': 0,
+            'env_steps': self.env_steps,
+            'grad_steps': self.grad_steps,
+            'param_lag': self._param_lag(),
+            'actor_queue': self._actor_queue_size()
+        }
+
+    def _on_env_steps(self, previous_steps, episode):
+        """环境步数从previous_steps跨到当前值时触发按步数的调度事件"""
+        crossed = self.schedule.crossed
+        if self.schedule.step_based and crossed(self.schedule.target_update_steps, previous_steps, self.env_steps):
+            self.agent.update_target_network()
+        if self.schedule.step_based and crossed(self.schedule.save_interval_steps, previous_steps, self.env_steps):
+            self._save_model(episode)
+        if crossed(self.schedule.log_interval_steps, previous_steps, self.env_steps):
+            self._log_actor_throughput()
+
+    def _log_actor_throughput(self):
+        """输出每个执行者的步数/秒与参数滞后"""
+        now = time.perf_counter()
+        last_time, last_counts = self.actor_log_point
+        counts = self._actor_step_counts()
+        elapsed = max(now - last_time, 1e-9)
+        rates = {actor_id: (count - last_counts.get(actor_id, 0)) / elapsed for actor_id, count in counts.items()}
+        self.actor_log_point = (now, counts)
+
+        total_rate = sum(rates.values())
+        counters = {'grad_steps': self.grad_steps, 'env_steps_per_sec': total_rate,
+                    'replay_ratio': self.grad_steps / max(self.env_steps, 1)}
+        for actor_id, rate in rates.items():
+            counters[f'actor{actor_id}_steps_per_sec'] = rate
+        self.logger.log_step_metrics(self.env_steps, counters)
+        ColorLogger.info(
+            f"环境步数 {self.env_steps} | 更新 {self.grad_steps} | 合计 {total_rate:.0f}步/秒 | "
+            + " ".join(f"#{actor_id}:{rate:.0f}" for actor_id, rate in rates.items())
+            + f" | 参数滞后 {self._param_lag():.0f}次更新"
+        )
+
+
+class DistributedTrainer(MultiActorTrainer):
+    """Ape-X式多进程训练：N个执行者进程 + 本进程作为学习器
+
+    - 每个执行者进程运行自己的环境与固定探索率，经验写入自己独占的共享内存分片(单写入者，无锁)
+    - 学习器从所有分片按经验数成比例采样
+    - 权重发布到版本化的共享内存块，执行者按版本号按需复制
+    """
+
+    def __init__(self, agent, env_handler, model_manager, logger, num_actors=None):
+        """创建共享内存分片与权重块
+
+        Args:
+            agent (QNetwork): 学习器训练的Q网络
+            env_handler (EnvironmentHandler): 学习器本地的环境(仅用于导出TFLite时生成代表性状态)
+            model_manager (ModelManager): 模型管理器
+            logger (TrainingLogger): 训练日志
+            num_actors (int): 执行者进程数，默认Config.NUM_ACTORS
+        """
+        self.num_actors = Config.NUM_ACTORS if num_actors is None else num_actors
+        if Config.PRIORITIZED_REPLAY:
+            ColorLogger.warning("多进程执行者模式暂不支持优先经验回放，将使用均匀采样")
+        self.shard_capacity = max(Config.BATCH_SIZE, Config.REPLAY_BUFFER_SIZE // self.num_actors)
+        self.shards = [SharedReplayShard(self.shard_capacity) for _ in range(self.num_actors)]
+        initial_weights = agent.model.get_weights()
+        self.shared_weights = SharedWeights([w.shape for w in initial_weights])
+        self.shared_weights.publish(initial_weights)
+        super().__init__(agent, env_handler, ShardedReplayBuffer(self.shards), model_manager, logger)
+
+        self.context = multiprocessing.get_context("spawn")
+        self.step_counters = self.context.RawArray('q', self.num_actors)
+        self.weight_versions = self.context.RawArray('q', self.num_actors)
+        self.episode_queue = self.context.Queue(maxsize=1024)
+        self.stop_event = self.context.Event()
+        self.processes = []
+        self.env_steps_offset = 0  # 执行者启动前的环境步数(从检查点恢复时非0，执行者的计数从0开始)
+
+    def _start_actors(self):
+        """启动执行者进程(使用spawn避免子进程继承父进程的TensorFlow运行时状态)"""
+        # 执行者只用CPU推理：子进程在启动时继承环境变量，避免每个执行者都初始化GPU
+        self.env_steps_offset = self.env_steps
+        previous = os.environ.get("CUDA_VISIBLE_DEVICES")
+        os.environ["CUDA_VISIBLE_DEVICES"] = "-1"
+        try:
+            for actor_id in range(self.num_actors):
+                process = self.context.Process(
+                    target=run_actor, name=f"Actor-{actor_id}", daemon=True,
+                    args=(actor_id, self.num_actors, self.shards[actor_id].name, self.shard_capacity,
+                          self.shared_weights.name, self.shared_weights.shapes, self.step_counters,
+                          self.weight_versions, self.episode_queue, self.stop_event))
+                process.start()
+                self.processes.append(process)
+        finally:
+            if previous is None:
+                os.environ.pop("CUDA_VISIBLE_DEVICES", None)
+            else:
+                os.environ["CUDA_VISIBLE_DEVICES"] = previous
+        epsilons = ", ".join(f"{actor_epsilon(i, self.num_actors):.3f}" for i in range(self.num_actors))
+        ColorLogger.info(f"已启动{self.num_actors}个执行者进程 | 每个分片{self.shard_capacity}条 | ε: {epsilons}")
+
+    def _stop_actors(self):
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        self.shared_weights.close()
+
+    def _actors_alive(self):
+        return any(process.is_alive() for process in self.processes)
+
+    def _collect_experience(self, timeout):
+        """执行者直接写入共享内存分片，这里只需等待并读取累计步数"""
+        time.sleep(timeout)
+        self.env_steps = self.env_steps_offset + int(sum(self.step_counters))
+
+    def _next_actor_episode(self):
+        try:
+            return self.episode_queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _publish_weights(self):
+        self.shared_weights.publish(self.agent.model.get_weights())
+
+    def _actor_step_counts(self):
+        return dict(enumerate(np.frombuffer(self.step_counters, dtype=np.int64).tolist()))
+
+    def _param_lag(self):
+        """共享权重按发布次数计版本，滞后的版本数乘以发布间隔即为落后的更新次数"""
+        lag = self.shared_weights.version - np.frombuffer(self.weight_versions, dtype=np.int64)
+        return float(lag.mean()) * max(1, Config.POLICY_SYNC_STEPS)
+
+    def _actor_queue_size(self):
+        """待汇总的单轮统计数(部分平台不支持Queue.qsize)"""
+        try:
+            return self.episode_queue.qsize()
+        except NotImplementedError:
+            return 0
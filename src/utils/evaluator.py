@@ -0,0 +1,218 @@
+import os
+import csv
+import time
+import queue
+import datetime
+import multiprocessing
+import numpy as np
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils import checkpoint
+
+
+def run_greedy_episodes(agent, episodes, seed, max_steps):
+    """以固定种子运行贪婪策略评估(无渲染)
+
+    Args:
+        agent: 提供predict_single(state)的策略(QNetwork或GreedyPolicy)
+        episodes (int): 评估轮数，第i轮的环境种子为seed + i
+        seed (int): 起始种子
+        max_steps (int): 每轮最大步数
+
+    Returns:
+        list: 每轮得分
+    """
+    from src.game.env import SnakeEnv
+
+    scores = []
+    for i in range(episodes):
+        env = SnakeEnv(seed=seed + i)
+        state = env.reset()
+        for _ in range(max_steps):
+            state, _, done = env.step(int(np.argmax(agent.predict_single(state))))
+            if done:
+                break
+        scores.append(env.score)
+    return scores
+
+
+class GreedyPolicy:
+    """评估进程中的贪婪策略：只做前向推理的模型副本"""
+
+    def __init__(self, hidden_units, use_batch_norm):
+        from src.model.q_network import build_q_model
+        self.model = build_q_model(Config.STATE_SIZE, Config.ACTION_SIZE, hidden_units, use_batch_norm)
+
+    def set_weights(self, weights):
+        self.model.set_weights(weights)
+
+    def predict_single(self, state):
+        return self.model(state[np.newaxis, :], training=False).numpy()[0]
+
+
+def run_evaluator(snapshot_queue, result_queue, csv_path, tensorboard_dir, hidden_units, use_batch_norm,
+                  episodes, seed, max_steps):
+    """评估进程入口
+
+    从snapshot_queue取出权重快照(episode, env_steps, grad_steps, 打包的权重)，以固定种子运行episodes轮贪婪评估，
+    结果追加到CSV并写入TensorBoard(横轴为训练轮次，另记一条以环境步数为横轴的曲线)，
+    (episode, 平均得分)放入result_queue交回训练进程。收到None时退出。
+    """
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+    import tensorflow as tf
+    from src.utils.device import configure_cpu_threads
+    configure_cpu_threads(1, 1)  # 评估只占一个核心，不与训练争抢
+
+    with tf.device('/CPU:0'):
+        policy = GreedyPolicy(hidden_units, use_batch_norm)
+    writer = tf.summary.create_file_writer(str(tensorboard_dir))
+    new_file = not os.path.exists(csv_path)
+    with open(csv_path, 'a', newline='') as log_file:
+        log_writer = csv.writer(log_file)
+        if new_file:
+            log_writer.writerow(['episode', 'env_steps', 'grad_steps', 'score_mean', 'score_std',
+                                 'score_min', 'score_max', 'eval_time', 'timestamp'])
+        while True:
+            snapshot = snapshot_queue.get()
+            if snapshot is None:
+                break
+            episode, env_steps, grad_steps, packed = snapshot
+            try:
+                weights = checkpoint.unpack_weights(packed)
+            except ValueError as e:
+                ColorLogger.error(f"轮次{episode}的权重快照无效，跳过评估: {str(e)}")
+                continue
+            start_time = time.time()
+            with tf.device('/CPU:0'):
+                policy.set_weights(weights)
+                scores = run_greedy_episodes(policy, episodes, seed, max_steps)
+            eval_time = time.time() - start_time
+            mean, std = float(np.mean(scores)), float(np.std(scores))
+
+            log_writer.writerow([episode, env_steps, grad_steps, mean, std, min(scores), max(scores),
+                                 f"{eval_time:.2f}", datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
+            log_file.flush()
+            with writer.as_default():
+                tf.summary.scalar('eval/score_mean', mean, step=episode)
+                tf.summary.scalar('eval/score_std', std, step=episode)
+                tf.summary.scalar('eval/score_max', max(scores), step=episode)
+                tf.summary.scalar('eval/score_by_env_step', mean, step=env_steps)
+            writer.flush()
+            result_queue.put((episode, mean))
+            ColorLogger.info(f"贪婪评估 轮次{episode}: 平均得分 {mean:.2f}±{std:.2f} "
+                             f"(最高{max(scores)}，{episodes}轮，{eval_time:.1f}秒)")
+    writer.close()
+
+
+class BackgroundEvaluator:
+    """后台评估器：训练进程每EVAL_INTERVAL轮以及每次保存模型时提交一份权重快照，独立进程完成贪婪评估
+
+    快照队列长度为1：评估进程仍忙时新快照暂存在训练进程中，更新的定期快照会替换尚未送出的旧定期快照，
+    保存模型时提交的快照(keep)则一直保留，使每个检查点都有按其轮次记录的评估得分(检查点保留策略与模型索引据此挑选
+    评估最好的模型)。暂存的快照由每轮的poll按提交顺序送出。训练循环只需复制一次权重(get_weights)，从不等待评估；
+    结束训练时提交最终权重的快照，close等待全部暂存的快照评估完成。
+    """
+
+    def __init__(self, agent, logger):
+        """创建评估进程(start之后开始运行)
+
+        Args:
+            agent (QNetwork): 被训练的Q网络(读取网络结构与权重)
+            logger (TrainingLogger): 训练日志(评估结果与之放在同一运行目录下)
+        """
+        self.agent = agent
+        self.interval = Config.EVAL_INTERVAL
+        self.context = multiprocessing.get_context("spawn")
+        self.snapshot_queue = self.context.Queue(maxsize=1)
+        self.result_queue = self.context.Queue()
+        self.csv_path = Config.LOG_DIR / f"eval_log_{logger.run_tag}.csv"
+        self.tensorboard_dir = logger.tensorboard_log_dir / "eval"
+        self.process = None
+        self.pending = []  # 评估进程忙时暂存的快照: [是否保留, 快照]，按提交顺序
+        self.last_episode = None  # 最近提交的快照的轮次
+        self.submitted = 0
+        self.replaced = 0
+
+    def start(self):
+        # 评估只用CPU：子进程在启动时继承环境变量，避免评估进程初始化GPU
+        previous = os.environ.get("CUDA_VISIBLE_DEVICES")
+        os.environ["CUDA_VISIBLE_DEVICES"] = "-1"
+        try:
+            self.process = self.context.Process(
+                target=run_evaluator, name="Evaluator", daemon=True,
+                args=(self.snapshot_queue, self.result_queue, str(self.csv_path), str(self.tensorboard_dir),
+                      list(self.agent.hidden_units), self.agent.use_batch_norm,
+                      Config.EVAL_EPISODES, Config.EVAL_SEED, Config.EVAL_MAX_STEPS))
+            self.process.start()
+        finally:
+            if previous is None:
+                os.environ.pop("CUDA_VISIBLE_DEVICES", None)
+            else:
+                os.environ["CUDA_VISIBLE_DEVICES"] = previous
+        ColorLogger.info(f"后台评估: 每{self.interval}轮以固定种子{Config.EVAL_SEED}贪婪评估{Config.EVAL_EPISODES}轮 | "
+                         f"结果保存至: {self.csv_path}")
+
+    def due(self, episode):
+        return self.interval > 0 and episode > 0 and episode % self.interval == 0
+
+    def submit(self, episode, env_steps, grad_steps, keep=False):
+        """提交当前权重的快照(不阻塞；权重打包为一段带摘要的连续字节，评估进程校验后使用)
+
+        Args:
+            keep (bool): 保存模型时提交的快照，不会被之后的快照替换
+        """
+        if episode == self.last_episode:
+            # 同一轮内已提交过(如轮末保存后又到了评估间隔)，其间没有训练，不重复评估
+            if keep:
+                for entry in self.pending:
+                    if entry[1][0] == episode:
+                        entry[0] = True
+            return
+        if not keep:
+            self.replaced += sum(1 for retained, _ in self.pending if not retained)
+            self.pending = [entry for entry in self.pending if entry[0]]
+        self.pending.append([keep, (episode, env_steps, grad_steps,
+                                    checkpoint.pack_weights(self.agent.model.get_weights()))])
+        self.last_episode = episode
+        self.submitted += 1
+        self.poll()
+
+    def poll(self):
+        """评估进程空闲时把最早暂存的快照放入队列(每轮调用，没有待评估快照时几乎无开销)"""
+        if not self.pending or self.process is None or not self.process.is_alive():
+            return
+        try:
+            self.snapshot_queue.put_nowait(self.pending[0][1])
+            self.pending.pop(0)
+        except queue.Full:
+            pass
+
+    def collect_results(self):
+        """取出已完成的评估结果(不阻塞)
+
+        Returns:
+            list: [(轮次, 平均得分), ...]
+        """
+        results = []
+        while True:
+            try:
+                results.append(self.result_queue.get_nowait())
+            except queue.Empty:
+                return results
+
+    def close(self, timeout=60.0):
+        """等待最后一份快照评估完成后结束评估进程"""
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            try:
+                for _, snapshot in self.pending:
+                    self.snapshot_queue.put(snapshot, timeout=timeout)
+                self.pending = []
+                self.snapshot_queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+            self.process.join(timeout=timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+        ColorLogger.info(f"后台评估已结束: 提交{self.submitted}份快照，其中{self.replaced}份在评估前被更新的快照替换")
@@ -1,31 +1,48 @@
-# logger.py
-
-import sys
-from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent.parent))
-
-from colorama import init, Fore, Back, Style
-
-# 初始化彩色输出
-init(autoreset=True)
-
-class ColorLogger:
-    @staticmethod
-    def info(message):
-        print(f"{Fore.LIGHTMAGENTA_EX}\n[INFO]\n {message}{Style.RESET_ALL}")  # 亮粉紫色
-    
-    @staticmethod
-    def success(message):
-        print(f"{Fore.LIGHTGREEN_EX}\n[SUCCESS]\n {message}{Style.RESET_ALL}")  # 亮绿色
-    
-    @staticmethod
-    def warning(message):
-        print(f"{Fore.LIGHTYELLOW_EX}\n[WARNING]\n {message}{Style.RESET_ALL}")  # 亮黄色
-    
-    @staticmethod
-    def error(message):
-        print(f"{Fore.LIGHTRED_EX}\n[ERROR]\n {message}{Style.RESET_ALL}")  # 亮红色
-    
-    @staticmethod
-    def highlight(message):
-        print(f"{Fore.LIGHTCYAN_EX}\n[HIGHLIGHT]\n {message}{Style.RESET_ALL}")  # 亮青色
\ No newline at end of file
+# logger.py
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from colorama import init, Fore, Back, Style
+
+# 初始化彩色输出
+init(autoreset=True)
+
+class ColorLogger:
+    # 日志详细程度: 0只输出警告与错误，1正常，2额外输出调试信息(如每轮指标)
+    QUIET, NORMAL, VERBOSE = 0, 1, 2
+    VERBOSITY_NAMES = {QUIET: "安静", NORMAL: "正常", VERBOSE: "详细"}
+    verbosity = NORMAL
+
+    @classmethod
+    def set_verbosity(cls, level):
+        cls.verbosity = min(max(int(level), cls.QUIET), cls.VERBOSE)
+
+    @classmethod
+    def debug(cls, message):
+        if cls.verbosity >= cls.VERBOSE:
+            print(f"{Fore.LIGHTBLUE_EX}\n[DEBUG]\n {message}{Style.RESET_ALL}")  # 亮蓝色
+
+    @classmethod
+    def info(cls, message):
+        if cls.verbosity >= cls.NORMAL:
+            print(f"{Fore.LIGHTMAGENTA_EX}\n[INFO]\n {message}{Style.RESET_ALL}")  # 亮粉紫色
+    
+    @classmethod
+    def success(cls, message):
+        if cls.verbosity >= cls.NORMAL:
+            print(f"{Fore.LIGHTGREEN_EX}\n[SUCCESS]\n {message}{Style.RESET_ALL}")  # 亮绿色
+    
+    @staticmethod
+    def warning(message):
+        print(f"{Fore.LIGHTYELLOW_EX}\n[WARNING]\n {message}{Style.RESET_ALL}")  # 亮黄色
+    
+    @staticmethod
+    def error(message):
+        print(f"{Fore.LIGHTRED_EX}\n[ERROR]\n {message}{Style.RESET_ALL}")  # 亮红色
+    
+    @classmethod
+    def highlight(cls, message):
+        if cls.verbosity >= cls.NORMAL:
+            print(f"{Fore.LIGHTCYAN_EX}\n[HIGHLIGHT]\n {message}{Style.RESET_ALL}")  # 亮青色
\ No newline at end of file
@@ -0,0 +1,134 @@
+import gc
+import os
+import time
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+
+MB = 1024 * 1024
+
+def read_rss_bytes():
+    """读取当前进程的常驻内存(RSS)字节数
+
+    Linux下直接读取/proc/self/statm(一次系统调用，微秒级)，其它平台尝试psutil，均不可用时返回0。
+    """
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return 0
+
+
+class MemoryGuard:
+    """基于内存水位线的资源清理
+
+    不再每轮清理TensorFlow会话，而是每隔check_interval轮采样一次进程RSS与TensorFlow分配器用量，
+    只有超过水位线时才清理：先gc.collect()，仍超出再调用tf.keras.backend.clear_session()。
+    - 清理前后的内存与耗时都会记录日志，便于发现泄漏
+    - 清理后仍高于水位线(例如回放缓冲区逐渐填满属于正常增长)时，自动把水位线上调到当前用量之上，
+      避免之后每轮都做无效清理，并给出警告
+    - 每隔log_interval轮输出一次内存用量与平均增长速度
+    """
+    HEADROOM = 1.2  # 清理无效时，新水位线为当前用量的倍数
+
+    def __init__(self, rss_watermark_mb=None, tf_watermark_mb=None, check_interval=None, log_interval=None,
+                 tf_device='GPU:0'):
+        """初始化内存水位线
+
+        Args:
+            rss_watermark_mb (int): 进程RSS水位线(MB)，0表示不检查，默认Config.MEMORY_RSS_WATERMARK_MB
+            tf_watermark_mb (int): TensorFlow分配器用量水位线(MB)，0表示不检查，默认Config.MEMORY_TF_WATERMARK_MB
+            check_interval (int): 采样间隔(轮)，默认Config.MEMORY_CHECK_INTERVAL
+            log_interval (int): 输出内存用量的间隔(轮)，0表示不输出，默认Config.MEMORY_LOG_INTERVAL
+            tf_device (str): 查询分配器用量的设备
+        """
+        self.rss_watermark = (Config.MEMORY_RSS_WATERMARK_MB if rss_watermark_mb is None else rss_watermark_mb) * MB
+        self.tf_watermark = (Config.MEMORY_TF_WATERMARK_MB if tf_watermark_mb is None else tf_watermark_mb) * MB
+        self.check_interval = max(1, Config.MEMORY_CHECK_INTERVAL if check_interval is None else check_interval)
+        self.log_interval = Config.MEMORY_LOG_INTERVAL if log_interval is None else log_interval
+        self.tf_device = tf_device
+        self.tf_stats_available = self.tf_watermark > 0
+        self.cleanup_count = 0
+        self.last_rss = read_rss_bytes()
+        self.last_log = None  # (episode, rss)
+
+    def read_tf_bytes(self):
+        """读取TensorFlow分配器当前用量(设备不支持时返回0并停止查询)"""
+        if not self.tf_stats_available:
+            return 0
+        try:
+            import tensorflow as tf
+            return tf.config.experimental.get_memory_info(self.tf_device)['current']
+        except Exception:
+            self.tf_stats_available = False
+            ColorLogger.warning(f"无法获取{self.tf_device}的分配器统计，仅按RSS水位线清理")
+            return 0
+
+    def _over_watermark(self, rss, tf_bytes):
+        return (self.rss_watermark > 0 and rss > self.rss_watermark) or \
+               (self.tf_watermark > 0 and tf_bytes > self.tf_watermark)
+
+    def check(self, episode):
+        """按间隔采样内存用量，超过水位线时清理
+
+        Args:
+            episode (int): 当前轮次
+
+        Returns:
+            float: 最近一次采样的RSS(MB)
+        """
+        if episode % self.check_interval != 0:
+            return self.last_rss / MB
+
+        rss = read_rss_bytes()
+        tf_bytes = self.read_tf_bytes()
+        if self._over_watermark(rss, tf_bytes):
+            rss, tf_bytes = self._cleanup(episode, rss, tf_bytes)
+        self.last_rss = rss
+
+        if self.log_interval > 0 and episode % self.log_interval == 0:
+            self._log_usage(episode, rss, tf_bytes)
+        return rss / MB
+
+    def _cleanup(self, episode, rss, tf_bytes):
+        """逐级清理并记录效果"""
+        start_time = time.perf_counter()
+        gc.collect()
+        stage = "gc.collect"
+        new_rss, new_tf = read_rss_bytes(), self.read_tf_bytes()
+        if self._over_watermark(new_rss, new_tf):
+            import tensorflow as tf
+            tf.keras.backend.clear_session()
+            gc.collect()
+            stage = "gc.collect + clear_session"
+            new_rss, new_tf = read_rss_bytes(), self.read_tf_bytes()
+        self.cleanup_count += 1
+        ColorLogger.warning(
+            f"轮次{episode}: 内存超过水位线，执行{stage}，耗时{(time.perf_counter() - start_time) * 1000:.0f}ms | "
+            f"RSS {rss / MB:.0f}→{new_rss / MB:.0f}MB"
+            + (f" | TF分配器 {tf_bytes / MB:.0f}→{new_tf / MB:.0f}MB" if self.tf_stats_available else "")
+        )
+
+        # 清理无效：视为正常增长(或泄漏)，上调水位线避免每轮重复清理
+        if self.rss_watermark > 0 and new_rss > self.rss_watermark:
+            self.rss_watermark = int(new_rss * self.HEADROOM)
+            ColorLogger.warning(f"清理后RSS仍高于水位线，可能存在内存泄漏；RSS水位线上调至{self.rss_watermark / MB:.0f}MB")
+        if self.tf_watermark > 0 and new_tf > self.tf_watermark:
+            self.tf_watermark = int(new_tf * self.HEADROOM)
+            ColorLogger.warning(f"清理后TF分配器用量仍高于水位线；水位线上调至{self.tf_watermark / MB:.0f}MB")
+        return new_rss, new_tf
+
+    def _log_usage(self, episode, rss, tf_bytes):
+        message = f"轮次{episode}: RSS {rss / MB:.0f}MB"
+        if self.tf_stats_available:
+            message += f" | TF分配器 {tf_bytes / MB:.0f}MB"
+        if self.last_log is not None and episode > self.last_log[0]:
+            growth = (rss - self.last_log[1]) / MB / (episode - self.last_log[0])
+            message += f" | 增长 {growth:+.3f}MB/轮"
+        message += f" | 累计清理{self.cleanup_count}次"
+        ColorLogger.info(message)
+        self.last_log = (episode, rss)
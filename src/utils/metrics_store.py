@@ -0,0 +1,228 @@
+import os
+import io
+import csv
+import json
+import time
+import numpy as np
+from pathlib import Path
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+
+# 每轮训练指标的列式存储：每列一个目录，按CHUNK_ROWS行分块保存为.npy文件(数值类型固定，读取时内存映射)
+#   training_metrics_<时间戳>/schema.json        列名与类型、分块行数
+#   training_metrics_<时间戳>/<列名>/000000.npy  第0块(最后一块在刷新时整体重写，写满后不再改动)
+FORMAT_VERSION = 1
+METRICS_PREFIX = "training_metrics_"
+METRIC_FIELDS = (
+    ('episode', np.int64),
+    ('score', np.int32),
+    ('total_reward', np.float32),
+    ('epsilon', np.float32),
+    ('loss', np.float32),
+    ('steps', np.int32),
+    ('inference_time_ms', np.float32),  # 每步平均推理时间(毫秒)
+    ('episode_time', np.float32),     # 本轮耗时(秒)
+    ('elapsed_time', np.float64),     # 累计训练时间(秒)
+    ('gpu_memory_used_mb', np.float32),
+    ('learner_wait_ms', np.float32),
+    ('rss_mb', np.float32),
+    ('env_steps', np.int64),
+    ('grad_steps', np.int64),
+    ('param_lag', np.float32),
+)
+
+
+def episode_row(episode, metrics):
+    """把训练循环的指标字典转换为一行列式记录"""
+    return {
+        'episode': episode, 'score': metrics['score'], 'total_reward': metrics['total_reward'],
+        'epsilon': metrics['epsilon'], 'loss': metrics['avg_loss'], 'steps': metrics['steps'],
+        'inference_time_ms': metrics['avg_inference_time'], 'episode_time': metrics.get('episode_time', 0),
+        'elapsed_time': metrics.get('elapsed_time', 0), 'gpu_memory_used_mb': metrics['gpu_memory'],
+        'learner_wait_ms': metrics.get('learner_wait_ms', 0), 'rss_mb': metrics.get('rss_mb', 0),
+        'env_steps': metrics.get('env_steps', 0), 'grad_steps': metrics.get('grad_steps', 0),
+        'param_lag': metrics.get('param_lag', 0),
+    }
+
+
+def _replace_file(path, data, retries=5):
+    """先写临时文件再替换(读取方只会看到完整的块)
+
+    Windows上读取方仍内存映射着目标文件时os.replace会抛出PermissionError，短暂等待后重试。
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    for attempt in range(retries):
+        try:
+            os.replace(tmp_path, path)
+            return
+        except PermissionError:
+            if attempt == retries - 1:
+                raise
+            time.sleep(0.05 * (attempt + 1))
+
+
+class MetricsWriter:
+    """列式指标写入器(只追加)
+
+    每列在内存中缓存当前块，写满CHUNK_ROWS行时先切换到新块再写出写满的块；flush把未写满的当前块写出
+    (下次flush时整体替换)。写出失败(如Windows上读取方仍映射着该文件)时只输出警告，未写出的块留在内存中，
+    下次flush按块序号重试，不影响之后的追加。由TrainingLogger的日志线程调用，不做线程同步。
+    """
+
+    def __init__(self, path, fields=METRIC_FIELDS, chunk_rows=None):
+        self.path = Path(path)
+        self.fields = [(name, np.dtype(dtype)) for name, dtype in fields]
+        self.chunk_rows = Config.LOG_CHUNK_ROWS if chunk_rows is None else chunk_rows
+        self.buffers = self._new_buffers()
+        self.full_chunks = {}  # 已写满、尚未写出的块: 块序号 -> {列名: 数组}
+        self.write_failed = False  # 上次写出失败(只在开始失败时输出警告)
+        self.chunk_index = 0
+        self.filled = 0  # 当前块已写入的行数
+        self.dirty = False  # 当前块有尚未写出的行
+        self.rows = 0
+        for name, _ in self.fields:
+            (self.path / name).mkdir(parents=True, exist_ok=True)
+        schema = {'format_version': FORMAT_VERSION, 'chunk_rows': self.chunk_rows,
+                  'fields': [[name, dtype.str] for name, dtype in self.fields]}
+        _replace_file(self.path / "schema.json", json.dumps(schema, indent=2).encode('utf-8'))
+
+    def _new_buffers(self):
+        return {name: np.zeros(self.chunk_rows, dtype=dtype) for name, dtype in self.fields}
+
+    def append(self, row):
+        """追加一行(缺少的列记为0)"""
+        for name, _ in self.fields:
+            self.buffers[name][self.filled] = row.get(name, 0)
+        self.filled += 1
+        self.rows += 1
+        self.dirty = True
+        if self.filled == self.chunk_rows:
+            # 先切换到新块，写出失败时写满的块保留在full_chunks中等待重试
+            self.full_chunks[self.chunk_index] = self.buffers
+            self.buffers = self._new_buffers()
+            self.chunk_index += 1
+            self.filled = 0
+            self.dirty = False
+            self.flush()
+
+    def _write_chunk(self, index, buffers, rows):
+        for name, _ in self.fields:
+            buffer = io.BytesIO()
+            np.save(buffer, buffers[name][:rows])
+            _replace_file(self.path / name / f"{index:06d}.npy", buffer.getbuffer())
+
+    def flush(self):
+        """按块序号写出尚未写出的块与未写满的当前块
+
+        Returns:
+            bool: 是否全部写出(失败时保留未写出的块，下次flush重试)
+        """
+        try:
+            for index in sorted(self.full_chunks):
+                self._write_chunk(index, self.full_chunks[index], self.chunk_rows)
+                del self.full_chunks[index]
+            if self.dirty and self.filled:
+                self._write_chunk(self.chunk_index, self.buffers, self.filled)
+                self.dirty = False
+        except OSError as e:
+            if not self.write_failed:
+                ColorLogger.warning(f"训练指标写入{self.path}失败，将在下次刷新时重试: {str(e)}")
+            self.write_failed = True
+            return False
+        if self.write_failed:
+            ColorLogger.info(f"训练指标已恢复写入: {self.path}")
+            self.write_failed = False
+        return True
+
+    def close(self):
+        """写出剩余的块
+
+        Returns:
+            bool: 是否全部写出
+        """
+        return self.flush()
+
+
+class MetricsReader:
+    """列式指标读取器
+
+    按列、按行范围读取，只打开与范围重叠的块(内存映射，不解析文本)；训练进行中也可以读取，
+    行数以各列已写出的最短长度为准。
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / "schema.json", "r") as f:
+            schema = json.load(f)
+        if schema.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"不支持的指标存储版本: {schema.get('format_version')}")
+        self.chunk_rows = schema['chunk_rows']
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in schema['fields']}
+        self.columns = list(self.dtypes)
+        self.length = min((self._column_length(name) for name in self.columns), default=0)
+
+    def _chunks(self, column):
+        return sorted((self.path / column).glob("*.npy"))
+
+    def _column_length(self, column):
+        chunks = self._chunks(column)
+        if not chunks:
+            return 0
+        return (len(chunks) - 1) * self.chunk_rows + len(np.load(chunks[-1], mmap_mode='r'))
+
+    def __len__(self):
+        return self.length
+
+    def read(self, column, start=0, stop=None):
+        """读取一列的[start, stop)行
+
+        范围落在一个块内时返回内存映射的切片(不复制)，跨块时拼接为新数组。
+
+        Returns:
+            np.ndarray: 该列的数值
+        """
+        if column not in self.dtypes:
+            raise KeyError(f"没有指标列: {column} (可用: {', '.join(self.columns)})")
+        start, stop, _ = slice(start, stop).indices(self.length)
+        if start >= stop:
+            return np.zeros(0, dtype=self.dtypes[column])
+        parts = []
+        for chunk in range(start // self.chunk_rows, (stop - 1) // self.chunk_rows + 1):
+            data = np.load(self.path / column / f"{chunk:06d}.npy", mmap_mode='r')
+            offset = chunk * self.chunk_rows
+            parts.append(data[max(start - offset, 0):stop - offset])
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def read_columns(self, columns=None, start=0, stop=None):
+        """读取多列的[start, stop)行
+
+        Returns:
+            dict: 列名 -> np.ndarray
+        """
+        return {name: self.read(name, start, stop) for name in (columns or self.columns)}
+
+    def export_csv(self, csv_path, columns=None, start=0, stop=None):
+        """导出为CSV(按块读取，内存占用与总行数无关)
+
+        Returns:
+            int: 导出的行数
+        """
+        columns = columns or self.columns
+        start, stop, _ = slice(start, stop).indices(self.length)
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for block_start in range(start, stop, self.chunk_rows):
+                block = self.read_columns(columns, block_start, min(block_start + self.chunk_rows, stop))
+                writer.writerows(zip(*(block[name].astype(str) for name in columns)))
+        return max(stop - start, 0)
+
+
+def find_metrics_runs(log_dir=None):
+    """LOG_DIR下的列式指标目录(按名称即时间戳排序，最新的在最后)"""
+    log_dir = Path(Config.LOG_DIR if log_dir is None else log_dir)
+    if not log_dir.exists():
+        return []
+    return sorted(path for path in log_dir.glob(f"{METRICS_PREFIX}*") if (path / "schema.json").exists())
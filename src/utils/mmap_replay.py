@@ -0,0 +1,102 @@
+import os
+import time
+import struct
+import numpy as np
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils.replay_buffer import ReplayBuffer
+
+class MemmapReplayBuffer(ReplayBuffer):
+    """基于numpy.memmap的磁盘回放缓冲区
+
+    各字段存放在saved_models/replay/下的定长二进制文件中，由操作系统按需换入换出，
+    容量可以远超物理内存；另有一个很小的定长二进制头文件记录容量、写入位置与已存数量。
+    - 重启时直接映射已有文件并读取头文件即可恢复，无需解析任何经验数据
+    - 每隔Config.REPLAY_FLUSH_INTERVAL秒刷新一次数据并原子地更新头文件，
+      即使崩溃也最多丢失最近几秒的经验
+    """
+    MAGIC = b'SNKRPLY1'
+    VERSION = 2
+    HEADER_FORMAT = '<8sIQIQQd'  # magic, version, capacity, state_size, position, size, flush_time
+    HEADER_FILE = 'header.bin'
+
+    def __init__(self, capacity, directory=None, resume=True):
+        """初始化磁盘回放缓冲区
+
+        Args:
+            capacity (int): 缓冲区容量
+            directory (Path): 存放数据文件的目录，默认Config.MODEL_DIR/"replay"
+            resume (bool): 是否恢复目录中已有的经验；False时清空重新开始
+        """
+        self.directory = Config.MODEL_DIR / "replay" if directory is None else directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        header = self._read_header() if resume else None
+        if header is not None and (header['capacity'] != capacity or header['state_size'] != Config.STATE_SIZE):
+            ColorLogger.warning(f"磁盘回放缓冲区容量或状态维度已变化({header['capacity']}→{capacity})，将重新创建")
+            header = None
+        self._reopen = header is not None
+        self.last_flush = time.monotonic()
+
+        super().__init__(capacity)
+        if self._reopen:
+            self.position = header['position']
+            self.size = header['size']
+            ColorLogger.success(f"已恢复磁盘回放缓冲区: {self.directory} ({self.size}条经验)")
+        self._write_header()
+
+    def _allocate(self, name, shape, dtype):
+        """以内存映射文件分配字段存储(已有文件直接映射，不读取内容)"""
+        mode = 'r+' if self._reopen else 'w+'
+        self.fields[name] = np.memmap(self.directory / f"{name}.dat", dtype=dtype, mode=mode, shape=shape)
+        return self.fields[name]
+
+    def _read_header(self):
+        header_path = self.directory / self.HEADER_FILE
+        if not header_path.exists():
+            return None
+        try:
+            with open(header_path, 'rb') as f:
+                magic, version, capacity, state_size, position, size, flush_time = struct.unpack(
+                    self.HEADER_FORMAT, f.read(struct.calcsize(self.HEADER_FORMAT)))
+        except (OSError, struct.error) as e:
+            ColorLogger.warning(f"磁盘回放缓冲区头文件损坏，将重新创建: {str(e)}")
+            return None
+        if magic != self.MAGIC or version != self.VERSION:
+            ColorLogger.warning("磁盘回放缓冲区头文件版本不匹配，将重新创建")
+            return None
+        return {'capacity': capacity, 'state_size': state_size, 'position': position,
+                'size': size, 'flush_time': flush_time}
+
+    def _write_header(self):
+        """先写临时文件再原子替换，头文件总是指向已落盘的一致状态"""
+        header_path = self.directory / self.HEADER_FILE
+        tmp_path = header_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(struct.pack(self.HEADER_FORMAT, self.MAGIC, self.VERSION, self.capacity,
+                                self.state_size, self.position, self.size, time.time()))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, header_path)
+
+    def add(self, experience):
+        """添加经验到缓冲区，并按间隔增量刷新到磁盘"""
+        super().add(experience)
+        if time.monotonic() - self.last_flush >= Config.REPLAY_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """将数据文件的脏页写回磁盘并更新头文件"""
+        for array in self.fields.values():
+            array.flush()
+        self._write_header()
+        self.last_flush = time.monotonic()
+
+    def state_dict(self):
+        """磁盘缓冲区自行持久化(见flush)，训练检查点中不再复制经验"""
+        self.flush()
+        return None
+
+    def close(self):
+        """刷新并保存缓冲区"""
+        self.flush()
+        ColorLogger.success(f"磁盘回放缓冲区已保存: {self.directory} ({self.size}条经验)")
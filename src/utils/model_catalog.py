@@ -0,0 +1,260 @@
+import re
+import json
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+from src.utils.config import Config, config_loader
+from src.utils.logger import ColorLogger
+from src.utils import checkpoint
+
+# 模型种类
+KIND_REGULAR = "regular"          # 按间隔保存: CHECKPOINT_PREFIX<轮次>
+KIND_INTERRUPTED = "interrupted"  # 中断保存: interrupted_model_<轮次>
+KIND_ERROR = "error"              # 错误保存: error_snake_model_<轮次>
+KIND_FINAL = "final"              # 最终模型: final_snake_model
+KIND_AGENT = "agent"              # 多智能体训练中单个智能体的模型: CHECKPOINT_PREFIX agent<k>_...
+KIND_OTHER = "other"
+# 可用于继续训练/测试的单网络模型(与Config.MODEL_PATTERNS对应)
+TRAINING_KINDS = (KIND_REGULAR, KIND_INTERRUPTED, KIND_ERROR, KIND_FINAL)
+
+# 模型文件扩展名(完整模型、只含权重的模型与旧版.h5)
+MODEL_SUFFIXES = (Config.MODEL_EXTENSION, checkpoint.WEIGHTS_EXTENSION, ".h5")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    name TEXT PRIMARY KEY,      -- 模型文件名(相对于目录，目录整体移动后仍然有效)
+    episode INTEGER,            -- 保存时的轮次
+    kind TEXT NOT NULL,         -- 模型种类
+    size INTEGER NOT NULL,      -- 模型文件字节数
+    saved_at REAL NOT NULL,     -- 保存时间(Unix时间戳)
+    weights_hash TEXT,          -- 权重的SHA-256摘要
+    config_hash TEXT,           -- 保存时配置文件的摘要
+    eval_score REAL,            -- 后台贪婪评估的平均得分
+    checkpoint TEXT             -- 同名训练检查点文件名
+);
+CREATE INDEX IF NOT EXISTS models_saved_at ON models(kind, saved_at);
+CREATE INDEX IF NOT EXISTS models_eval_score ON models(kind, eval_score);
+"""
+
+
+def classify_model(stem):
+    """由模型文件名(不含扩展名)判断模型种类与轮次
+
+    Returns:
+        tuple: (种类, 轮次)，文件名中没有轮次时轮次为None
+    """
+    if stem == "final_snake_model":
+        return KIND_FINAL, None
+    for kind, prefix in ((KIND_REGULAR, Config.CHECKPOINT_PREFIX),
+                         (KIND_INTERRUPTED, "interrupted_model_"), (KIND_ERROR, "error_snake_model_")):
+        match = re.fullmatch(rf"{re.escape(prefix)}(\d+)", stem)
+        if match:
+            return kind, int(match.group(1))
+    match = re.fullmatch(rf"{re.escape(Config.CHECKPOINT_PREFIX)}agent\d+_(step)?(\d+)", stem)
+    if match:
+        return KIND_AGENT, None if match.group(1) else int(match.group(2))
+    return KIND_OTHER, None
+
+
+def config_hash():
+    """当前配置(config.json或SNAKE_CONFIG指定的文件)的摘要，用于区分不同配置训练出的模型"""
+    text = json.dumps(config_loader.config_data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+class ModelCatalog:
+    """模型目录索引(SQLite)
+
+    每次保存模型时写入一行(文件名、轮次、种类、大小、权重摘要、配置摘要、评估得分)，
+    训练器与各工具查询最新或评估最好的模型时不再遍历目录、按修改时间排序并从文件名解析轮次。
+    索引只是加速查找：写入失败时只输出警告；索引缺失或与目录不一致时可用
+    python src/tools/catalog.py rebuild 从目录重建。
+    """
+
+    FILENAME = "catalog.sqlite"
+
+    def __init__(self, model_dir=None):
+        self.model_dir = Path(Config.MODEL_DIR if model_dir is None else model_dir)
+        self.path = self.model_dir / self.FILENAME
+
+    def exists(self):
+        return self.path.exists()
+
+    def _connect(self):
+        """打开连接(每次操作一个连接，检查点写入线程与训练循环可以同时使用)"""
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _write(self, sql, params_list):
+        """执行写操作(索引写入失败不影响训练)"""
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(sql, params_list)
+            finally:
+                conn.close()
+            return True
+        except sqlite3.Error as e:
+            ColorLogger.warning(f"模型索引{self.path}写入失败: {str(e)}")
+            return False
+
+    def record(self, model_path, episode=None, weights_hash=None, eval_score=None, checkpoint_path=None,
+               saved_at=None, config=None):
+        """记录一个刚保存的模型(同名文件覆盖原记录)
+
+        Args:
+            model_path (Path): 模型文件路径
+            episode (int): 保存时的轮次，默认从文件名解析
+            weights_hash (str): 权重摘要(checkpoint.weights_hash)
+            eval_score (float): 已知的评估得分
+            checkpoint_path (Path): 同名训练检查点
+            saved_at (float): 保存时间，默认当前时间
+            config (str): 配置摘要，默认为当前配置的摘要
+        """
+        model_path = Path(model_path)
+        kind, parsed_episode = classify_model(model_path.stem)
+        row = (model_path.name, parsed_episode if episode is None else episode, kind, model_path.stat().st_size,
+               time.time() if saved_at is None else saved_at, weights_hash,
+               config_hash() if config is None else config, eval_score,
+               Path(checkpoint_path).name if checkpoint_path else None)
+        return self._write("INSERT OR REPLACE INTO models VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [row])
+
+    def set_eval_score(self, episode, score):
+        """记录某一轮权重的评估得分(同一轮次保存的单网络模型)"""
+        placeholders = ", ".join("?" * len(TRAINING_KINDS))
+        return self._write(f"UPDATE models SET eval_score = ? WHERE episode = ? AND kind IN ({placeholders})",
+                           [(score, episode) + TRAINING_KINDS])
+
+    def remove(self, model_paths):
+        """删除模型的记录(保留策略清理旧检查点后调用)"""
+        return self._write("DELETE FROM models WHERE name = ?", [(Path(path).name,) for path in model_paths])
+
+    def entries(self, kinds=TRAINING_KINDS, order="saved_at DESC", limit=None):
+        """查询模型记录(跳过文件已不存在的记录)
+
+        Args:
+            kinds (tuple): 模型种类，None表示全部
+            order (str): 排序方式(SQL ORDER BY子句)
+            limit (int): 最多返回的条数
+
+        Returns:
+            list: 每个模型一个字典，'path'为完整路径
+        """
+        if not self.exists():
+            return []
+        sql, params = "SELECT * FROM models", []
+        if kinds:
+            sql += f" WHERE kind IN ({', '.join('?' * len(kinds))})"
+            params += list(kinds)
+        sql += f" ORDER BY {order}"
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(sql, params).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            ColorLogger.warning(f"模型索引{self.path}读取失败: {str(e)}")
+            return []
+        results = []
+        for row in rows:
+            entry = dict(row, path=self.model_dir / row['name'])
+            if entry['path'].exists():
+                results.append(entry)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+    def get(self, model_path):
+        """按文件名查询一个模型的记录，没有记录时返回None"""
+        if not self.exists():
+            return None
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT * FROM models WHERE name = ?", (Path(model_path).name,)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            ColorLogger.warning(f"模型索引{self.path}读取失败: {str(e)}")
+            return None
+        return dict(row, path=self.model_dir / row['name']) if row else None
+
+    def latest(self, kinds=TRAINING_KINDS):
+        """最近保存的模型记录，没有时返回None"""
+        found = self.entries(kinds, limit=1)
+        return found[0] if found else None
+
+    def best(self, kinds=TRAINING_KINDS):
+        """评估得分最高的模型记录(得分相同时取较新的)，没有评估结果时返回None"""
+        found = [entry for entry in self.entries(kinds, order="eval_score DESC, saved_at DESC")
+                 if entry['eval_score'] is not None]
+        return found[0] if found else None
+
+    def rebuild(self, load_weights=None):
+        """从目录重建索引
+
+        轮次与权重摘要优先取自同名训练检查点(最终模型的轮次也由检查点得到)，评估得分取自
+        training_state.json；没有检查点的.npz模型读取权重计算摘要，其它模型在提供load_weights时加载模型计算。
+        原有记录中的保存时间、配置摘要与评估得分在文件未变化(大小相同)时保留。
+
+        Args:
+            load_weights (callable): 模型路径 -> 权重列表，None表示不加载模型
+
+        Returns:
+            int: 索引中的模型数
+        """
+        previous = {entry['name']: entry for entry in self.entries(kinds=None)}
+        scores = {}
+        state_file = self.model_dir / "training_state.json"
+        if state_file.exists():
+            try:
+                with open(state_file, "r") as f:
+                    scores = {int(e): s for e, s in json.load(f).get("eval_scores", {}).items()}
+            except (OSError, ValueError) as e:
+                ColorLogger.warning(f"训练状态文件读取失败，不恢复评估得分: {str(e)}")
+
+        rows = []
+        for path in sorted(self.model_dir.iterdir()):
+            if path.name.startswith(".") or path.suffix not in MODEL_SUFFIXES:
+                continue
+            kind, episode = classify_model(path.stem)
+            stat = path.stat()
+            weights_hash, checkpoint_name = None, None
+            checkpoint_path = checkpoint.checkpoint_path_for(path)
+            try:
+                if checkpoint_path.exists():
+                    arrays, meta = checkpoint.read_checkpoint(checkpoint_path)
+                    weights_hash = checkpoint.weights_hash(checkpoint.group(arrays, "model").values())
+                    checkpoint_name = checkpoint_path.name
+                    if episode is None and 'next_episode' in meta:
+                        episode = meta['next_episode'] - 1
+                elif path.suffix == checkpoint.WEIGHTS_EXTENSION:
+                    weights_hash = checkpoint.weights_hash(checkpoint.read_weights(path)[0])
+                elif load_weights is not None:
+                    weights_hash = checkpoint.weights_hash(load_weights(path))
+            except Exception as e:
+                ColorLogger.warning(f"{path.name}: 无法计算权重摘要({str(e)})")
+            old = previous.get(path.name)
+            unchanged = old is not None and old['size'] == stat.st_size
+            rows.append((path.name, episode, kind, stat.st_size,
+                         old['saved_at'] if unchanged else stat.st_mtime,
+                         weights_hash or (old['weights_hash'] if unchanged else None),
+                         old['config_hash'] if unchanged else None,
+                         scores.get(episode, old['eval_score'] if unchanged else None)
+                         if kind in TRAINING_KINDS and episode is not None else None,
+                         checkpoint_name))
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM models")
+                conn.executemany("INSERT INTO models VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        finally:
+            conn.close()
+        return len(rows)
@@ -1,115 +1,284 @@
-import tensorflow as tf
-import numpy as np
-from pathlib import Path
-from src.utils.config import Config
-from src.utils.logger import ColorLogger
-from src.utils.t_state import TrainingStateManager
-
-class ModelManager:
-    """模型管理模块，处理模型加载、保存与转换"""
-    
-    def __init__(self, agent):
-        self.agent = agent  
-        self.latest_model = None
-        self.state_manager = TrainingStateManager()
-        
-    def load_latest_model(self, load_prev_model=True):
-        """加载最新模型并返回起始训练轮次
-        
-        Returns:
-            int: 起始训练轮次
-        """
-        if not load_prev_model:
-            return 0
-        
-        # 优先使用状态文件获取最新模型
-        model_path = self.state_manager.get_last_model_path()
-        if model_path and Path(model_path).exists():
-            self.latest_model = model_path
-            self.state_manager.validate_config_compatibility()
-            return self.state_manager.get_last_episode() + 1
-        
-        # 回退到原有逻辑
-        from src.utils.ini_env import initialize_environment
-        self.latest_model = initialize_environment(load_prev_model)
-        
-        if not self.latest_model:
-            return 0
-        
-        try:
-            self.agent.model = tf.keras.models.load_model(self.latest_model)
-            ColorLogger.success(f"成功加载模型: {self.latest_model}")
-            # 从文件名提取轮次并更新状态管理器
-            start_episode = self._extract_start_episode()
-            self.state_manager.save_state(start_episode - 1, self.latest_model)
-            return start_episode
-        except Exception as e:
-            ColorLogger.error(f"模型加载失败: {str(e)}，将从头开始训练")
-            return 0
-            
-    def _extract_start_episode(self):
-        """从模型文件名提取起始训练轮次"""
-        model_name = Path(self.latest_model).stem
-        
-        if model_name.startswith(Config.CHECKPOINT_PREFIX):
-            return int(model_name.split("_")[-1]) + 1
-        elif model_name.startswith(("interrupted_model_", "error_snake_model_")):
-            return int(model_name.split("_")[-1]) + 1
-        return 0
-        
-    def save_model(self, episode, is_final=False, is_interrupted=False):
-        """保存模型到指定路径
-        
-        Args:
-            episode (int): 当前训练轮次
-            is_final (bool): 是否为最终模型
-            is_interrupted (bool): 是否因中断保存
-            
-        Returns:
-            str: 保存路径
-        """
-        if is_final:
-            filename = f"final_snake_model{Config.MODEL_EXTENSION}"
-        elif is_interrupted:
-            filename = f"interrupted_model_{episode}{Config.MODEL_EXTENSION}"
-        else:
-            filename = f"{Config.CHECKPOINT_PREFIX}{episode}{Config.MODEL_EXTENSION}"
-            
-        save_path = Config.MODEL_DIR / filename
-        self.agent.model.save(save_path)
-        ColorLogger.success(f"模型保存至: {save_path}")
-        self.state_manager.save_state(episode, save_path)
-        return str(save_path)
-        
-    def convert_to_tflite(self, env_handler):
-        """将模型转换为TFLite格式
-        
-        Args:
-            env_handler (EnvironmentHandler): 环境处理器实例
-        """
-        try:
-            converter = tf.lite.TFLiteConverter.from_keras_model(self.agent.model)
-            converter.optimizations = [tf.lite.Optimize.DEFAULT]
-            
-            def representative_dataset():
-                for _ in range(100):
-                    state = env_handler.reset()
-                    yield [state[np.newaxis, :].astype(np.float32)]
-                    
-            converter.representative_dataset = representative_dataset
-            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
-            converter.inference_input_type = tf.int8
-            converter.inference_output_type = tf.int8
-            
-            tflite_model = converter.convert()
-            tflite_path = Config.MODEL_DIR / "snake_model.tflite"
-            with open(tflite_path, "wb") as f:
-                f.write(tflite_model)
-            ColorLogger.success(f"量化模型转换完成: {tflite_path}")
-        except Exception as e:
-            ColorLogger.error(f"TFLite模型转换失败: {str(e)}")
-            
-    def update_target_network(self):
-        """更新目标网络"""
-        self.agent.update_target_network()
+import time
+import tensorflow as tf
+import numpy as np
+from pathlib import Path
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils.t_state import TrainingStateManager
+from src.utils import checkpoint
+from src.utils.retention import CheckpointRetention
+from src.utils.model_catalog import ModelCatalog, KIND_FINAL
+
+def quantize_to_int8_tflite(model, representative_states):
+    """将Keras模型全整型(int8)量化为TFLite模型
+    
+    Args:
+        model (tf.keras.Model): 待转换的Keras模型
+        representative_states (list): 用于校准量化范围的代表性状态
+        
+    Returns:
+        bytes: TFLite模型内容
+    """
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    
+    def representative_dataset():
+        for state in representative_states:
+            yield [np.asarray(state, dtype=np.float32)[np.newaxis, :]]
+            
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+    return converter.convert()
+
+class ModelManager:
+    """模型管理模块，处理模型加载、保存与转换"""
+    
+    def __init__(self, agent):
+        self.agent = agent  
+        self.latest_model = None
+        self.state_manager = TrainingStateManager()
+        self.trainer = None  # 提供计数器、回放缓冲区等训练状态的训练器(bind_trainer)
+        self.resume_state = None  # 已读取、等待训练器创建后恢复的检查点(数组, 元信息)
+        self.writer = None  # 后台检查点写入线程(bind_trainer时按Config.CHECKPOINT_ASYNC创建)
+        self.export_model = None  # 写入线程中用于序列化权重快照的模型副本
+        # 每次保存后按保留策略清理旧检查点(checkpoint.KEEP_LAST为0时保留全部)
+        self.retention = CheckpointRetention() if Config.CHECKPOINT_KEEP_LAST > 0 else None
+        self.catalog = ModelCatalog()  # 模型索引：每次保存写入一行，查找模型时不再遍历目录
+        
+    def bind_trainer(self, trainer):
+        """关联训练器：保存模型时一并写入完整的训练检查点，并把已加载的检查点交给训练器恢复"""
+        self.trainer = trainer
+        if Config.CHECKPOINT_ASYNC and self.writer is None:
+            self.writer = checkpoint.CheckpointWriter()
+        if self.retention is not None:
+            ColorLogger.info(self.retention.describe())
+        if self.resume_state is not None:
+            arrays, meta = self.resume_state
+            self.resume_state = None
+            trainer.restore_checkpoint_state(arrays, meta)
+        
+    def load_latest_model(self, load_prev_model=True):
+        """加载最新模型并返回起始训练轮次
+
+        状态文件指向完整检查点时恢复网络、目标网络与优化器，计数器、随机数与回放缓冲区
+        留待训练器创建后恢复(bind_trainer)；只有模型文件时只加载权重。
+        
+        Returns:
+            int: 起始训练轮次
+        """
+        if not load_prev_model:
+            return 0
+        
+        # 优先使用状态文件获取最新检查点/模型
+        checkpoint_path = self.state_manager.get_checkpoint_path()
+        if checkpoint_path and Path(checkpoint_path).exists():
+            try:
+                start_time = time.perf_counter()
+                arrays, meta = checkpoint.read_checkpoint(checkpoint_path)
+                checkpoint.restore_agent_state(self.agent, arrays)
+                self.resume_state = (arrays, meta)
+                self.latest_model = self.state_manager.get_last_model_path()
+                self.state_manager.validate_config_compatibility()
+                ColorLogger.success(f"成功加载训练检查点: {checkpoint_path} "
+                                    f"(轮次{meta['next_episode']}，环境步数{meta['env_steps']}，"
+                                    f"用时{time.perf_counter() - start_time:.2f}秒)")
+                return meta['next_episode']
+            except Exception as e:
+                ColorLogger.error(f"训练检查点加载失败: {str(e)}，尝试只加载模型")
+
+        model_path = self.state_manager.get_last_model_path()
+        if model_path and Path(model_path).exists():
+            self.latest_model = model_path
+            if not self._load_weights(model_path):
+                return 0
+            self.state_manager.validate_config_compatibility()
+            return self.state_manager.get_last_episode() + 1
+        
+        # 回退到原有逻辑
+        from src.utils.ini_env import initialize_environment
+        self.latest_model = initialize_environment(load_prev_model)
+        
+        if not self.latest_model:
+            return 0
+        
+        if not self._load_weights(self.latest_model):
+            return 0
+        # 从文件名提取轮次并更新状态管理器
+        start_episode = self._extract_start_episode()
+        self.state_manager.save_state(start_episode - 1, self.latest_model)
+        return start_episode
+
+    def _load_weights(self, model_path):
+        """把模型文件的权重载入主网络与目标网络(保留优化器与主网络变量的绑定)
+
+        Returns:
+            bool: 是否加载成功
+        """
+        try:
+            if Path(model_path).suffix == checkpoint.WEIGHTS_EXTENSION:
+                weights, _ = checkpoint.read_weights(model_path)
+            else:
+                weights = tf.keras.models.load_model(model_path).get_weights()
+            self.agent.model.set_weights(weights)
+            self.agent.update_target_network()
+            ColorLogger.success(f"成功加载模型: {model_path}")
+            return True
+        except Exception as e:
+            ColorLogger.error(f"模型加载失败: {str(e)}，将从头开始训练")
+            return False
+            
+    def _extract_start_episode(self):
+        """起始训练轮次：优先取模型索引中记录的保存轮次，没有记录时从模型文件名提取"""
+        entry = self.catalog.get(self.latest_model)
+        if entry is not None and entry['kind'] != KIND_FINAL and entry['episode'] is not None:
+            return entry['episode'] + 1
+        model_name = Path(self.latest_model).stem
+        
+        if model_name.startswith(Config.CHECKPOINT_PREFIX):
+            return int(model_name.split("_")[-1]) + 1
+        elif model_name.startswith(("interrupted_model_", "error_snake_model_")):
+            return int(model_name.split("_")[-1]) + 1
+        return 0
+        
+    def save_model(self, episode, is_final=False, is_interrupted=False):
+        """保存模型到指定路径
+
+        关联训练器后同时写入完整训练检查点：训练循环只在内存中复制一份快照，序列化与落盘由后台写入线程完成
+        (Config.CHECKPOINT_ASYNC)；最终模型与中断保存会等待写入完成后再返回。
+        模型、检查点与状态文件都先写临时文件再原子替换，写入中途崩溃不会留下被当作最新模型的损坏文件。
+        Config.CHECKPOINT_WEIGHTS_ONLY时除最终模型外只保存权重(.npz)，完整的.keras只用于最终模型与导出。
+        
+        Args:
+            episode (int): 当前训练轮次
+            is_final (bool): 是否为最终模型
+            is_interrupted (bool): 是否因中断保存
+            
+        Returns:
+            str: 保存路径
+        """
+        extension = checkpoint.WEIGHTS_EXTENSION if Config.CHECKPOINT_WEIGHTS_ONLY else Config.MODEL_EXTENSION
+        if is_final:
+            filename = f"final_snake_model{Config.MODEL_EXTENSION}"
+        elif is_interrupted:
+            filename = f"interrupted_model_{episode}{extension}"
+        else:
+            filename = f"{Config.CHECKPOINT_PREFIX}{episode}{extension}"
+            
+        save_path = Config.MODEL_DIR / filename
+        if self.trainer is None:
+            if save_path.suffix == checkpoint.WEIGHTS_EXTENSION:
+                checkpoint.write_weights(save_path, self.agent.model.get_weights(), self._architecture())
+            else:
+                checkpoint.atomic_save_model(self.agent.model, save_path)
+            ColorLogger.success(f"模型保存至: {save_path}")
+            self.state_manager.save_state(episode, save_path)
+            self._record_model(episode, save_path, self.agent.model.get_weights())
+            self.prune_checkpoints(save_path)
+            return str(save_path)
+
+        # 训练循环中只复制快照(回放缓冲区等视图数组也在此复制，写入期间训练可以继续修改原数组)
+        start_time = time.perf_counter()
+        arrays = checkpoint.capture_agent_state(self.agent)
+        trainer_arrays, meta = self.trainer.checkpoint_state()
+        arrays.update({name: value if value.flags.owndata else value.copy() for name, value in trainer_arrays.items()})
+        stall_ms = (time.perf_counter() - start_time) * 1000
+
+        def write():
+            self._write_snapshot(episode, save_path, arrays, meta, stall_ms)
+
+        if self.writer is None:
+            write()
+        else:
+            self.writer.submit(save_path.stem, write)
+            if is_final or is_interrupted:
+                self.writer.flush()
+        return str(save_path)
+
+    def _write_snapshot(self, episode, save_path, arrays, meta, stall_ms):
+        """写入一份快照：模型文件、同名训练检查点，最后更新状态文件(在写入线程中执行)"""
+        start_time = time.perf_counter()
+        weights = list(checkpoint.group(arrays, "model").values())
+        if save_path.suffix == checkpoint.WEIGHTS_EXTENSION:
+            checkpoint.write_weights(save_path, weights, self._architecture())
+        else:
+            if self.export_model is None:
+                from src.model.q_network import build_q_model
+                self.export_model = build_q_model(**self._architecture())
+            self.export_model.set_weights(weights)
+            checkpoint.atomic_save_model(self.export_model, save_path)
+        checkpoint_path = checkpoint.checkpoint_path_for(save_path)
+        size = checkpoint.write_checkpoint(checkpoint_path, arrays, meta)
+        self.state_manager.save_state(episode, save_path, checkpoint_path)
+        self._record_model(episode, save_path, weights, checkpoint_path)
+        write_ms = (time.perf_counter() - start_time) * 1000
+        removed, reclaimed = self.prune_checkpoints(save_path)
+        ColorLogger.success(f"模型与训练检查点保存至: {save_path} | {checkpoint_path.name} "
+                            f"({size / (1024 * 1024):.1f}MB) | 训练暂停{stall_ms:.0f}ms，写入{write_ms:.0f}ms")
+        self.trainer.logger.log_checkpoint_metrics(episode, {
+            'stall_ms': stall_ms, 'write_ms': write_ms, 'size_mb': size / (1024 * 1024),
+            'coalesced': self.writer.coalesced if self.writer is not None else 0,
+            'pruned': len(removed), 'reclaimed_mb': reclaimed / (1024 * 1024)})
+
+    def _architecture(self):
+        """重建网络所需的结构(build_q_model的参数)，写入只含权重的模型文件"""
+        return {'state_size': int(self.agent.state_size), 'action_size': int(self.agent.action_size),
+                'hidden_units': [int(units) for units in self.agent.hidden_units],
+                'use_batch_norm': bool(self.agent.use_batch_norm)}
+
+    def _record_model(self, episode, save_path, weights, checkpoint_path=None):
+        """把刚保存的模型写入模型索引"""
+        self.catalog.record(save_path, episode=episode, weights_hash=checkpoint.weights_hash(weights),
+                            eval_score=self.state_manager.get_eval_scores().get(episode),
+                            checkpoint_path=checkpoint_path)
+
+    def prune_checkpoints(self, latest_path):
+        """按保留策略清理旧检查点(刚保存的模型与继续训练时加载的模型不会被删除)，并从模型索引中移除
+
+        Returns:
+            tuple: (删除的模型文件列表, 释放的字节数)
+        """
+        if self.retention is None:
+            return [], 0
+        try:
+            removed, reclaimed = self.retention.prune(self.state_manager.get_eval_scores(),
+                                                      protected=(latest_path, self.latest_model))
+        except OSError as e:
+            ColorLogger.warning(f"检查点清理失败: {str(e)}")
+            return [], 0
+        if removed:
+            self.catalog.remove(removed)
+        return removed, reclaimed
+
+    def record_eval_score(self, episode, score):
+        """记录后台评估结果，供保留策略挑选评估最好的检查点，并写入模型索引"""
+        self.state_manager.record_eval_score(episode, score)
+        self.catalog.set_eval_score(episode, score)
+
+    def close(self):
+        """等待后台写入线程写完剩余快照"""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        
+    def convert_to_tflite(self, env_handler):
+        """将模型转换为TFLite格式
+        
+        Args:
+            env_handler (EnvironmentHandler): 环境处理器实例
+        """
+        try:
+            representative_states = [env_handler.reset() for _ in range(100)]
+            tflite_model = quantize_to_int8_tflite(self.agent.model, representative_states)
+            tflite_path = Config.MODEL_DIR / "snake_model.tflite"
+            with open(tflite_path, "wb") as f:
+                f.write(tflite_model)
+            ColorLogger.success(f"量化模型转换完成: {tflite_path}")
+        except Exception as e:
+            ColorLogger.error(f"TFLite模型转换失败: {str(e)}")
+            
+    def update_target_network(self):
+        """更新目标网络"""
+        self.agent.update_target_network()
         ColorLogger.info("目标网络更新完成")
\ No newline at end of file
@@ -0,0 +1,149 @@
+import numpy as np
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils.sum_tree import SumTree, MinTree
+
+class PrioritizedReplayBuffer:
+    """优先经验回放(比例式)
+
+    包装任意一种回放缓冲区(数组/压缩/磁盘)，由它负责存储经验，本类只维护各槽位的优先级：
+    - 采样概率 P(i) = p_i^α / Σp^α，p_i为最近一次的|TD误差|+ε；新经验取当前最大优先级，保证至少被回放一次
+    - 求和树按分层前缀和批量采样，最小值树给出最大重要性采样权重，两者更新均为O(log n)
+    - 重要性采样权重 w_i = (N·P(i))^(-β) / max w，β随采样次数从PRIORITY_BETA_START线性增加到1
+
+    死亡、吃到食物等稀有且TD误差大的经验会被更频繁地回放。
+    """
+    def __init__(self, buffer, alpha=None, beta_start=None, beta_steps=None, epsilon=None):
+        """初始化优先经验回放
+
+        Args:
+            buffer (ReplayBuffer): 实际存储经验的回放缓冲区
+            alpha (float): 优先级指数(0为均匀采样)，默认Config.PRIORITY_ALPHA
+            beta_start (float): 重要性采样指数初值，默认Config.PRIORITY_BETA_START
+            beta_steps (int): β增加到1所需的采样次数，默认Config.PRIORITY_BETA_STEPS
+            epsilon (float): 加在|TD误差|上的小常数，默认Config.PRIORITY_EPSILON
+        """
+        self.buffer = buffer
+        self.alpha = Config.PRIORITY_ALPHA if alpha is None else alpha
+        self.beta_start = Config.PRIORITY_BETA_START if beta_start is None else beta_start
+        self.beta_steps = Config.PRIORITY_BETA_STEPS if beta_steps is None else beta_steps
+        self.epsilon = Config.PRIORITY_EPSILON if epsilon is None else epsilon
+        self.capacity = buffer.capacity
+        self.sum_tree = SumTree(self.capacity)
+        self.min_tree = MinTree(self.capacity)
+        self.max_priority = 1.0
+        self.sample_count = 0
+
+        # 磁盘缓冲区恢复出的已有经验没有保存优先级，按最大优先级处理
+        if len(buffer) > 0:
+            self._set_priorities(np.arange(len(buffer)), self.max_priority)
+
+    @property
+    def beta(self):
+        fraction = min(1.0, self.sample_count / self.beta_steps) if self.beta_steps > 0 else 1.0
+        return self.beta_start + fraction * (1.0 - self.beta_start)
+
+    def _set_priorities(self, indices, priorities):
+        scaled = np.power(priorities, self.alpha)
+        self.sum_tree.update(indices, scaled)
+        self.min_tree.update(indices, scaled)
+
+    def add(self, experience):
+        """添加经验，新经验使用当前最大优先级"""
+        slot = self.buffer.position
+        self.buffer.add(experience)
+        self._set_priorities([slot], self.max_priority)
+
+    def _sample_indices(self, batch_size):
+        """按优先级分层采样：把[0, total)等分为batch_size段，每段内均匀取一个前缀和"""
+        total = self.sum_tree.total()
+        segment = total / batch_size
+        prefix_sums = (np.arange(batch_size) + np.random.random(batch_size)) * segment
+        indices = self.sum_tree.find_prefix_sum(np.minimum(prefix_sums, np.nextafter(total, 0)))
+        return np.minimum(indices, len(self.buffer) - 1)
+
+    def sample_batch(self, batch_size):
+        """按优先级采样批量经验
+
+        Returns:
+            ReplayBatch: 在普通批量基础上附带weights(重要性采样权重，float32)
+            和indices(槽位，用于update_priorities)；缓冲区大小不足时返回None
+        """
+        if len(self.buffer) < batch_size:
+            return None
+
+        indices = self._sample_indices(batch_size)
+        total = self.sum_tree.total()
+        size = len(self.buffer)
+        beta = self.beta
+        probabilities = self.sum_tree[indices] / total
+        max_weight = (size * self.min_tree.min() / total) ** (-beta)
+        weights = ((size * probabilities) ** (-beta) / max_weight).astype(np.float32)
+        self.sample_count += 1
+        return self.buffer.gather(indices)._replace(weights=weights, indices=indices)
+
+    def update_priorities(self, indices, td_errors):
+        """用训练得到的TD误差更新被采样经验的优先级
+
+        Args:
+            indices (np.array): sample_batch返回的槽位
+            td_errors (np.array): 对应的TD误差
+        """
+        priorities = np.abs(td_errors) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self._set_priorities(indices, priorities)
+
+    def state_dict(self):
+        """导出底层缓冲区状态与各槽位优先级(底层缓冲区自行持久化时返回None)"""
+        state = self.buffer.state_dict()
+        if state is None:
+            return None
+        state['priority_sum_tree'] = self.sum_tree.tree
+        state['priority_min_tree'] = self.min_tree.tree
+        state['priority_max'] = np.array(self.max_priority)
+        state['priority_sample_count'] = np.array(self.sample_count, dtype=np.int64)
+        return state
+
+    def load_state_dict(self, state):
+        if not self.buffer.load_state_dict(state):
+            return False
+        if 'priority_sum_tree' in state and state['priority_sum_tree'].shape == self.sum_tree.tree.shape:
+            self.sum_tree.tree[:] = state['priority_sum_tree']
+            self.min_tree.tree[:] = state['priority_min_tree']
+            self.max_priority = float(state['priority_max'])
+            self.sample_count = int(state['priority_sample_count'])
+        else:
+            # 检查点来自均匀回放：恢复的经验按最大优先级处理
+            self._set_priorities(np.arange(len(self.buffer)), self.max_priority)
+        return True
+
+    def sample(self, batch_size):
+        batch = self.sample_batch(batch_size)
+        if batch is None:
+            return []
+        return list(zip(batch.states, batch.actions, batch.rewards, batch.next_states, batch.dones))
+
+    def memory_usage(self):
+        """统计内存占用(包含求和树与最小值树)"""
+        usage = self.buffer.memory_usage()
+        usage['total_bytes'] += self.sum_tree.nbytes + self.min_tree.nbytes
+        usage['bytes_per_transition'] = usage['total_bytes'] / self.capacity
+        return usage
+
+    def report_memory_usage(self):
+        """输出内存占用(每条经验字节数)"""
+        usage = self.memory_usage()
+        ColorLogger.info(
+            f"回放缓冲区[优先回放/{type(self.buffer).__name__}]: {usage['size']}/{usage['capacity']}条 | "
+            f"{usage['bytes_per_transition']:.1f}字节/条 | 共{usage['total_bytes'] / (1024 * 1024):.1f}MB | β={self.beta:.3f}"
+        )
+
+    def close(self):
+        self.buffer.close()
+
+    @property
+    def position(self):
+        return self.buffer.position
+
+    def __len__(self):
+        return len(self.buffer)
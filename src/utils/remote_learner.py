@@ -0,0 +1,302 @@
+import os
+import queue
+import socket
+import threading
+from collections import deque
+import numpy as np
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils.distributed_trainer import MultiActorTrainer
+from src.utils.apex_actor import actor_epsilon
+from src.utils import remote_protocol as protocol
+
+class RemoteLearnerServer:
+    """学习器一侧的套接字服务
+
+    每个执行者连接由一个线程服务：收到的经验批量与单轮统计放入有界的接收队列，由训练线程取走。
+    背压采用信用制：执行者初始拥有max_inflight个信用，每发送一批消耗一个；
+    服务线程只有在批量成功放入接收队列后才归还一个信用，学习器跟不上时接收队列被填满，
+    服务线程阻塞，信用不再归还，执行者在用完信用后暂停与环境交互，而不是无限堆积经验。
+    权重只在训练线程调用publish时编码并压缩一次，服务线程在归还信用时发现执行者的版本落后才随之发送，
+    因此每个套接字只有服务线程一个写入者。
+    """
+
+    def __init__(self, address, max_inflight=None, queue_batches=None, compression=None, expected_actors=None):
+        """绑定监听地址(此时即可接受连接，start后开始服务)
+
+        Args:
+            address (str): "host:port"(端口为0时由系统分配)或"unix:/path"
+            max_inflight (int): 每个执行者的信用数，默认Config.REMOTE_MAX_INFLIGHT
+            queue_batches (int): 接收队列长度，默认Config.REMOTE_QUEUE_BATCHES
+            compression (int): 发送权重的zlib压缩级别，默认Config.REMOTE_COMPRESSION
+            expected_actors (int): 预计的执行者数(用于分配探索率)，默认Config.REMOTE_ACTORS
+        """
+        self.max_inflight = max(1, Config.REMOTE_MAX_INFLIGHT if max_inflight is None else max_inflight)
+        self.compression = Config.REMOTE_COMPRESSION if compression is None else compression
+        self.expected_actors = max(1, Config.REMOTE_ACTORS if expected_actors is None else expected_actors)
+        self.inbox = queue.Queue(maxsize=max(1, Config.REMOTE_QUEUE_BATCHES if queue_batches is None else queue_batches))
+
+        family, sockaddr = protocol.parse_address(address)
+        if isinstance(sockaddr, str) and os.path.exists(sockaddr):
+            os.unlink(sockaddr)  # 上次运行残留的Unix套接字文件
+        self.listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(sockaddr)
+        self.listener.listen()
+        self.listener.settimeout(0.5)
+        self.unix_path = sockaddr if isinstance(sockaddr, str) else None
+        self.address = protocol.format_address(family, self.listener.getsockname())
+
+        self.lock = threading.Lock()
+        self.weights = None  # (version, 打包好的WEIGHTS消息)
+        self.next_actor_id = 0
+        self.connections = {}  # 执行者编号 -> 套接字
+        self.stats = {}  # 执行者编号 -> 收发统计
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.accept_thread = threading.Thread(target=self._accept_loop, name="RemoteAccept", daemon=True)
+
+    def start(self):
+        self.accept_thread.start()
+
+    def publish(self, weights, version):
+        """发布一份新权重(训练线程调用)，各服务线程在下次归还信用时发送给版本落后的执行者"""
+        message = protocol.pack_message(protocol.WEIGHTS, protocol.encode_weights(weights, version), self.compression)
+        with self.lock:
+            self.weights = (version, message)
+
+    def _accept_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                conn, peer = self.listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            protocol.configure_socket(conn)
+            thread = threading.Thread(target=self._serve, args=(conn, peer), name="RemoteActor", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _put(self, item):
+        """放入接收队列，队满时阻塞(即背压)直到有空位或服务停止"""
+        while not self.stop_event.is_set():
+            try:
+                self.inbox.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _handshake(self, conn, peer):
+        """完成HELLO/WELCOME握手
+
+        Returns:
+            int: 分配的执行者编号
+        """
+        message_type, payload, _ = protocol.recv_message(conn)
+        if message_type != protocol.HELLO:
+            raise protocol.ProtocolError(f"期望HELLO，收到{protocol.MESSAGE_NAMES.get(message_type, message_type)}")
+        hello = protocol.decode_json(payload)
+        with self.lock:
+            actor_id = hello.get('actor_id', -1)
+            if actor_id < 0 or actor_id in self.connections:
+                while self.next_actor_id in self.connections:
+                    self.next_actor_id += 1
+                actor_id = self.next_actor_id
+            self.next_actor_id = max(self.next_actor_id, actor_id + 1)
+            self.connections[actor_id] = conn
+            stats = self.stats.setdefault(actor_id, {'batches': 0, 'transitions': 0, 'wire_bytes': 0,
+                                                     'raw_bytes': 0, 'weights_sent': 0, 'weight_wire_bytes': 0,
+                                                     'episodes': 0})
+            peer = protocol.format_address(conn.family, peer) if peer else f"{hello.get('host', '')}(pid {hello.get('pid')})"
+            stats.update({'peer': peer, 'connected': True})
+
+        welcome = {
+            'actor_id': actor_id,
+            'epsilon': actor_epsilon(actor_id % self.expected_actors, self.expected_actors),
+            'seed': Config.AGENT_SEED_BASE + actor_id,
+            'state_size': Config.STATE_SIZE,
+            'action_size': Config.ACTION_SIZE,
+            'hidden_units': list(Config.HIDDEN_UNITS),
+            'batch_norm': Config.USE_BATCH_NORM,
+            'credits': self.max_inflight
+        }
+        protocol.send_message(conn, protocol.WELCOME, protocol.encode_json(welcome))
+        return actor_id
+
+    def _send_weights_if_stale(self, conn, actor_id, sent_version):
+        """执行者的权重版本落后时发送最新权重
+
+        Returns:
+            int: 已发送给该执行者的最新版本
+        """
+        with self.lock:
+            latest = self.weights
+        if latest is None or latest[0] <= sent_version:
+            return sent_version
+        conn.sendall(latest[1])
+        with self.lock:
+            self.stats[actor_id]['weights_sent'] += 1
+            self.stats[actor_id]['weight_wire_bytes'] = len(latest[1])
+        return latest[0]
+
+    def _serve(self, conn, peer):
+        actor_id = None
+        try:
+            actor_id = self._handshake(conn, peer)
+            self._put(('connect', actor_id, self.stats[actor_id]['peer']))
+            sent_version = self._send_weights_if_stale(conn, actor_id, -1)
+            while not self.stop_event.is_set():
+                message_type, payload, wire_bytes = protocol.recv_message(conn)
+                if message_type == protocol.TRANSITIONS:
+                    fields, policy_version = protocol.decode_transitions(payload)
+                    if not self._put(('transitions', actor_id, (fields, policy_version))):
+                        break
+                    with self.lock:
+                        stats = self.stats[actor_id]
+                        stats['batches'] += 1
+                        stats['transitions'] += len(fields['actions'])
+                        stats['wire_bytes'] += wire_bytes
+                        stats['raw_bytes'] += protocol.HEADER.size + len(payload)
+                    protocol.send_message(conn, protocol.CREDIT, protocol.encode_credit(1))
+                    sent_version = self._send_weights_if_stale(conn, actor_id, sent_version)
+                elif message_type == protocol.EPISODE:
+                    stats = protocol.decode_json(payload)
+                    stats['actor'] = actor_id
+                    if not self._put(('episode', actor_id, stats)):
+                        break
+                    with self.lock:
+                        self.stats[actor_id]['episodes'] += 1
+                elif message_type == protocol.BYE:
+                    break
+                else:
+                    raise protocol.ProtocolError(f"意外的消息类型: {message_type}")
+        except (protocol.ProtocolError, OSError) as e:
+            if not self.stop_event.is_set():
+                ColorLogger.warning(f"执行者{actor_id if actor_id is not None else peer}连接异常: {str(e)}")
+        finally:
+            if actor_id is not None:
+                with self.lock:
+                    self.connections.pop(actor_id, None)
+                    self.stats[actor_id]['connected'] = False
+                if not self.stop_event.is_set():
+                    self._put(('disconnect', actor_id, None))
+            conn.close()
+
+    def connected_actors(self):
+        with self.lock:
+            return len(self.connections)
+
+    def snapshot_stats(self):
+        """各执行者的收发统计副本"""
+        with self.lock:
+            return {actor_id: dict(stats) for actor_id, stats in self.stats.items()}
+
+    def close(self):
+        """停止服务：断开所有执行者(执行者收到连接关闭后退出)"""
+        self.stop_event.set()
+        self.listener.close()
+        with self.lock:
+            connections = list(self.connections.values())
+        for conn in connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        for thread in [self.accept_thread] + self.threads:
+            if thread.is_alive():
+                thread.join(timeout=2.0)
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
+
+
+class RemoteLearnerTrainer(MultiActorTrainer):
+    """远程执行者训练：执行者通过套接字连接(可在其它主机上)，本进程作为学习器
+
+    执行者以`python -m src.trainer.actor --learner host:port`启动，连接后由学习器分配编号、探索率与种子。
+    经验批量写入本地回放缓冲区；权重版本为发布时的累计梯度更新次数，
+    参数滞后 = 当前更新次数 - 各执行者最近一批经验所用权重版本的平均值。
+    执行者可以随时加入或断开，学习器在没有经验时只是等待。
+    """
+
+    def __init__(self, agent, env_handler, replay_buffer, model_manager, logger, address=None):
+        """绑定监听地址
+
+        Args:
+            agent (QNetwork): 学习器训练的Q网络
+            env_handler (EnvironmentHandler): 学习器本地的环境(仅用于导出TFLite时生成代表性状态)
+            replay_buffer (ReplayBuffer): 回放缓冲区
+            model_manager (ModelManager): 模型管理器
+            logger (TrainingLogger): 训练日志
+            address (str): 监听地址，默认Config.REMOTE_LISTEN
+        """
+        super().__init__(agent, env_handler, replay_buffer, model_manager, logger)
+        self.server = RemoteLearnerServer(address or Config.REMOTE_LISTEN)
+        self.pending_episodes = deque()
+        self.actor_steps = {}  # 执行者编号 -> 已接收的累计步数
+        self.actor_versions = {}  # 执行者编号 -> 最近一批经验所用的权重版本
+
+    def _start_actors(self):
+        self._publish_weights()
+        self.server.start()
+        ColorLogger.info(f"学习器正在监听 {self.server.address}，等待执行者连接 "
+                         f"(python -m src.trainer.actor --learner {self.server.address})")
+
+    def _stop_actors(self):
+        self.server.close()
+
+    def _actors_alive(self):
+        """远程执行者可以随时连接或重连，学习器一直等待"""
+        return True
+
+    def _collect_experience(self, timeout):
+        """取出接收队列中的所有消息：经验写入回放缓冲区，单轮统计暂存等待汇总"""
+        try:
+            item = self.server.inbox.get(timeout=timeout)
+        except queue.Empty:
+            return
+        while item is not None:
+            kind, actor_id, data = item
+            if kind == 'transitions':
+                self._add_transitions(actor_id, *data)
+            elif kind == 'episode':
+                self.pending_episodes.append(data)
+            elif kind == 'connect':
+                ColorLogger.info(f"执行者{actor_id}已连接 ({data}) | 当前{self.server.connected_actors()}个执行者")
+            elif kind == 'disconnect':
+                self.actor_versions.pop(actor_id, None)
+                ColorLogger.warning(f"执行者{actor_id}已断开 | 当前{self.server.connected_actors()}个执行者")
+            try:
+                item = self.server.inbox.get_nowait()
+            except queue.Empty:
+                item = None
+
+    def _add_transitions(self, actor_id, fields, policy_version):
+        """把一批经验写入回放缓冲区(ends表示片段边界，与dones不同时为截断；启用预取时经由预取器加锁写入)"""
+        for state, action, reward, next_state, done, end in zip(
+                fields['states'], fields['actions'], fields['rewards'],
+                fields['next_states'], fields['dones'], fields['ends']):
+            self._store_experience((state, int(action), float(reward), next_state, bool(end), bool(end and not done)))
+        count = len(fields['actions'])
+        self.env_steps += count
+        self.actor_steps[actor_id] = self.actor_steps.get(actor_id, 0) + count
+        self.actor_versions[actor_id] = policy_version
+
+    def _next_actor_episode(self):
+        return self.pending_episodes.popleft() if self.pending_episodes else None
+
+    def _publish_weights(self):
+        self.server.publish(self.agent.model.get_weights(), self.grad_steps)
+
+    def _actor_step_counts(self):
+        return dict(self.actor_steps)
+
+    def _param_lag(self):
+        if not self.actor_versions:
+            return 0.0
+        return float(self.grad_steps - np.mean(list(self.actor_versions.values())))
+
+    def _actor_queue_size(self):
+        return self.server.inbox.qsize()
@@ -0,0 +1,234 @@
+"""
+执行者与学习器之间的二进制消息协议(TCP或Unix套接字)
+
+每条消息 = 14字节头部 + 负载:
+    magic(2s, b'SK') | version(B) | type(B) | flags(B) | 保留(B) | length(I, 负载字节数) | 保留(I)
+flags的FLAG_ZLIB位表示负载经过zlib压缩。小端序，头部长度固定，接收方先读头部再按length读负载。
+
+消息类型:
+- HELLO(执行者->学习器): JSON，执行者编号(-1表示由学习器分配)与主机信息
+- WELCOME(学习器->执行者): JSON，分配的编号、探索率、种子、网络结构与初始信用
+- TRANSITIONS(执行者->学习器): 一批连续的经验(定长头部 + 各字段的原始数组)
+- CREDIT(学习器->执行者): 归还的信用数(I)；执行者每发送一批消耗一个信用，信用为0时停止交互等待归还(背压)
+- WEIGHTS(学习器->执行者): 版本号 + 各权重数组
+- EPISODE(执行者->学习器): JSON，单轮统计
+- BYE(双向): 正常关闭
+"""
+import json
+import socket
+import struct
+import zlib
+import numpy as np
+
+MAGIC = b'SK'
+PROTOCOL_VERSION = 1
+HEADER = struct.Struct('<2sBBBxII')
+
+HELLO, WELCOME, TRANSITIONS, CREDIT, WEIGHTS, EPISODE, BYE = range(1, 8)
+MESSAGE_NAMES = {HELLO: "HELLO", WELCOME: "WELCOME", TRANSITIONS: "TRANSITIONS", CREDIT: "CREDIT",
+                 WEIGHTS: "WEIGHTS", EPISODE: "EPISODE", BYE: "BYE"}
+
+FLAG_ZLIB = 0x01
+MIN_COMPRESS_BYTES = 256  # 小于此长度的负载不压缩
+MAX_MESSAGE_BYTES = 256 * 1024 * 1024  # 拒绝超过此长度的负载(防止错误数据导致巨量分配)
+
+TRANSITIONS_HEADER = struct.Struct('<IIq')  # count, state_size, policy_version
+WEIGHTS_HEADER = struct.Struct('<qI')  # version, 数组个数
+CREDIT_PAYLOAD = struct.Struct('<I')
+
+
+class ProtocolError(Exception):
+    """协议错误(魔数、版本或长度不符，连接意外关闭等)"""
+
+
+def parse_address(address):
+    """解析地址字符串
+
+    Args:
+        address (str): "host:port" 或 "unix:/path/to/socket"
+
+    Returns:
+        tuple: (地址族, 套接字地址)
+    """
+    if address.startswith("unix:"):
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("当前平台不支持Unix套接字")
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, separator, port = address.rpartition(":")
+    if not separator or not port.isdigit():
+        raise ValueError(f"无效的地址: {address} (应为 host:port 或 unix:/path)")
+    return socket.AF_INET, (host or "0.0.0.0", int(port))
+
+
+def format_address(family, address):
+    """把套接字地址格式化为parse_address可解析的字符串"""
+    if hasattr(socket, "AF_UNIX") and family == socket.AF_UNIX:
+        return f"unix:{address}"
+    return f"{address[0]}:{address[1]}"
+
+
+def connect(address, timeout=None):
+    """连接到学习器"""
+    family, sockaddr = parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    sock.connect(sockaddr)
+    sock.settimeout(None)
+    configure_socket(sock)
+    return sock
+
+
+def configure_socket(sock):
+    """TCP连接关闭Nagle算法：信用与小批量经验需要立即送达"""
+    if sock.family == socket.AF_INET:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+def pack_message(message_type, payload=b'', compression_level=0):
+    """把一条消息打包为可直接发送的字节串(同一消息发给多个对端时只需打包一次)
+
+    Args:
+        message_type (int): 消息类型
+        payload (bytes): 负载
+        compression_level (int): zlib压缩级别，0为不压缩；压缩后不更小时按原样发送
+
+    Returns:
+        bytes: 头部 + 负载
+    """
+    flags = 0
+    if compression_level > 0 and len(payload) >= MIN_COMPRESS_BYTES:
+        compressed = zlib.compress(payload, compression_level)
+        if len(compressed) < len(payload):
+            payload, flags = compressed, FLAG_ZLIB
+    return HEADER.pack(MAGIC, PROTOCOL_VERSION, message_type, flags, len(payload), 0) + payload
+
+
+def send_message(sock, message_type, payload=b'', compression_level=0):
+    """发送一条消息(参数同pack_message)
+
+    Returns:
+        int: 实际发送的字节数(含头部)
+    """
+    message = pack_message(message_type, payload, compression_level)
+    sock.sendall(message)
+    return len(message)
+
+
+def _recv_exact(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            raise ProtocolError("连接已关闭")
+        received += n
+    return buffer
+
+
+def recv_message(sock):
+    """接收一条消息(阻塞)
+
+    Returns:
+        tuple: (message_type, payload, wire_bytes)，payload已解压，wire_bytes为实际接收的字节数(含头部)
+    """
+    magic, version, message_type, flags, length, _ = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    if magic != MAGIC:
+        raise ProtocolError(f"无效的魔数: {magic!r}")
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"协议版本不一致: 对方{version}，本地{PROTOCOL_VERSION}")
+    if length > MAX_MESSAGE_BYTES:
+        raise ProtocolError(f"消息过长: {length}字节")
+    payload = bytes(_recv_exact(sock, length)) if length else b''
+    if flags & FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+    return message_type, payload, HEADER.size + length
+
+
+def encode_json(data):
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def decode_json(payload):
+    return json.loads(payload.decode("utf-8"))
+
+
+def encode_transitions(states, actions, rewards, next_states, dones, ends, policy_version):
+    """把一批经验编码为TRANSITIONS负载
+
+    各字段按固定类型依次拼接: states/next_states为float32[count, state_size]，actions为uint8，
+    rewards为float32，dones(真正终止)与ends(片段边界)为uint8。
+    """
+    states = np.ascontiguousarray(states, dtype=np.float32)
+    count, state_size = states.shape
+    return b''.join((
+        TRANSITIONS_HEADER.pack(count, state_size, policy_version),
+        states.tobytes(),
+        np.asarray(actions, dtype=np.uint8).tobytes(),
+        np.asarray(rewards, dtype=np.float32).tobytes(),
+        np.ascontiguousarray(next_states, dtype=np.float32).tobytes(),
+        np.asarray(dones, dtype=np.uint8).tobytes(),
+        np.asarray(ends, dtype=np.uint8).tobytes(),
+    ))
+
+
+def decode_transitions(payload):
+    """解码TRANSITIONS负载
+
+    Returns:
+        tuple: (fields, policy_version)，fields为包含states/actions/rewards/next_states/dones/ends的字典
+    """
+    count, state_size, policy_version = TRANSITIONS_HEADER.unpack_from(payload)
+    layout = (('states', np.float32, count * state_size), ('actions', np.uint8, count),
+              ('rewards', np.float32, count), ('next_states', np.float32, count * state_size),
+              ('dones', np.uint8, count), ('ends', np.uint8, count))
+    expected = TRANSITIONS_HEADER.size + sum(np.dtype(dtype).itemsize * n for _, dtype, n in layout)
+    if len(payload) != expected:
+        raise ProtocolError(f"经验批量长度不符: {len(payload)}字节，应为{expected}字节")
+
+    fields, offset = {}, TRANSITIONS_HEADER.size
+    for name, dtype, n in layout:
+        fields[name] = np.frombuffer(payload, dtype=dtype, count=n, offset=offset)
+        offset += np.dtype(dtype).itemsize * n
+    fields['states'] = fields['states'].reshape(count, state_size)
+    fields['next_states'] = fields['next_states'].reshape(count, state_size)
+    return fields, policy_version
+
+
+def encode_weights(weights, version):
+    """把模型权重编码为WEIGHTS负载: 版本号、数组个数，每个数组为 ndim(B) + 各维(I) + float32数据"""
+    parts = [WEIGHTS_HEADER.pack(version, len(weights))]
+    for array in weights:
+        array = np.ascontiguousarray(array, dtype=np.float32)
+        parts.append(struct.pack(f'<B{array.ndim}I', array.ndim, *array.shape))
+        parts.append(array.tobytes())
+    return b''.join(parts)
+
+
+def decode_weights(payload):
+    """解码WEIGHTS负载
+
+    Returns:
+        tuple: (weights, version)
+    """
+    version, count = WEIGHTS_HEADER.unpack_from(payload)
+    offset = WEIGHTS_HEADER.size
+    weights = []
+    for _ in range(count):
+        ndim = payload[offset]
+        shape = struct.unpack_from(f'<{ndim}I', payload, offset + 1)
+        offset += 1 + 4 * ndim
+        size = int(np.prod(shape))
+        weights.append(np.frombuffer(payload, dtype=np.float32, count=size, offset=offset).reshape(shape))
+        offset += 4 * size
+    if offset != len(payload):
+        raise ProtocolError(f"权重负载长度不符: {len(payload)}字节，解析到{offset}字节")
+    return weights, version
+
+
+def encode_credit(credits):
+    return CREDIT_PAYLOAD.pack(credits)
+
+
+def decode_credit(payload):
+    return CREDIT_PAYLOAD.unpack(payload)[0]
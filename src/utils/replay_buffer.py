@@ -1,51 +1,260 @@
-import random
-from collections import deque
-import tensorflow as tf
-
-class ReplayBuffer:
-    """经验回放缓冲区
-    
-    用于存储智能体与环境交互的经验，支持随机采样批量经验进行训练。
-    使用双端队列（deque）实现，具有固定容量，当容量满时自动移除最早的经验。
-    
-    属性:
-        buffer (deque): 存储经验的双端队列
-    """
-    def __init__(self, capacity):
-        self.buffer = deque(maxlen=capacity)
-    
-    def add(self, experience):
-        """添加经验到缓冲区
-        
-        Args:
-            experience (tuple): 包含(state, action, reward, next_state, done)的经验元组
-        """
-        self.buffer.append(experience)
-    
-    def sample(self, batch_size):
-        """从缓冲区采样批量经验
-        
-        Args:
-            batch_size (int): 采样数量
-            
-        Returns:
-            list: 采样的经验列表，若缓冲区大小不足则返回空列表
-        """
-        return random.sample(self.buffer, batch_size) if len(self.buffer) >= batch_size else []
-    
-    def __len__(self):
-        """返回当前缓冲区大小"""
-        return len(self.buffer)
-    def sample_batch(self, batch_size):
-        """向量化采样批量经验"""
-        if len(self.buffer) < batch_size:
-            return None
-            
-        batch = random.sample(self.buffer, batch_size)
-        states = tf.convert_to_tensor([exp[0] for exp in batch], dtype=tf.float32)
-        actions = tf.convert_to_tensor([exp[1] for exp in batch], dtype=tf.int32)
-        rewards = tf.convert_to_tensor([exp[2] for exp in batch], dtype=tf.float32)
-        next_states = tf.convert_to_tensor([exp[3] for exp in batch], dtype=tf.float32)
-        dones = tf.convert_to_tensor([exp[4] for exp in batch], dtype=tf.float32)
-        
-        return states, actions, rewards, next_states, dones
\ No newline at end of file
+from collections import namedtuple
+import numpy as np
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+
+# 批量采样结果，各字段均为连续存储的NumPy数组，可直接传入tf.convert_to_tensor
+# rewards为n步折扣回报，next_states为n步后的自举状态，discounts为对应的γ^m(m为实际累积的步数)
+# weights/indices只在优先经验回放时提供(重要性采样权重与槽位)，其余情况为None
+ReplayBatch = namedtuple('ReplayBatch', ['states', 'actions', 'rewards', 'next_states', 'dones', 'discounts',
+                                         'weights', 'indices'], defaults=(None, None))
+
+
+def unpack_experience(experience):
+    """解析经验元组，兼容不带截断标志的旧格式
+
+    Args:
+        experience (tuple): (state, action, reward, next_state, done[, truncated])，
+            done表示片段结束，truncated表示片段因步数上限被截断(而非真正的终止状态)
+
+    Returns:
+        tuple: (state, action, reward, next_state, terminal, episode_end)，
+            terminal为真正的终止状态(不再自举)，episode_end为片段边界(终止或截断)
+    """
+    state, action, reward, next_state, done = experience[:5]
+    truncated = bool(experience[5]) if len(experience) > 5 else False
+    return state, action, reward, next_state, bool(done) and not truncated, bool(done) or truncated
+
+
+class ReplayBuffer:
+    """经验回放缓冲区
+
+    用于存储智能体与环境交互的经验，支持随机采样批量经验进行训练。
+    使用预分配的环形数组实现：states、actions、rewards、next_states、dones
+    分别存放在连续的NumPy数组中(结构体数组)，容量满时覆盖最早的经验。
+    采样通过向量化的整数索引一次取出整批数据，无需逐条拼装Python列表。
+
+    采样时按Config.N_STEP向量化地计算n步折扣回报：从采样位置沿环形数组向后累积，
+    遇到终止状态(不再自举)、截断或不连续的片段边界、以及最新一条经验时提前停止。
+
+    属性:
+        capacity (int): 缓冲区容量
+        position (int): 下一条经验的写入位置
+        size (int): 当前已存储的经验数量
+    """
+    def __init__(self, capacity, state_size=None, n_step=None, gamma=None):
+        self.capacity = capacity
+        self.state_size = Config.STATE_SIZE if state_size is None else state_size
+        self.n_step = Config.N_STEP if n_step is None else n_step
+        self.gamma = Config.GAMMA if gamma is None else gamma
+        self.fields = {}  # 字段名 -> 存储数组
+        self.position = 0
+        self.size = 0
+        self._init_storage()
+
+    def _init_storage(self):
+        """分配各字段的存储数组(子类可改为其它存储布局)"""
+        self.states = self._allocate('states', (self.capacity, self.state_size), np.float32)
+        self.actions = self._allocate('actions', (self.capacity,), np.int32)
+        self.rewards = self._allocate('rewards', (self.capacity,), np.float32)
+        self.next_states = self._allocate('next_states', (self.capacity, self.state_size), np.float32)
+        self.dones = self._allocate('dones', (self.capacity,), np.bool_)  # 真正的终止状态
+        self.ends = self._allocate('ends', (self.capacity,), np.bool_)  # 片段边界(终止、截断或不连续)
+
+    def _allocate(self, name, shape, dtype):
+        """分配单个字段的存储数组(子类可改为其它存储方式)"""
+        self.fields[name] = np.zeros(shape, dtype=dtype)
+        return self.fields[name]
+
+    def memory_usage(self):
+        """统计缓冲区内存占用
+
+        Returns:
+            dict: total_bytes(总字节数)、bytes_per_transition(每条经验字节数)、capacity、size
+        """
+        total_bytes = sum(array.nbytes for array in self.fields.values())
+        return {
+            'total_bytes': total_bytes,
+            'bytes_per_transition': total_bytes / self.capacity,
+            'capacity': self.capacity,
+            'size': self.size
+        }
+
+    def report_memory_usage(self):
+        """输出缓冲区内存占用(每条经验字节数)"""
+        usage = self.memory_usage()
+        ColorLogger.info(
+            f"回放缓冲区[{type(self).__name__}]: {usage['size']}/{usage['capacity']}条 | "
+            f"{usage['bytes_per_transition']:.1f}字节/条 | 共{usage['total_bytes'] / (1024 * 1024):.1f}MB"
+        )
+
+    def close(self):
+        """释放缓冲区资源(内存实现无需处理，磁盘实现在此刷新数据)"""
+        pass
+
+    def add(self, experience):
+        """添加经验到缓冲区
+
+        Args:
+            experience (tuple): 包含(state, action, reward, next_state, done[, truncated])的经验元组
+        """
+        state, action, reward, next_state, terminal, episode_end = unpack_experience(experience)
+        i = self.position
+        # 与上一条经验不连续(如恢复磁盘缓冲区后开始新片段)：把上一条经验标记为片段边界
+        if self.size > 0:
+            prev = (i - 1) % self.capacity
+            if not self.ends[prev] and not np.array_equal(self.next_states[prev], state):
+                self.ends[prev] = True
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = terminal
+        self.ends[i] = episode_end
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def state_dict(self):
+        """导出缓冲区完整状态(写入训练检查点)
+
+        Returns:
+            dict: 名称 -> NumPy数组；已存经验总是位于槽位[0, size)
+        """
+        state = {name: array[:self.size] for name, array in self.fields.items()}
+        state['capacity'] = np.array(self.capacity, dtype=np.int64)
+        state['position'] = np.array(self.position, dtype=np.int64)
+        state['size'] = np.array(self.size, dtype=np.int64)
+        return state
+
+    def load_state_dict(self, state):
+        """从state_dict恢复缓冲区
+
+        Returns:
+            bool: 容量或字段与当前缓冲区不一致而未恢复时返回False
+        """
+        size = int(state['size'])
+        if int(state['capacity']) != self.capacity or set(self.fields) - set(state) or any(
+                state[name].shape[1:] != array.shape[1:] for name, array in self.fields.items()):
+            ColorLogger.warning("检查点中的回放缓冲区与当前配置不一致，将从空缓冲区开始")
+            return False
+        for name, array in self.fields.items():
+            array[:size] = state[name]
+        self.position = int(state['position'])
+        self.size = size
+        return True
+
+    def _sample_indices(self, batch_size):
+        """随机生成采样索引(有放回，O(batch_size))"""
+        return np.random.randint(0, self.size, size=batch_size)
+
+    def sample(self, batch_size):
+        """从缓冲区采样批量经验
+
+        Args:
+            batch_size (int): 采样数量
+
+        Returns:
+            list: 采样的经验列表，若缓冲区大小不足则返回空列表
+        """
+        batch = self.sample_batch(batch_size)
+        if batch is None:
+            return []
+        return list(zip(batch.states, batch.actions, batch.rewards, batch.next_states, batch.dones))
+
+    def _slot_rewards(self, idx):
+        """按槽位取即时奖励(子类可改为间接存储)"""
+        return self.rewards[idx]
+
+    def _n_step_returns(self, idx):
+        """向量化计算一批经验的n步折扣回报
+
+        Args:
+            idx (np.array): 采样的槽位
+
+        Returns:
+            tuple: (returns, last, discounts)——n步折扣回报、最后累积到的槽位(自举状态取其next_state)、γ^m
+        """
+        returns = self._slot_rewards(idx).astype(np.float32)
+        last = np.array(idx, dtype=np.int64)
+        steps = np.ones(len(last), dtype=np.int64)
+        newest = (self.position - 1) % self.capacity
+        active = ~self.ends[last] & (last != newest)
+        for k in range(1, self.n_step):
+            if not active.any():
+                break
+            following = (last + 1) % self.capacity
+            last = np.where(active, following, last)
+            returns += np.where(active, np.float32(self.gamma ** k) * self._slot_rewards(following), np.float32(0))
+            steps += active
+            active &= ~self.ends[following] & (following != newest)
+        discounts = np.power(self.gamma, steps).astype(np.float32)
+        return returns, last, discounts
+
+    def __len__(self):
+        """返回当前缓冲区大小"""
+        return self.size
+
+    def sample_batch(self, batch_size):
+        """向量化采样批量经验
+
+        Returns:
+            ReplayBatch: (states, actions, rewards, next_states, dones, discounts)，
+            dones为float32以便直接参与目标值计算；缓冲区大小不足时返回None
+        """
+        if self.size < batch_size:
+            return None
+
+        return self.gather(self._sample_indices(batch_size))
+
+    def gather(self, idx):
+        """按槽位索引取出一批经验(子类可改为其它解码方式)
+
+        Args:
+            idx (np.array): 槽位索引
+
+        Returns:
+            ReplayBatch: 批量经验
+        """
+        returns, last, discounts = self._n_step_returns(idx)
+        return ReplayBatch(
+            states=self.states[idx],
+            actions=self.actions[idx],
+            rewards=returns,
+            next_states=self.next_states[last],
+            dones=self.dones[last].astype(np.float32),
+            discounts=discounts
+        )
+
+
+def create_replay_buffer(capacity=None, name=None, resume=True):
+    """按Config.REPLAY_BACKEND创建回放缓冲区(Config.PRIORITIZED_REPLAY为True时外包一层优先经验回放)
+
+    Args:
+        capacity (int): 缓冲区容量，默认Config.REPLAY_BUFFER_SIZE
+        name (str): 缓冲区名称，磁盘实现据此区分存放目录(同时训练多个智能体时使用)
+        resume (bool): 磁盘实现是否恢复上次保存的经验
+
+    Returns:
+        ReplayBuffer: 回放缓冲区实例
+    """
+    capacity = Config.REPLAY_BUFFER_SIZE if capacity is None else capacity
+    backend = Config.REPLAY_BACKEND
+    if backend == "array":
+        buffer = ReplayBuffer(capacity)
+    elif backend == "compact":
+        from src.utils.compact_replay import CompactReplayBuffer
+        buffer = CompactReplayBuffer(capacity)
+    elif backend == "dedup":
+        from src.utils.dedup_replay import DedupReplayBuffer
+        buffer = DedupReplayBuffer(capacity)
+    elif backend == "memmap":
+        from src.utils.mmap_replay import MemmapReplayBuffer
+        directory = Config.MODEL_DIR / "replay" / name if name else None
+        buffer = MemmapReplayBuffer(capacity, directory=directory, resume=resume)
+    else:
+        raise ValueError(f"未知的回放缓冲区类型: {backend}")
+
+    if Config.PRIORITIZED_REPLAY:
+        from src.utils.prioritized_replay import PrioritizedReplayBuffer
+        return PrioritizedReplayBuffer(buffer)
+    return buffer
@@ -0,0 +1,123 @@
+import math
+from pathlib import Path
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils.checkpoint import CHECKPOINT_EXTENSION
+from src.utils import model_catalog
+
+
+def checkpoint_episode(stem):
+    """从模型文件名(不含扩展名)解析轮次，不是带轮次的模型时返回None
+
+    只识别常规保存(CHECKPOINT_PREFIX<轮次>)、中断保存与错误保存；最终模型、多智能体模型
+    (snake_agent_agent0_...)等其它文件不参与清理。
+    """
+    kind, episode = model_catalog.classify_model(stem)
+    if kind in (model_catalog.KIND_REGULAR, model_catalog.KIND_INTERRUPTED, model_catalog.KIND_ERROR):
+        return episode
+    return None
+
+
+def select_retained(episodes, scores, keep_last, keep_best, thin_base):
+    """按保留策略选出要保留的轮次
+
+    - 最近keep_last个
+    - 评估得分最高的keep_best个(没有评估结果的不参与)
+    - 对数稀疏：按与最新轮次的距离分桶(第b桶为[base^b - 1, base^(b+1) - 1))，每桶保留最早的一个，
+      越早的检查点越稀疏，总数随训练长度对数增长
+
+    Args:
+        episodes (iterable): 候选检查点的轮次
+        scores (dict): 轮次 -> 评估平均得分
+        keep_last (int): 保留最近的个数
+        keep_best (int): 保留评估最好的个数
+        thin_base (int): 对数稀疏的底数，小于2表示不做对数稀疏
+
+    Returns:
+        set: 保留的轮次
+    """
+    episodes = sorted(set(episodes))
+    if not episodes:
+        return set()
+    keep = set(episodes[-keep_last:]) if keep_last > 0 else set()
+    if keep_best > 0:
+        scored = sorted((e for e in episodes if e in scores), key=lambda e: scores[e], reverse=True)
+        keep.update(scored[:keep_best])
+    if thin_base >= 2:
+        latest = episodes[-1]
+        buckets = {}
+        for episode in episodes:  # 升序：每个桶先遇到的是最早的
+            buckets.setdefault(int(math.log(latest - episode + 1) / math.log(thin_base)), episode)
+        keep.update(buckets.values())
+    return keep
+
+
+class CheckpointRetention:
+    """检查点保留策略：每次保存后删除策略之外的旧模型及其同名检查点文件"""
+
+    # 同一检查点的文件(模型、训练检查点、旧版.h5)一起保留或删除
+    EXTENSIONS = model_catalog.MODEL_SUFFIXES + (CHECKPOINT_EXTENSION,)
+
+    def __init__(self, model_dir=None, keep_last=None, keep_best=None, thin_base=None):
+        self.model_dir = Path(Config.MODEL_DIR if model_dir is None else model_dir)
+        self.keep_last = Config.CHECKPOINT_KEEP_LAST if keep_last is None else keep_last
+        self.keep_best = Config.CHECKPOINT_KEEP_BEST if keep_best is None else keep_best
+        self.thin_base = Config.CHECKPOINT_THIN_BASE if thin_base is None else thin_base
+        self.total_removed = 0
+        self.total_reclaimed = 0
+
+    def describe(self):
+        thinning = f"，更早的按{self.thin_base}的幂稀疏保留" if self.thin_base >= 2 else ""
+        return f"检查点保留: 最近{self.keep_last}个 + 评估最好的{self.keep_best}个{thinning}"
+
+    def _candidates(self):
+        """按文件名(不含扩展名)分组的候选检查点: {stem: (轮次, [文件])}"""
+        candidates = {}
+        for path in self.model_dir.iterdir():
+            if path.name.startswith(".") or path.suffix not in self.EXTENSIONS:
+                continue  # 写入中的临时文件与其它文件
+            episode = checkpoint_episode(path.stem)
+            if episode is not None:
+                candidates.setdefault(path.stem, (episode, []))[1].append(path)
+        return candidates
+
+    def prune(self, scores=None, protected=()):
+        """删除保留策略之外的检查点
+
+        Args:
+            scores (dict): 轮次 -> 评估平均得分
+            protected (iterable): 不论策略如何都保留的模型路径(刚保存的与状态文件指向的模型)
+
+        Returns:
+            tuple: (删除的模型文件列表, 释放的字节数)
+        """
+        if self.keep_last <= 0 or not self.model_dir.exists():
+            return [], 0
+        candidates = self._candidates()
+        keep = select_retained((episode for episode, _ in candidates.values()), scores or {},
+                               self.keep_last, self.keep_best, self.thin_base)
+        protected = {Path(path).stem for path in protected if path}
+
+        removed, removed_models, reclaimed = [], [], 0
+        for stem, (episode, paths) in sorted(candidates.items(), key=lambda item: item[1][0]):
+            if episode in keep or stem in protected:
+                continue
+            for path in paths:
+                try:
+                    size = path.stat().st_size
+                    path.unlink()
+                    reclaimed += size
+                    if path.suffix in model_catalog.MODEL_SUFFIXES:
+                        removed_models.append(path)
+                except OSError as e:
+                    ColorLogger.warning(f"删除旧检查点{path}失败: {str(e)}")
+            removed.append(stem)
+
+        if removed:
+            self.total_removed += len(removed)
+            self.total_reclaimed += reclaimed
+            names = ", ".join(removed[:5]) + (f" 等{len(removed)}个" if len(removed) > 5 else "")
+            ColorLogger.info(f"检查点清理: 删除{names}，释放{reclaimed / (1024 * 1024):.1f}MB "
+                             f"(保留{len(candidates) - len(removed)}个，本次训练累计释放"
+                             f"{self.total_reclaimed / (1024 * 1024):.1f}MB)")
+        return removed_models, reclaimed
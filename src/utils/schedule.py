@@ -0,0 +1,81 @@
+import numpy as np
+from src.utils.config import Config
+
+class TrainingSchedule:
+    """训练调度器，决定何时训练、何时同步目标网络、何时保存与记录日志
+
+    两种模式:
+    - step: 所有间隔都以环境步数计，ε在EPSILON_DECAY_STEPS步内从EPSILON_INIT线性衰减到EPSILON_MIN，
+      片段变长时学习动态与吞吐量不再随之漂移
+    - episode: 原有按轮次计的行为(ε每轮乘以EPSILON_DECAY，按TARGET_UPDATE_FREQ/SAVE_INTERVAL轮同步与保存)
+    两种模式下都是每train_every个环境步执行gradient_steps次梯度更新，
+    回放比(每个环境步的梯度更新次数)= gradient_steps / train_every。
+    """
+
+    def __init__(self, mode=None, train_every=None, gradient_steps=None, epsilon_decay_steps=None,
+                 target_update_steps=None, save_interval_steps=None, log_interval_steps=None):
+        """初始化调度参数(未指定的参数取自Config)"""
+        self.mode = Config.SCHEDULE_MODE if mode is None else mode
+        if self.mode not in ("step", "episode"):
+            raise ValueError(f"未知的调度模式: {self.mode} (可选: step, episode)")
+        self.train_every = max(1, Config.TRAIN_EVERY if train_every is None else train_every)
+        self.gradient_steps = Config.GRADIENT_STEPS if gradient_steps is None else gradient_steps
+        self.epsilon_decay_steps = Config.EPSILON_DECAY_STEPS if epsilon_decay_steps is None else epsilon_decay_steps
+        self.target_update_steps = Config.TARGET_UPDATE_STEPS if target_update_steps is None else target_update_steps
+        self.save_interval_steps = Config.SAVE_INTERVAL_STEPS if save_interval_steps is None else save_interval_steps
+        self.log_interval_steps = Config.LOG_INTERVAL_STEPS if log_interval_steps is None else log_interval_steps
+
+    @property
+    def step_based(self):
+        return self.mode == "step"
+
+    @property
+    def replay_ratio(self):
+        """每个环境步的梯度更新次数"""
+        return self.gradient_steps / self.train_every
+
+    def epsilon(self, episode, env_steps):
+        """当前探索率(episode与env_steps也可以是数组，此时逐元素计算)"""
+        if not self.step_based:
+            return np.maximum(Config.EPSILON_MIN, Config.EPSILON_INIT * (Config.EPSILON_DECAY ** episode))
+        if self.epsilon_decay_steps <= 0:
+            return Config.EPSILON_MIN
+        fraction = np.minimum(1.0, env_steps / self.epsilon_decay_steps)
+        return Config.EPSILON_MIN + (1.0 - fraction) * (Config.EPSILON_INIT - Config.EPSILON_MIN)
+
+    def updates_due(self, env_steps):
+        """第env_steps步之后应执行的梯度更新次数"""
+        return self.gradient_steps if env_steps % self.train_every == 0 else 0
+
+    @staticmethod
+    def _due(interval, count):
+        return interval > 0 and count > 0 and count % interval == 0
+
+    @staticmethod
+    def crossed(interval, previous, current):
+        """计数从previous增加到current的过程中是否跨过了interval的整数倍(计数一次增加多步时使用)"""
+        return interval > 0 and current // interval > previous // interval
+
+    def target_sync_due(self, env_steps=None, episode=None):
+        """是否应同步目标网络(step模式按环境步传入env_steps，episode模式在轮末传入episode)"""
+        if self.step_based:
+            return env_steps is not None and self._due(self.target_update_steps, env_steps)
+        return episode is not None and episode % Config.TARGET_UPDATE_FREQ == 0
+
+    def save_due(self, env_steps=None, episode=None):
+        """是否应保存模型(参数约定同target_sync_due)"""
+        if self.step_based:
+            return env_steps is not None and self._due(self.save_interval_steps, env_steps)
+        return episode is not None and self._due(Config.SAVE_INTERVAL, episode)
+
+    def log_due(self, env_steps):
+        """是否应记录吞吐量计数器"""
+        return self._due(self.log_interval_steps, env_steps)
+
+    def describe(self):
+        """调度参数摘要(用于训练开始时的日志)"""
+        text = f"调度模式: {self.mode} | 每{self.train_every}步训练{self.gradient_steps}次 (回放比 {self.replay_ratio:.2f})"
+        if self.step_based:
+            text += (f" | ε线性衰减{self.epsilon_decay_steps}步 | 目标网络每{self.target_update_steps}步同步"
+                     f" | 每{self.save_interval_steps}步保存")
+        return text
@@ -0,0 +1,235 @@
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils.replay_buffer import ReplayBuffer, ReplayBatch
+
+ALIGNMENT = 64  # 各字段在共享内存块中按缓存行对齐
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class SharedReplayShard(ReplayBuffer):
+    """位于共享内存中的回放缓冲区分片
+
+    每个执行者进程独占一个分片并且是它唯一的写入者，学习器进程只读，因此不需要任何锁：
+    - 所有字段与一个(position, size)头部放在同一块multiprocessing.shared_memory中
+    - 写入者先写完经验的各字段，再更新头部；读取者采样前读取头部，只会看到已写完的经验
+    - 缓冲区已满时，读取者不采样下一个将被覆盖的槽位
+    读取者取数过程中写入者可能继续覆盖最旧的经验，与Ape-X一样接受这种极小概率的不一致。
+    """
+    FIELDS = (
+        ('states', lambda capacity, state_size: (capacity, state_size), np.float32),
+        ('actions', lambda capacity, state_size: (capacity,), np.int32),
+        ('rewards', lambda capacity, state_size: (capacity,), np.float32),
+        ('next_states', lambda capacity, state_size: (capacity, state_size), np.float32),
+        ('dones', lambda capacity, state_size: (capacity,), np.bool_),
+        ('ends', lambda capacity, state_size: (capacity,), np.bool_),
+    )
+    HEADER_BYTES = ALIGNMENT
+
+    def __init__(self, capacity, name=None, create=True):
+        """创建或连接共享内存分片
+
+        Args:
+            capacity (int): 分片容量
+            name (str): 共享内存名称(连接已有分片时必须提供)
+            create (bool): True为创建(学习器)，False为连接(执行者)
+        """
+        self.create = create
+        self.shm = shared_memory.SharedMemory(name=name, create=create,
+                                              size=self.required_bytes(capacity, Config.STATE_SIZE))
+        self.name = self.shm.name
+        self.header = np.ndarray((2,), dtype=np.int64, buffer=self.shm.buf)  # position, size
+        self._offset = self.HEADER_BYTES
+        super().__init__(capacity)
+        if create:
+            self.header[:] = 0
+        self._sync()
+
+    @classmethod
+    def required_bytes(cls, capacity, state_size):
+        """分片所需的共享内存字节数"""
+        offset = cls.HEADER_BYTES
+        for _, shape, dtype in cls.FIELDS:
+            offset = _aligned(offset + int(np.prod(shape(capacity, state_size))) * np.dtype(dtype).itemsize)
+        return offset
+
+    def _init_storage(self):
+        for name, shape, dtype in self.FIELDS:
+            setattr(self, name, self._allocate(name, shape(self.capacity, self.state_size), dtype))
+
+    def _allocate(self, name, shape, dtype):
+        """在共享内存块中划出字段数组(不清零，连接已有分片时保留内容)"""
+        array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=self._offset)
+        self._offset = _aligned(self._offset + array.nbytes)
+        self.fields[name] = array
+        return array
+
+    def _sync(self):
+        """从头部读取写入者最新的写入位置与数量"""
+        position, size = self.header
+        self.position, self.size = int(position), int(size)
+
+    def add(self, experience):
+        """写入一条经验，写完后再发布新的写入位置(仅写入者调用)"""
+        super().add(experience)
+        self.header[0] = self.position
+        self.header[1] = self.size
+
+    def _sample_indices(self, batch_size):
+        if self.size < self.capacity:
+            return np.random.randint(0, self.size, size=batch_size)
+        # 已满：跳过下一个将被覆盖的槽位
+        return (self.position + 1 + np.random.randint(0, self.size - 1, size=batch_size)) % self.capacity
+
+    def __len__(self):
+        self._sync()
+        return self.size
+
+    def sample_batch(self, batch_size):
+        self._sync()
+        return super().sample_batch(batch_size)
+
+    def close(self):
+        """释放对共享内存的映射，创建者同时删除共享内存"""
+        for name in list(self.fields):
+            setattr(self, name, None)
+        self.fields.clear()
+        self.header = None
+        self.shm.close()
+        if self.create:
+            self.shm.unlink()
+
+
+class ShardedReplayBuffer:
+    """学习器一侧的分片回放缓冲区视图
+
+    按各分片当前的经验数成比例地分配批量中的样本数，再从各分片分别采样后拼接，
+    等价于在所有执行者的经验上均匀采样。只支持采样，写入由各执行者进程直接完成。
+    """
+
+    def __init__(self, shards):
+        """初始化分片视图
+
+        Args:
+            shards (list): SharedReplayShard列表
+        """
+        self.shards = shards
+        self.capacity = sum(shard.capacity for shard in shards)
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
+
+    def sample_batch(self, batch_size):
+        """从各分片按经验数成比例采样并拼接为一个批量
+
+        Returns:
+            ReplayBatch: 批量经验；总经验数不足时返回None
+        """
+        sizes = np.array([len(shard) for shard in self.shards], dtype=np.float64)
+        if sizes.sum() < batch_size:
+            return None
+        counts = np.random.multinomial(batch_size, sizes / sizes.sum())
+        parts = [shard.gather(shard._sample_indices(count))
+                 for shard, count in zip(self.shards, counts) if count > 0]
+        return ReplayBatch(*(np.concatenate([getattr(part, field) for part in parts])
+                             for field in ReplayBatch._fields[:6]))
+
+    def memory_usage(self):
+        total_bytes = sum(shard.shm.size for shard in self.shards)
+        return {
+            'total_bytes': total_bytes,
+            'bytes_per_transition': total_bytes / self.capacity,
+            'capacity': self.capacity,
+            'size': len(self)
+        }
+
+    def report_memory_usage(self):
+        usage = self.memory_usage()
+        ColorLogger.info(
+            f"共享内存回放缓冲区: {len(self.shards)}个分片 | {usage['size']}/{usage['capacity']}条 | "
+            f"共{usage['total_bytes'] / (1024 * 1024):.1f}MB"
+        )
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+
+
+class SharedWeights:
+    """版本化的共享内存权重块(单写多读)
+
+    学习器把模型权重展平写入共享内存，执行者按需复制。使用顺序锁(seqlock)保证读到完整的一份：
+    写入前后各把序号加1(写入过程中序号为奇数)，读取者复制前后序号相同且为偶数才算成功，否则重试。
+    版本号 = 序号 // 2，即已发布的次数，执行者每步只需比较一次版本号，没有新权重时开销可以忽略。
+    """
+    HEADER_BYTES = ALIGNMENT
+
+    def __init__(self, shapes, name=None, create=True):
+        """创建或连接权重块
+
+        Args:
+            shapes (list): 各权重数组的形状(与model.get_weights()一致)
+            name (str): 共享内存名称(连接时必须提供)
+            create (bool): True为创建(学习器)，False为连接(执行者)
+        """
+        self.shapes = [tuple(shape) for shape in shapes]
+        self.sizes = [int(np.prod(shape)) for shape in self.shapes]
+        total = sum(self.sizes)
+        self.create = create
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=self.HEADER_BYTES + 4 * max(total, 1))
+        self.name = self.shm.name
+        self.sequence = np.ndarray((1,), dtype=np.int64, buffer=self.shm.buf)
+        self.data = np.ndarray((total,), dtype=np.float32, buffer=self.shm.buf, offset=self.HEADER_BYTES)
+        if create:
+            self.sequence[0] = 0
+
+    @property
+    def version(self):
+        return int(self.sequence[0]) // 2
+
+    def publish(self, weights):
+        """发布一份新权重(仅学习器调用)"""
+        self.sequence[0] += 1
+        offset = 0
+        for array, size in zip(weights, self.sizes):
+            self.data[offset:offset + size] = np.ravel(array)
+            offset += size
+        self.sequence[0] += 1
+
+    def read(self, newer_than=-1, retries=100):
+        """读取一份完整的权重
+
+        Args:
+            newer_than (int): 只有版本号大于该值时才读取
+            retries (int): 遇到写入中的权重时的最大重试次数
+
+        Returns:
+            tuple: (weights, version)；没有更新的版本或多次重试仍失败时返回None
+        """
+        for _ in range(retries):
+            sequence = int(self.sequence[0])
+            if sequence // 2 <= newer_than:
+                return None
+            if sequence % 2 == 1:
+                time.sleep(0)
+                continue
+            flat = self.data.copy()
+            if int(self.sequence[0]) == sequence:
+                weights, offset = [], 0
+                for shape, size in zip(self.shapes, self.sizes):
+                    weights.append(flat[offset:offset + size].reshape(shape))
+                    offset += size
+                return weights, sequence // 2
+        return None
+
+    def close(self):
+        self.sequence = None
+        self.data = None
+        self.shm.close()
+        if self.create:
+            self.shm.unlink()
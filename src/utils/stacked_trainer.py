@@ -0,0 +1,253 @@
+import numpy as np
+import time
+import datetime
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils.tmonitor import TrainingMonitor
+from src.utils.device import get_training_device
+from src.utils.schedule import TrainingSchedule
+from src.utils import checkpoint
+
+device = get_training_device()
+
+class StackedAgentTrainer:
+    """多智能体批量训练模块
+
+    使用StackedQNetwork同时训练K个相互独立的智能体：每个智能体拥有自己的环境(不同随机种子)、
+    回放缓冲区与日志，每一步对K个智能体只做一次批量动作选择和一次融合的梯度更新。
+    每个智能体完成Config.EPISODES轮后单独保存最终模型并停止与环境交互。
+    """
+
+    def __init__(self, agent, env_handlers, replay_buffers, loggers):
+        self.agent = agent  # StackedQNetwork实例
+        self.env_handlers = env_handlers  # 每个智能体一个EnvironmentHandler
+        self.replay_buffers = replay_buffers  # 每个智能体一个ReplayBuffer
+        self.loggers = loggers  # 每个智能体一个TrainingLogger
+        self.num_agents = agent.num_agents
+        self.monitor = TrainingMonitor()
+        # K个智能体同步推进，共用同一个按环境步数计的调度
+        self.schedule = TrainingSchedule()
+
+        # 训练状态(按智能体分别记录)
+        self.score_history = [[] for _ in range(self.num_agents)]
+        self.loss_history = [[] for _ in range(self.num_agents)]
+        self.episodes = np.zeros(self.num_agents, dtype=np.int64)
+        self.active = np.ones(self.num_agents, dtype=bool)
+        self.env_steps = 0  # 每个智能体的累计环境步数(同步推进，所有仍在训练的智能体相同)
+        self.grad_steps = 0  # 累计融合梯度更新次数
+        self.last_log_point = (time.perf_counter(), 0, 0)
+
+    def train(self):
+        """开始训练主循环，直到所有智能体都完成Config.EPISODES轮
+
+        Returns:
+            tuple: (score_history, loss_history)，均为每个智能体一个列表
+        """
+        training_start_time = time.time()
+        start_datetime = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ColorLogger.highlight(f"\n===== 多智能体训练开始于: {start_datetime} =====\n")
+        ColorLogger.info(f"智能体数量: {self.num_agents} | 每个智能体训练轮次: {Config.EPISODES} | 种子: {self.agent.seeds}")
+        ColorLogger.info(self.schedule.describe())
+
+        from tqdm import tqdm
+        pbar = tqdm(total=self.num_agents * Config.EPISODES, desc="训练进度",
+                    bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}, {postfix}]")
+
+        states = np.stack([env.reset() for env in self.env_handlers])
+        stats = [self._new_episode_stats() for _ in range(self.num_agents)]
+
+        self.monitor.start()
+        try:
+            while self.active.any():
+                if self.monitor.should_end():
+                    ColorLogger.warning("\n用户请求退出训练...")
+                    for k in np.flatnonzero(self.active):
+                        self._save_agent(k, f"interrupted_model_agent{k}_{self.episodes[k]}")
+                    break
+                if self.monitor.pending:
+                    self._handle_control_requests()
+
+                # 批量选择动作并推进所有仍在训练的环境
+                epsilons = np.broadcast_to(self.schedule.epsilon(self.episodes, self.env_steps), self.num_agents)
+                actions = self._choose_actions(states, epsilons)
+                for k in np.flatnonzero(self.active):
+                    start_time = time.time()
+                    next_state, reward, done = self.env_handlers[k].step(actions[k])
+                    stats[k]['inference_time'] += (time.time() - start_time) * 1000
+                    self.replay_buffers[k].add((states[k], actions[k], reward, next_state, done,
+                                                self.env_handlers[k].truncated))
+                    stats[k]['total_reward'] += reward
+                    stats[k]['steps'] += 1
+                    states[k] = next_state
+                    stats[k]['done'] = done
+                self.env_steps += 1
+
+                # 每TRAIN_EVERY步执行GRADIENT_STEPS次融合更新，同时训练K个智能体
+                for _ in range(self.schedule.updates_due(self.env_steps)):
+                    losses = self._experience_replay()
+                    if losses is None:
+                        break
+                    for k in np.flatnonzero(self.active):
+                        stats[k]['loss_sum'] += losses[k]
+                        stats[k]['updates'] += 1
+                self._on_env_step()
+                for k in np.flatnonzero(self.active):
+                    if stats[k]['done']:
+                        self._finish_episode(k, stats[k], epsilons[k], pbar)
+                        stats[k] = self._new_episode_stats()
+                        states[k] = self.env_handlers[k].reset()
+        except Exception as e:
+            ColorLogger.error(f"\n训练过程中发生错误: {str(e)}")
+            for k in np.flatnonzero(self.active):
+                self._save_agent(k, f"interrupted_model_agent{k}_{self.episodes[k]}")
+        finally:
+            pbar.close()
+            self.monitor.close()
+            for logger in self.loggers:
+                logger.close()
+            for buffer in self.replay_buffers:
+                buffer.close()
+            end_datetime = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            total_training_time = str(datetime.timedelta(seconds=int(time.time() - training_start_time)))
+            ColorLogger.highlight(f"\n===== 训练结束于: {end_datetime} =====\n")
+            ColorLogger.info(f"总训练轮次: {int(self.episodes.sum())} | 总耗时: {total_training_time}")
+
+        return self.score_history, self.loss_history
+
+    def _new_episode_stats(self):
+        return {'start_time': time.time(), 'total_reward': 0, 'steps': 0,
+                'loss_sum': 0, 'updates': 0, 'inference_time': 0, 'done': False}
+
+    def _on_env_step(self):
+        """按环境步数触发的调度事件：目标网络同步、保存模型与吞吐量日志"""
+        if self.schedule.target_sync_due(env_steps=self.env_steps):
+            self.agent.update_target_network(self.active.copy())
+        if self.schedule.save_due(env_steps=self.env_steps):
+            for k in np.flatnonzero(self.active):
+                self._save_agent(k, f"{Config.CHECKPOINT_PREFIX}agent{k}_step{self.env_steps}")
+        if self.schedule.log_due(self.env_steps):
+            now = time.perf_counter()
+            last_time, last_env_steps, last_grad_steps = self.last_log_point
+            elapsed = max(now - last_time, 1e-9)
+            counters = {
+                'grad_steps': self.grad_steps,
+                'env_steps_per_sec': (self.env_steps - last_env_steps) / elapsed,
+                'grad_steps_per_sec': (self.grad_steps - last_grad_steps) / elapsed,
+                'replay_ratio': self.grad_steps / self.env_steps
+            }
+            for k in np.flatnonzero(self.active):
+                self.loggers[k].log_step_metrics(self.env_steps, counters)
+            self.last_log_point = (now, self.env_steps, self.grad_steps)
+
+    def _finish_episode(self, k, stats, epsilon, pbar):
+        """记录第k个智能体的单轮指标并处理目标网络更新、模型保存"""
+        episode = int(self.episodes[k])
+        steps = stats['steps']
+        episode_time = time.time() - stats['start_time']
+        elapsed_time = time.time() - self.loggers[k].training_start_time
+        metrics = {
+            'score': self.env_handlers[k].score,
+            'total_reward': stats['total_reward'],
+            'steps': steps,
+            'avg_loss': stats['loss_sum'] / stats['updates'] if stats['updates'] > 0 else 0,
+            'avg_inference_time': stats['inference_time'] / steps if steps > 0 else 0,
+            'epsilon': epsilon,
+            'episode_time': episode_time,
+            'episode_time_str': str(datetime.timedelta(seconds=int(episode_time))),
+            'elapsed_time': elapsed_time,
+            'elapsed_time_str': str(datetime.timedelta(seconds=int(elapsed_time))),
+            'gpu_memory': self.monitor.record_memory_usage(episode, device=device),
+            'env_steps': self.env_steps,
+            'grad_steps': self.grad_steps
+        }
+        self.loggers[k].log_episode_metrics(episode, metrics)
+        self.monitor.update_status(agent=k, episode=episode, env_steps=self.env_steps, grad_steps=self.grad_steps,
+                                   score=metrics['score'], epsilon=float(epsilon))
+        self.score_history[k].append(metrics['score'])
+        self.loss_history[k].append(metrics['avg_loss'])
+        pbar.update(1)
+        pbar.set_postfix({'智能体': k, '分数': metrics['score'], 'ε': f"{epsilon:.3f}"})
+
+        # 按轮次调度时，按各自的轮次定期更新目标网络与保存模型
+        if self.schedule.target_sync_due(episode=episode):
+            mask = np.zeros(self.num_agents, dtype=bool)
+            mask[k] = True
+            self.agent.update_target_network(mask)
+
+        if self.schedule.save_due(episode=episode):
+            self._save_agent(k, f"{Config.CHECKPOINT_PREFIX}agent{k}_{episode}")
+
+        self.episodes[k] += 1
+        if self.episodes[k] >= Config.EPISODES:
+            self._save_agent(k, f"final_snake_model_agent{k}", is_final=True)
+            self.active[k] = False
+            ColorLogger.success(f"智能体{k}(种子{self.agent.seeds[k]})训练完成")
+
+    def _handle_control_requests(self):
+        """处理控制通道的保存与导出指标请求(作用于所有仍在训练的智能体)"""
+        save, dump = self.monitor.take_requests()
+        if save:
+            ColorLogger.success(f"收到手动保存请求，环境步数: {self.env_steps}")
+            for k in np.flatnonzero(self.active):
+                self._save_agent(k, f"{Config.CHECKPOINT_PREFIX}agent{k}_step{self.env_steps}")
+        if dump:
+            self.monitor.write_dump({
+                'episode': int(self.episodes.min()),
+                'env_steps': self.env_steps,
+                'grad_steps': self.grad_steps,
+                'active_agents': int(self.active.sum()),
+                'agents': [{'seed': int(self.agent.seeds[k]), 'episodes': int(self.episodes[k]),
+                            'recent_score_mean': float(np.mean(self.score_history[k][-100:]))
+                            if self.score_history[k] else 0.0,
+                            'best_score': max(self.score_history[k]) if self.score_history[k] else 0}
+                           for k in range(self.num_agents)],
+                'timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            })
+
+    def _choose_actions(self, states, epsilons):
+        """对K个智能体批量执行ε-贪婪动作选择"""
+        q_values = self.agent.predict_single(states)
+        actions = np.argmax(q_values, axis=1)
+        explore = np.random.random(self.num_agents) < epsilons
+        actions[explore] = np.random.randint(0, Config.ACTION_SIZE, explore.sum())
+        return actions
+
+    def _experience_replay(self):
+        """从每个智能体的回放缓冲区采样并执行一次融合的梯度更新
+
+        Returns:
+            np.array: 每个智能体的训练损失，经验不足一个批量(未执行更新)时返回None
+        """
+        if min(len(buffer) for buffer in self.replay_buffers) < Config.BATCH_SIZE:
+            return None
+
+        batches = [buffer.sample_batch(Config.BATCH_SIZE) for buffer in self.replay_buffers]
+        states, actions, rewards, next_states, dones, discounts = (
+            np.stack([getattr(b, field) for b in batches])
+            for field in ('states', 'actions', 'rewards', 'next_states', 'dones', 'discounts'))
+        prioritized = batches[0].indices is not None
+        weights = np.stack([b.weights for b in batches]) if prioritized else None
+
+        max_next_q = np.max(self.agent.target_predict_batch(next_states), axis=2)
+        targets = self.agent.predict_batch(states)
+        target_values = rewards + discounts * max_next_q * (1 - dones)
+        if prioritized:
+            td_errors = target_values - np.take_along_axis(targets, actions[..., None], axis=2)[..., 0]
+            for k, (buffer, batch) in enumerate(zip(self.replay_buffers, batches)):
+                buffer.update_priorities(batch.indices, td_errors[k])
+        np.put_along_axis(targets, actions[..., None], target_values[..., None], axis=2)
+        losses = self.agent.train(states, targets, sample_weights=weights)
+        self.grad_steps += 1
+        return losses
+
+    def _save_agent(self, k, name, is_final=False):
+        """保存第k个智能体：最终模型导出为Keras模型，其余按Config.CHECKPOINT_WEIGHTS_ONLY只保存权重"""
+        if Config.CHECKPOINT_WEIGHTS_ONLY and not is_final:
+            save_path = Config.MODEL_DIR / f"{name}{checkpoint.WEIGHTS_EXTENSION}"
+            architecture = {'state_size': self.agent.state_size, 'action_size': self.agent.action_size,
+                            'hidden_units': list(self.agent.hidden_units), 'use_batch_norm': self.agent.use_batch_norm}
+            checkpoint.write_weights(save_path, [w[k].numpy() for w in self.agent.weights], architecture)
+        else:
+            save_path = Config.MODEL_DIR / f"{name}{Config.MODEL_EXTENSION}"
+            checkpoint.atomic_save_model(self.agent.to_keras_model(k), save_path)
+        ColorLogger.success(f"模型保存至: {save_path}")
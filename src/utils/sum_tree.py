@@ -0,0 +1,91 @@
+import numpy as np
+
+class SegmentTree:
+    """基于数组的完全二叉线段树
+
+    叶子数取不小于capacity的2的幂，节点i的左右子节点为2i和2i+1，根节点为1，
+    叶子j存放在tree[leaf_count + j]。所有操作都按批处理：
+    一次更新k个叶子只需沿k条路径向上重算，代价为O(k·log n)。
+    """
+    def __init__(self, capacity, operation, neutral_element):
+        """初始化线段树
+
+        Args:
+            capacity (int): 叶子数量
+            operation (np.ufunc): 合并两个子节点的运算(np.add / np.minimum)
+            neutral_element (float): 运算的单位元，用于填充空叶子
+        """
+        self.capacity = capacity
+        self.leaf_count = 1
+        self.depth = 0
+        while self.leaf_count < capacity:
+            self.leaf_count *= 2
+            self.depth += 1
+        self.operation = operation
+        self.neutral_element = neutral_element
+        self.tree = np.full(2 * self.leaf_count, neutral_element, dtype=np.float64)
+
+    def update(self, indices, values):
+        """批量设置叶子的值并更新祖先节点
+
+        Args:
+            indices (np.array): 叶子索引
+            values (np.array or float): 对应的新值
+        """
+        nodes = np.asarray(indices, dtype=np.int64) + self.leaf_count
+        self.tree[nodes] = values
+        # 同一层的节点同时重算；重复的父节点会写入相同的值，无需去重
+        for _ in range(self.depth):
+            nodes //= 2
+            self.tree[nodes] = self.operation(self.tree[2 * nodes], self.tree[2 * nodes + 1])
+
+    def __getitem__(self, indices):
+        return self.tree[np.asarray(indices) + self.leaf_count]
+
+    def root(self):
+        """返回所有叶子的合并结果"""
+        return self.tree[1]
+
+    @property
+    def nbytes(self):
+        return self.tree.nbytes
+
+
+class SumTree(SegmentTree):
+    """求和树：支持按前缀和批量定位叶子，用于按优先级比例采样"""
+    def __init__(self, capacity):
+        super().__init__(capacity, np.add, 0.0)
+
+    def total(self):
+        return self.root()
+
+    def find_prefix_sum(self, prefix_sums):
+        """批量查找前缀和落入的叶子
+
+        对每个u，返回满足 sum(leaf[:j]) <= u < sum(leaf[:j+1]) 的叶子j。
+        所有查询同时逐层下降，共log n次向量化操作。
+
+        Args:
+            prefix_sums (np.array): 位于[0, total)内的前缀和
+
+        Returns:
+            np.array: 叶子索引
+        """
+        remaining = np.array(prefix_sums, dtype=np.float64)
+        nodes = np.ones(len(remaining), dtype=np.int64)
+        while nodes[0] < self.leaf_count:
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = remaining >= left_sum
+            remaining -= np.where(go_right, left_sum, 0.0)
+            nodes = left + go_right
+        return nodes - self.leaf_count
+
+
+class MinTree(SegmentTree):
+    """最小值树：O(1)获取最小优先级，用于重要性采样权重的归一化"""
+    def __init__(self, capacity):
+        super().__init__(capacity, np.minimum, np.inf)
+
+    def min(self):
+        return self.root()
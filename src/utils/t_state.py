@@ -1,85 +1,109 @@
-import json
-import datetime
-from pathlib import Path
-from src.utils.config import Config
-from src.utils.logger import ColorLogger
-
-class TrainingStateManager:
-    """训练状态管理模块，独立跟踪训练进度"""
-    
-    def __init__(self):
-        self.state_file = Config.MODEL_DIR / "training_state.json"
-        self.state = self._load_state()
-        
-    def _load_state(self):
-        """加载训练状态"""
-        if self.state_file.exists():
-            try:
-                with open(self.state_file, "r") as f:
-                    return json.load(f)
-            except Exception as e:
-                ColorLogger.warning(f"训练状态文件损坏，将创建新文件: {str(e)}")
-        
-        # 默认状态
-        return {
-            "last_episode": 0,
-            "last_save_time": None,
-            "model_path": None,
-            "training_config": {
-                "batch_size": Config.BATCH_SIZE,
-                "learning_rate": Config.LEARNING_RATE,
-                "epsilon_init": Config.EPSILON_INIT
-            }
-        }
-    
-    def save_state(self, episode, model_path):
-        """保存训练状态"""
-        self.state.update({
-            "last_episode": episode,
-            "last_save_time": datetime.datetime.now().isoformat(),
-            "model_path": str(model_path),
-            "training_config": {
-                "batch_size": Config.BATCH_SIZE,
-                "learning_rate": Config.LEARNING_RATE,
-                "epsilon_init": Config.EPSILON_INIT
-            }
-        })
-        
-        # 确保目录存在
-        Config.MODEL_DIR.mkdir(exist_ok=True)
-        
-        with open(self.state_file, "w") as f:
-            json.dump(self.state, f, indent=2)
-        
-        ColorLogger.success(f"训练状态已保存至: {self.state_file}")
-    
-    def get_last_episode(self):
-        """获取最后训练轮次"""
-        return self.state["last_episode"]
-    
-    def get_last_model_path(self):
-        """获取最后模型路径"""
-        return self.state.get("model_path")
-    
-    def validate_config_compatibility(self):
-        """验证当前配置与上次训练的兼容性"""
-        current_config = {
-            "batch_size": Config.BATCH_SIZE,
-            "learning_rate": Config.LEARNING_RATE,
-            "epsilon_init": Config.EPSILON_INIT
-        }
-        
-        saved_config = self.state.get("training_config", {})
-        
-        # 检查关键配置是否匹配
-        incompatible = []
-        for key, value in current_config.items():
-            if saved_config.get(key) != value:
-                incompatible.append(f"{key}: {saved_config.get(key)} → {value}")
-        
-        if incompatible:
-            ColorLogger.warning("检测到配置变更，可能影响训练连续性:")
-            for change in incompatible:
-                ColorLogger.warning(f"  {change}")
-            return False
+import json
+import datetime
+import threading
+from pathlib import Path
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils.checkpoint import atomic_write_bytes
+
+class TrainingStateManager:
+    """训练状态管理模块，独立跟踪训练进度"""
+    
+    def __init__(self):
+        self.state_file = Config.MODEL_DIR / "training_state.json"
+        self.state = self._load_state()
+        self.lock = threading.Lock()  # 检查点写入线程与训练循环都会更新状态文件
+        
+    def _load_state(self):
+        """加载训练状态"""
+        if self.state_file.exists():
+            try:
+                with open(self.state_file, "r") as f:
+                    return json.load(f)
+            except Exception as e:
+                ColorLogger.warning(f"训练状态文件损坏，将创建新文件: {str(e)}")
+        
+        # 默认状态
+        return {
+            "last_episode": 0,
+            "last_save_time": None,
+            "model_path": None,
+            "checkpoint_path": None,
+            "eval_scores": {},
+            "training_config": {
+                "batch_size": Config.BATCH_SIZE,
+                "learning_rate": Config.LEARNING_RATE,
+                "epsilon_init": Config.EPSILON_INIT
+            }
+        }
+    
+    def save_state(self, episode, model_path, checkpoint_path=None):
+        """保存训练状态(先写临时文件再原子替换，崩溃时不会留下半个状态文件)"""
+        with self.lock:
+            self.state.update({
+                "last_episode": episode,
+                "last_save_time": datetime.datetime.now().isoformat(),
+                "model_path": str(model_path),
+                "checkpoint_path": str(checkpoint_path) if checkpoint_path else None,
+                "training_config": {
+                    "batch_size": Config.BATCH_SIZE,
+                    "learning_rate": Config.LEARNING_RATE,
+                    "epsilon_init": Config.EPSILON_INIT
+                }
+            })
+            self._write()
+        
+        ColorLogger.success(f"训练状态已保存至: {self.state_file}")
+
+    def record_eval_score(self, episode, score):
+        """记录某一轮权重的贪婪评估平均得分(检查点保留策略据此保留评估最好的模型)"""
+        with self.lock:
+            self.state.setdefault("eval_scores", {})[str(episode)] = score
+            self._write()
+
+    def get_eval_scores(self):
+        """获取已记录的评估得分
+
+        Returns:
+            dict: 轮次(int) -> 评估平均得分
+        """
+        with self.lock:
+            return {int(episode): score for episode, score in self.state.get("eval_scores", {}).items()}
+
+    def _write(self):
+        atomic_write_bytes(self.state_file, json.dumps(self.state, indent=2).encode('utf-8'))
+    
+    def get_last_episode(self):
+        """获取最后训练轮次"""
+        return self.state["last_episode"]
+    
+    def get_last_model_path(self):
+        """获取最后模型路径"""
+        return self.state.get("model_path")
+
+    def get_checkpoint_path(self):
+        """获取最后训练检查点路径(旧版状态文件中没有时为None)"""
+        return self.state.get("checkpoint_path")
+    
+    def validate_config_compatibility(self):
+        """验证当前配置与上次训练的兼容性"""
+        current_config = {
+            "batch_size": Config.BATCH_SIZE,
+            "learning_rate": Config.LEARNING_RATE,
+            "epsilon_init": Config.EPSILON_INIT
+        }
+        
+        saved_config = self.state.get("training_config", {})
+        
+        # 检查关键配置是否匹配
+        incompatible = []
+        for key, value in current_config.items():
+            if saved_config.get(key) != value:
+                incompatible.append(f"{key}: {saved_config.get(key)} → {value}")
+        
+        if incompatible:
+            ColorLogger.warning("检测到配置变更，可能影响训练连续性:")
+            for change in incompatible:
+                ColorLogger.warning(f"  {change}")
+            return False
         return True
\ No newline at end of file
@@ -1,99 +1,321 @@
-import sys
-import subprocess
-from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent.parent))
-
-import threading
-import time
-import tensorflow as tf
-import keyboard
-from src.utils.logger import ColorLogger
-from src.utils.device import get_training_device
-
-
-class TrainingMonitor:
-    def __init__(self):
-        """初始化训练监控器"""
-        self.finish_training = False  # 训练结束标志
-        self.save_requested = False   # 保存请求标志
-        self.lock = threading.Lock()  # 线程锁
-        self.event = threading.Event()  # 事件机制，用于线程控制
-        self.thread = threading.Thread(target=self._monitor_keyboard, daemon=True)
-        self.thread.start()
-        self.memory_log = []  # 新增：内存监控日志
-    
-    def _monitor_keyboard(self):
-        ColorLogger.info("\n===== 训练控制 =====\n按 '↑+Q' 键: 立即退出训练\n按 '↑+S' 键: 手动保存当前模型\n===================\n")
-        while not self.event.is_set():
-            with self.lock:
-                # 检测立即退出请求
-                if keyboard.is_pressed('up+q') and not self.finish_training:
-                    self.finish_training = True
-                    ColorLogger.warning("\n检测到立即退出请求，正在终止训练...")
-                    self.event.set()  
-                    break
-                # 检测手动保存请求
-                if keyboard.is_pressed('up+s') and not self.save_requested:
-                    self.save_requested = True
-                    ColorLogger.success("\n检测到手动保存请求，将保存当前模型...")
-                    time.sleep(1)  # 防止重复触发
-            self.event.wait(0.05)  # 降低CPU占用
-    
-    def should_end(self):  
-        """检查是否应该结束训练
-        
-        返回:
-            bool: True表示应该结束训练，False表示继续训练
-        """
-        with self.lock:
-            return self.finish_training
-    
-    def should_save(self):
-        """检查是否应该保存模型
-        
-        返回:
-            bool: True表示应该保存模型，False表示不需要保存
-        """
-        with self.lock:
-            if self.save_requested:
-                self.save_requested = False
-                return True
-            return False
-    
-    def record_memory_usage(self, episode,device):
-        """记录当前GPU内存使用情况"""
-        if not hasattr(self, '_cpu_memory_error_shown'):
-            self._cpu_memory_error_shown = False
-        
-        try:
-            
-            if 'GPU' in device:
-                # GPU模式 - 正常执行内存监控
-                tf_mem = tf.config.experimental.get_memory_info('GPU:0')
-                smi_output = subprocess.check_output(
-                    ["nvidia-smi", "--query-gpu=memory.used", "--format=csv,noheader,nounits"]
-                ).decode().strip()
-                
-                self.memory_log.append({
-                    "episode": episode,
-                    "tf_peak": tf_mem['peak'],
-                    "sys_used": int(smi_output)
-                })
-                
-                # 检查内存增长情况
-                if len(self.memory_log) >= 3:
-                    recent = self.memory_log[-3:]
-                    growth_rate = (recent[-1]['sys_used'] - recent[0]['sys_used']) / 3
-                    if growth_rate > 5:  # 连续3个周期增长超过5MB
-                        ColorLogger.warning(f"内存异常增长: {growth_rate:.2f}MB/episode")
-                        
-            elif 'CPU' in device and not self._cpu_memory_error_shown:
-                # CPU模式 - 只在第一次时显示错误信息
-                ColorLogger.error("内存监控失败: 当前运行在CPU模式下，无法获取GPU内存信息")
-                self._cpu_memory_error_shown = True
-                
-        except Exception as e:
-            # 只在GPU模式下输出异常（CPU模式已经处理过）
-            if 'GPU' in get_training_device():
-                ColorLogger.error(f"内存监控失败: {str(e)}")
+import os
+import sys
+import json
+import signal
+import socket
+import subprocess
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import threading
+import tensorflow as tf
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils.device import get_training_device
+from src.utils import remote_protocol as protocol
+
+# 控制命令(控制套接字每行一条，信号映射到其中之一)
+CONTROL_COMMANDS = ("stop", "save", "dump", "verbosity", "status")
+
+
+def control_socket_address(setting=None, pid=None):
+    """解析控制套接字地址
+
+    Args:
+        setting (str): Config.CONTROL_SOCKET，""表示不开启，"auto"表示LOG_DIR/control_<pid>.sock
+        pid (int): "auto"时使用的进程号，默认当前进程
+
+    Returns:
+        str: parse_address可解析的地址，不开启时返回None
+    """
+    setting = Config.CONTROL_SOCKET if setting is None else setting
+    if not setting:
+        return None
+    if setting == "auto":
+        if not hasattr(socket, "AF_UNIX"):
+            return None
+        return f"unix:{Config.LOG_DIR / f'control_{os.getpid() if pid is None else pid}.sock'}"
+    return setting
+
+
+class TrainingMonitor:
+    """训练控制通道
+
+    代替原先每50ms加锁轮询键盘的线程(keyboard库在Linux上需要root，且无法通过SSH或在容器中使用)：
+    - POSIX信号: SIGINT/SIGTERM 结束训练(保存后退出，再次Ctrl+C立即中断)，SIGUSR1 立即保存，
+      SIGUSR2 导出当前指标，SIGHUP 循环切换日志详细程度
+    - 控制套接字(Config.CONTROL_SOCKET): 每行一条命令 stop / save / dump / verbosity <0-2> / status，
+      由src/tools/trainctl.py发送
+    信号处理函数与套接字线程只设置标志位；训练循环每轮读取一次普通属性(pending / finish_training)，
+    不加锁也不轮询，只有收到命令时才进入处理逻辑。
+    信号处理函数与控制套接字只在start()到close()之间生效(训练器在train()中调用)，只创建训练器、
+    不调用train()的工具(cpu_autotune、arch_search、replay_bench)保持默认的信号行为，也不留下套接字。
+    """
+
+    def __init__(self):
+        """初始化训练监控器(start之后才接收控制命令)"""
+        self.finish_training = False  # 训练结束标志
+        self.save_requested = False   # 保存请求标志
+        self.dump_requested = False   # 导出指标请求标志
+        self.verbosity_changed = False  # 日志详细程度已切换(在训练循环中输出提示)
+        self.pending = False  # 有尚未处理的保存/导出请求(训练循环只检查这一个属性)
+        self.memory_log = []  # 新增：内存监控日志
+        self.status = {}  # 训练循环每轮更新的状态摘要(status命令直接返回，不打断训练)
+        self.dump_done = threading.Event()
+        self.last_dump = None
+        self.previous_handlers = {}
+        self.listener = None
+        self.unix_path = None
+        self.address = None
+        ColorLogger.set_verbosity(Config.LOG_VERBOSITY)
+
+    def start(self):
+        """开始接收控制命令：安装信号处理函数并启动控制套接字(与close成对调用)"""
+        self._install_signal_handlers()
+        self._start_control_socket()
+        lines = ["===== 训练控制 =====", f"Ctrl+C / kill -TERM {os.getpid()}: 保存并结束训练"]
+        if hasattr(signal, "SIGUSR1"):
+            lines += [f"kill -USR1 {os.getpid()}: 立即保存当前模型",
+                      f"kill -USR2 {os.getpid()}: 导出当前指标",
+                      f"kill -HUP {os.getpid()}: 切换日志详细程度"]
+        if self.address:
+            lines.append(f"控制套接字: {self.address} (python src/tools/trainctl.py stop|save|dump|verbosity N|status)")
+        lines.append("===================")
+        ColorLogger.info("\n".join(lines))
+
+    # ---------- 信号 ----------
+
+    def _install_signal_handlers(self):
+        """安装信号处理函数(只能在主线程中安装，例如被扫描工具在其它线程中调用时跳过)"""
+        if threading.current_thread() is not threading.main_thread():
+            return
+        handlers = {'SIGINT': self._on_stop_signal, 'SIGTERM': self._on_stop_signal,
+                    'SIGUSR1': self._on_save_signal, 'SIGUSR2': self._on_dump_signal,
+                    'SIGHUP': self._on_verbosity_signal}
+        for name, handler in handlers.items():
+            signum = getattr(signal, name, None)  # Windows没有SIGUSR1/SIGUSR2/SIGHUP
+            if signum is not None:
+                self.previous_handlers[signum] = signal.signal(signum, handler)
+
+    def _on_stop_signal(self, signum, frame):
+        if self.finish_training and signum == signal.SIGINT:
+            raise KeyboardInterrupt  # 第二次Ctrl+C: 不再等待本轮结束
+        self.request_stop()
+
+    def _on_save_signal(self, signum, frame):
+        self.request_save()
+
+    def _on_dump_signal(self, signum, frame):
+        self.request_dump()
+
+    def _on_verbosity_signal(self, signum, frame):
+        self.set_verbosity((ColorLogger.verbosity + 1) % (ColorLogger.VERBOSE + 1))
+
+    # ---------- 请求 ----------
+
+    # 以下方法可能在信号处理函数中调用，只设置标志位，不输出日志(提示在训练循环处理请求时输出)
+
+    def request_stop(self):
+        self.finish_training = True
+
+    def request_save(self):
+        self.save_requested = True
+        self.pending = True
+
+    def request_dump(self):
+        self.dump_requested = True
+        self.pending = True
+
+    def set_verbosity(self, level):
+        ColorLogger.set_verbosity(level)
+        self.verbosity_changed = True
+        self.pending = True
+
+    def should_end(self):
+        """检查是否应该结束训练
+
+        返回:
+            bool: True表示应该结束训练，False表示继续训练
+        """
+        return self.finish_training
+
+    def should_save(self):
+        """检查是否应该保存模型(读取后清除请求)
+
+        返回:
+            bool: True表示应该保存模型，False表示不需要保存
+        """
+        if self.save_requested:
+            self.save_requested = False
+            return True
+        return False
+
+    def should_dump(self):
+        """检查是否应该导出当前指标(读取后清除请求)"""
+        if self.dump_requested:
+            self.dump_requested = False
+            return True
+        return False
+
+    def take_requests(self):
+        """训练循环在pending为True时调用：清除pending并返回(是否保存, 是否导出)"""
+        self.pending = False
+        if self.verbosity_changed:
+            self.verbosity_changed = False
+            ColorLogger.warning(f"日志详细程度: {ColorLogger.VERBOSITY_NAMES[ColorLogger.verbosity]}")
+        return self.should_save(), self.should_dump()
+
+    def update_status(self, **status):
+        """训练循环每轮记录一份状态摘要(只替换字典引用)"""
+        self.status = status
+
+    def write_dump(self, report):
+        """把训练循环整理好的指标写入LOG_DIR并唤醒等待结果的控制连接
+
+        Returns:
+            Path: 导出文件路径
+        """
+        Config.LOG_DIR.mkdir(parents=True, exist_ok=True)
+        path = Config.LOG_DIR / f"metrics_dump_{report.get('episode', 0)}_{os.getpid()}.json"
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, default=float)
+        report = dict(report, dump_path=str(path))
+        self.last_dump = report
+        self.dump_done.set()
+        summary = " | ".join(f"{key}: {value:.4g}" if isinstance(value, float) else f"{key}: {value}"
+                             for key, value in report.items() if not isinstance(value, (dict, list)))
+        ColorLogger.highlight(f"当前指标已导出至: {path}\n {summary}")
+        return path
+
+    # ---------- 控制套接字 ----------
+
+    def _start_control_socket(self):
+        address = control_socket_address()
+        if address is None:
+            return
+        try:
+            family, sockaddr = protocol.parse_address(address)
+            if isinstance(sockaddr, str):
+                Path(sockaddr).parent.mkdir(parents=True, exist_ok=True)
+                if os.path.exists(sockaddr):
+                    os.unlink(sockaddr)  # 上次运行残留的套接字文件
+            self.listener = socket.socket(family, socket.SOCK_STREAM)
+            if family == socket.AF_INET:
+                self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.listener.bind(sockaddr)
+            self.listener.listen()
+        except (OSError, ValueError) as e:
+            ColorLogger.warning(f"控制套接字 {address} 启动失败，仅可使用信号控制: {str(e)}")
+            if self.listener is not None:
+                self.listener.close()
+            self.listener = None
+            return
+        self.unix_path = sockaddr if isinstance(sockaddr, str) else None
+        self.address = protocol.format_address(family, self.listener.getsockname())
+        # 阻塞在accept上，没有连接时不占用CPU
+        threading.Thread(target=self._accept_loop, name="TrainingControl", daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                break  # close()关闭了监听套接字
+            with conn:
+                try:
+                    conn.settimeout(5.0)
+                    command = conn.makefile('r', encoding='utf-8').readline()
+                    reply = self._execute(command)
+                except (OSError, ValueError) as e:
+                    reply = {'ok': False, 'message': str(e)}
+                try:
+                    conn.sendall((json.dumps(reply, ensure_ascii=False, default=float) + "\n").encode('utf-8'))
+                except OSError:
+                    pass
+
+    def _execute(self, line):
+        """执行一条控制命令
+
+        Returns:
+            dict: 回复({'ok': bool, 'message': str, ...})
+        """
+        parts = line.strip().split()
+        if not parts or parts[0] not in CONTROL_COMMANDS:
+            return {'ok': False, 'message': f"未知命令: {line.strip()} (可用: {' / '.join(CONTROL_COMMANDS)})"}
+        command = parts[0]
+        if command == "stop":
+            self.request_stop()
+            return {'ok': True, 'message': "将在本轮结束后保存并退出"}
+        if command == "save":
+            self.request_save()
+            return {'ok': True, 'message': "将在本轮结束时保存模型"}
+        if command == "status":
+            return {'ok': True, 'message': "训练状态", 'status': self.status}
+        if command == "verbosity":
+            if len(parts) < 2 or parts[1] not in ("0", "1", "2"):
+                return {'ok': False, 'message': "用法: verbosity 0|1|2"}
+            self.set_verbosity(int(parts[1]))
+            return {'ok': True, 'message': f"日志详细程度: {ColorLogger.VERBOSITY_NAMES[ColorLogger.verbosity]}"}
+        # dump: 等待训练循环在本轮结束时导出，把结果一并返回
+        self.dump_done.clear()
+        self.request_dump()
+        if self.dump_done.wait(timeout=60.0):
+            return {'ok': True, 'message': "当前指标", 'dump': self.last_dump}
+        return {'ok': True, 'message': "已请求导出，将在本轮结束时写入LOG_DIR"}
+
+    def close(self):
+        """恢复原信号处理函数并关闭控制套接字"""
+        for signum, handler in self.previous_handlers.items():
+            try:
+                signal.signal(signum, handler)
+            except (ValueError, TypeError):
+                pass
+        self.previous_handlers = {}
+        if self.listener is not None:
+            try:
+                self.listener.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.listener.close()
+            self.listener = None
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
+        self.unix_path = None
+
+    def record_memory_usage(self, episode,device):
+        """记录当前GPU内存使用情况"""
+        if not hasattr(self, '_cpu_memory_error_shown'):
+            self._cpu_memory_error_shown = False
+        
+        try:
+            
+            if 'GPU' in device:
+                # GPU模式 - 正常执行内存监控
+                tf_mem = tf.config.experimental.get_memory_info('GPU:0')
+                smi_output = subprocess.check_output(
+                    ["nvidia-smi", "--query-gpu=memory.used", "--format=csv,noheader,nounits"]
+                ).decode().strip()
+                
+                self.memory_log.append({
+                    "episode": episode,
+                    "tf_peak": tf_mem['peak'],
+                    "sys_used": int(smi_output)
+                })
+                
+                # 检查内存增长情况
+                if len(self.memory_log) >= 3:
+                    recent = self.memory_log[-3:]
+                    growth_rate = (recent[-1]['sys_used'] - recent[0]['sys_used']) / 3
+                    if growth_rate > 5:  # 连续3个周期增长超过5MB
+                        ColorLogger.warning(f"内存异常增长: {growth_rate:.2f}MB/episode")
+                        
+            elif 'CPU' in device and not self._cpu_memory_error_shown:
+                # CPU模式 - 只在第一次时显示错误信息
+                ColorLogger.error("内存监控失败: 当前运行在CPU模式下，无法获取GPU内存信息")
+                self._cpu_memory_error_shown = True
+                
+        except Exception as e:
+            # 只在GPU模式下输出异常（CPU模式已经处理过）
+            if 'GPU' in get_training_device():
+                ColorLogger.error(f"内存监控失败: {str(e)}")
                 
\ No newline at end of file
@@ -1,76 +1,189 @@
-import csv
-import time
-import tensorflow as tf
-import datetime
-import threading
-from src.utils.config import Config
-from src.utils.logger import ColorLogger
-
-class TrainingLogger:
-    """日志与监控模块，处理训练日志与资源监控"""
-    
-    def __init__(self):
-        self.log_file = None
-        self.log_writer = None
-        self.tensorboard_writer = None
-        self.training_start_time = time.time()
-        self._init_logging()
-        
-    def _init_logging(self):
-        """初始化日志系统"""
-        # 创建日志目录
-        Config.LOG_DIR.mkdir(exist_ok=True)
-        Config.TENSORBOARD_LOG_DIR.mkdir(exist_ok=True)
-        
-        # 初始化CSV日志
-        log_filename = f"training_log_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        self.log_path = Config.LOG_DIR / log_filename
-        self.log_file = open(self.log_path, 'w', newline='')
-        self.log_writer = csv.writer(self.log_file)
-        self.log_writer.writerow([
-            'episode', 'score', 'total_reward', 'epsilon', 'loss', 
-            'steps', 'inference_time', 'episode_time', 'elapsed_time',
-            'gpu_memory_used_mb'
-        ])
-        
-        # 初始化TensorBoard
-        tensorboard_log_dir = Config.TENSORBOARD_LOG_DIR / datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.tensorboard_writer = tf.summary.create_file_writer(str(tensorboard_log_dir))
-        ColorLogger.info(f"TensorBoard日志将保存至: {tensorboard_log_dir}")
-        
-    def log_episode_metrics(self, episode, metrics):
-        threading.Thread(target=self._async_write, args=(episode, metrics)).start()
-
-    def _async_write(self, episode, metrics):
-        # 写入CSV日志
-        self.log_writer.writerow([
-            episode, metrics['score'], metrics['total_reward'], metrics['epsilon'],
-            metrics['avg_loss'], metrics['steps'], metrics['avg_inference_time'],
-            metrics['episode_time_str'], metrics['elapsed_time_str'], metrics['gpu_memory']
-        ])
-        self.log_file.flush()
-        
-        # 写入TensorBoard
-        with self.tensorboard_writer.as_default():
-            tf.summary.scalar('score', metrics['score'], step=episode)
-            tf.summary.scalar('loss', metrics['avg_loss'], step=episode)
-            tf.summary.scalar('epsilon', metrics['epsilon'], step=episode)
-            tf.summary.scalar('steps', metrics['steps'], step=episode)
-            
-    def get_gpu_memory_usage(self):
-        """获取GPU内存使用情况(MB)"""
-        try:
-            mem_info = tf.config.experimental.get_memory_info('GPU:0')
-            return mem_info['current'] // (1024 * 1024)
-        except:
-            return 0
-            
-    def close(self):
-        """关闭日志资源"""
-        if self.log_file:
-            self.log_file.close()
-            ColorLogger.success(f"训练日志已保存至: {self.log_path}")
-            
-        if self.tensorboard_writer:
-            self.tensorboard_writer.close()
+import csv
+import time
+import queue
+import tensorflow as tf
+import datetime
+import threading
+from src.utils.config import Config
+from src.utils.logger import ColorLogger
+from src.utils.metrics_store import MetricsWriter, METRICS_PREFIX, episode_row
+
+class TrainingLogger:
+    """日志与监控模块，处理训练日志与资源监控
+
+    每轮指标写入列式存储(metrics_store，按需导出CSV)，LOG_CSV开启时同时写入CSV。
+    指标与TensorBoard只由一个常驻的日志线程写入：训练循环(以及检查点写入线程)把记录放入有界队列后立即返回，
+    日志线程成批取出、按顺序写入，每LOG_FLUSH_ROWS条或每LOG_FLUSH_INTERVAL秒刷新一次文件；
+    队列满时写入方等待(不丢弃记录)。close()写完队列中剩余的记录后再关闭文件。
+    """
+    
+    def __init__(self, run_name=None):
+        self.run_name = run_name  # 可选的运行名称，用于区分同时训练的多个智能体
+        self.log_path = None
+        self.log_file = None
+        self.log_writer = None
+        self.metrics_writer = None
+        self.tensorboard_writer = None
+        self.training_start_time = time.time()
+        self.records = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)  # (写入函数名, 参数)，None表示结束
+        self.written = 0
+        self._init_logging()
+        self.thread = threading.Thread(target=self._run, name=f"TrainingLogger{self.run_name or ''}", daemon=True)
+        self.thread.start()
+        
+    def _init_logging(self):
+        """初始化日志系统"""
+        # 创建日志目录
+        Config.LOG_DIR.mkdir(exist_ok=True)
+        Config.TENSORBOARD_LOG_DIR.mkdir(exist_ok=True)
+        
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        run_suffix = f"_{self.run_name}" if self.run_name else ""
+        self.run_tag = f"{timestamp}{run_suffix}"  # 本次运行的各日志文件共用的后缀
+
+        # 初始化列式指标存储
+        self.metrics_path = Config.LOG_DIR / f"{METRICS_PREFIX}{self.run_tag}"
+        self.metrics_writer = MetricsWriter(self.metrics_path)
+
+        # 初始化CSV日志(可选)
+        if Config.LOG_CSV:
+            self.log_path = Config.LOG_DIR / f"training_log_{self.run_tag}.csv"
+            self.log_file = open(self.log_path, 'w', newline='')
+            self.log_writer = csv.writer(self.log_file)
+            self.log_writer.writerow([
+                'episode', 'score', 'total_reward', 'epsilon', 'loss', 
+                'steps', 'inference_time_ms', 'episode_time', 'elapsed_time',
+                'gpu_memory_used_mb', 'learner_wait_ms', 'rss_mb', 'env_steps', 'grad_steps', 'param_lag'
+            ])
+        
+        # 初始化TensorBoard
+        self.tensorboard_log_dir = Config.TENSORBOARD_LOG_DIR / self.run_tag
+        self.tensorboard_writer = tf.summary.create_file_writer(str(self.tensorboard_log_dir))
+        ColorLogger.info(f"TensorBoard日志将保存至: {self.tensorboard_log_dir}")
+        
+    def log_episode_metrics(self, episode, metrics):
+        """记录单轮指标(放入日志队列，由日志线程写入指标存储与TensorBoard)"""
+        self.records.put(('_write_episode', (episode, dict(metrics))))
+
+    def log_step_metrics(self, env_steps, counters):
+        """按环境步数记录调度计数器与吞吐量(步数/秒、更新/秒、回放比)
+
+        Args:
+            env_steps (int): 累计环境步数，作为TensorBoard横轴
+            counters (dict): 计数器名称到数值的映射
+        """
+        self.records.put(('_write_scalars', ('schedule', env_steps, dict(counters))))
+            
+    def log_checkpoint_metrics(self, episode, metrics):
+        """记录检查点延迟：训练循环暂停时间(复制快照)、后台写入时间、文件大小与被合并的快照数
+
+        Args:
+            episode (int): 保存时的轮次，作为TensorBoard横轴
+            metrics (dict): 指标名称到数值的映射
+        """
+        self.records.put(('_write_scalars', ('checkpoint', episode, dict(metrics))))
+
+    # ---------- 日志线程 ----------
+
+    def _run(self):
+        """日志线程：成批取出记录写入，按条数或时间间隔刷新文件，收到None后写完剩余记录并退出"""
+        pending = 0  # 上次刷新后写入的记录数
+        last_flush = time.monotonic()
+        running = True
+        while running:
+            timeout = max(Config.LOG_FLUSH_INTERVAL - (time.monotonic() - last_flush), 0) if pending else None
+            try:
+                batch = [self.records.get(timeout=timeout)]
+            except queue.Empty:
+                batch = []
+            while len(batch) < Config.LOG_FLUSH_ROWS:  # 一次取出已排队的记录，批量写入
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = batch[:batch.index(None)]
+            if batch:
+                with self.tensorboard_writer.as_default():
+                    for method, args in batch:
+                        try:
+                            getattr(self, method)(*args)
+                        except Exception as e:
+                            ColorLogger.error(f"训练日志写入失败: {str(e)}")
+                pending += len(batch)
+                self.written += len(batch)
+            if pending and (not running or pending >= Config.LOG_FLUSH_ROWS
+                            or time.monotonic() - last_flush >= Config.LOG_FLUSH_INTERVAL):
+                try:
+                    self.metrics_writer.flush()
+                    if self.log_file:
+                        self.log_file.flush()
+                    self.tensorboard_writer.flush()
+                except Exception as e:
+                    ColorLogger.error(f"训练日志刷新失败: {str(e)}")
+                pending = 0
+                last_flush = time.monotonic()
+
+    def _write_episode(self, episode, metrics):
+        # 写入列式指标存储
+        self.metrics_writer.append(episode_row(episode, metrics))
+
+        # 写入CSV日志
+        if self.log_writer:
+            self.log_writer.writerow([
+                episode, metrics['score'], metrics['total_reward'], metrics['epsilon'],
+                metrics['avg_loss'], metrics['steps'], metrics['avg_inference_time'],
+                metrics['episode_time_str'], metrics['elapsed_time_str'], metrics['gpu_memory'],
+                metrics.get('learner_wait_ms', 0), metrics.get('rss_mb', 0),
+                metrics.get('env_steps', 0), metrics.get('grad_steps', 0), metrics.get('param_lag', 0)
+            ])
+        
+        # 写入TensorBoard(日志线程已进入tensorboard_writer.as_default())
+        tf.summary.scalar('score', metrics['score'], step=episode)
+        tf.summary.scalar('loss', metrics['avg_loss'], step=episode)
+        tf.summary.scalar('epsilon', metrics['epsilon'], step=episode)
+        tf.summary.scalar('steps', metrics['steps'], step=episode)
+        if 'learner_wait_ms' in metrics:
+            tf.summary.scalar('learner_wait_ms', metrics['learner_wait_ms'], step=episode)
+            tf.summary.scalar('prefetch_queue', metrics['prefetch_queue'], step=episode)
+        if 'rss_mb' in metrics:
+            tf.summary.scalar('rss_mb', metrics['rss_mb'], step=episode)
+        if 'env_steps' in metrics:
+            tf.summary.scalar('env_steps', metrics['env_steps'], step=episode)
+            tf.summary.scalar('grad_steps', metrics['grad_steps'], step=episode)
+            # 以环境步数为横轴的分数曲线，便于比较不同回放比的运行
+            tf.summary.scalar('score_by_env_step', metrics['score'], step=metrics['env_steps'])
+        if 'param_lag' in metrics:
+            tf.summary.scalar('param_lag', metrics['param_lag'], step=episode)
+            tf.summary.scalar('actor_queue', metrics['actor_queue'], step=episode)
+
+    def _write_scalars(self, group, step, values):
+        for name, value in values.items():
+            tf.summary.scalar(f'{group}/{name}', value, step=step)
+
+    def get_gpu_memory_usage(self):
+        """获取GPU内存使用情况(MB)"""
+        try:
+            mem_info = tf.config.experimental.get_memory_info('GPU:0')
+            return mem_info['current'] // (1024 * 1024)
+        except:
+            return 0
+            
+    def close(self):
+        """写完队列中剩余的记录后关闭日志资源"""
+        if self.thread.is_alive():
+            self.records.put(None)
+            self.thread.join()
+        if self.metrics_writer:
+            if self.metrics_writer.close():
+                ColorLogger.success(f"训练指标已保存至: {self.metrics_path} ({self.metrics_writer.rows}轮)")
+            else:
+                ColorLogger.error(f"训练指标未能全部写入{self.metrics_path}，最后一部分轮次的指标已丢失")
+        if self.log_file:
+            self.log_file.close()
+            ColorLogger.success(f"训练日志已保存至: {self.log_path}")
+            
+        if self.tensorboard_writer:
+            self.tensorboard_writer.close()
             ColorLogger.info("TensorBoard写入器已关闭")
\ No newline at end of file